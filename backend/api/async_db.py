@@ -0,0 +1,67 @@
+"""Run independent ORM queries concurrently from async views.
+
+The ORM is synchronous, so async views hand each query to a thread. Those
+threads come from one bounded pool (``ASYNC_DB_WORKERS``) shared by every
+request in the process, which caps how many database connections the async
+views can hold open at once. Each pool thread keeps its own connection and
+honours ``CONN_MAX_AGE`` like a request would.
+
+``run_all`` is the sequential counterpart used by the WSGI views, so both
+paths share the same query definitions.
+
+Streaming responses need the same care: Django serves a sync iterator
+under ASGI by collecting all of it in one ``sync_to_async(list)`` call,
+so nothing is sent until the end and the thread-sensitive executor every
+sync view runs on is blocked meanwhile. ``streaming_content`` turns such
+an iterator into an async one whose chunks are produced on the pool.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_DB_WORKERS, thread_name_prefix='async-db')
+
+
+def _call(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run(func, *args, **kwargs):
+    """Await ``func(*args, **kwargs)`` on the query pool."""
+    return await sync_to_async(_call, thread_sensitive=False, executor=_executor)(func, *args, **kwargs)
+
+
+async def gather(queries):
+    """Run every callable of the ``{name: callable}`` dict concurrently; return ``{name: result}``."""
+    results = await asyncio.gather(*(run(query) for query in queries.values()))
+    return dict(zip(queries, results))
+
+
+def run_all(queries):
+    """``gather`` for sync code: run the queries one after another."""
+    return {name: query() for name, query in queries.items()}
+
+
+def served_by_asgi(request):
+    """Whether ``request`` (a Django or DRF request) came in through ASGI."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def _produce(chunks):
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await run(next, chunks, done)) is not done:
+        yield chunk
+
+
+def streaming_content(request, chunks):
+    """``chunks`` (a sync iterator) in the form the server serving ``request`` streams."""
+    return _produce(chunks) if served_by_asgi(request) else chunks
@@ -0,0 +1,107 @@
+"""Async variants of the aggregation-heavy dashboard endpoints.
+
+Served in place of the sync views when ``ASYNC_VIEWS`` is on (the default
+under ``backend_project.asgi``). The independent aggregates of each endpoint
+run concurrently on the bounded query pool (``api.async_db``) while the event
+loop keeps serving other requests. DRF function views cannot be async, so
+these authenticate the bearer token themselves and render with DRF's JSON
+renderer to produce the same bodies as the sync views.
+"""
+from functools import wraps
+
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from jobs.stats import InvalidFilter, cached_job_stats, requested_filters
+
+from .async_db import gather, run
+from .dashboard import monthly_stats, monthly_stats_queries, system_health, system_health_queries
+from .kpi import SNAPSHOT_ID, current_period, kpi_cards, section_queries, store_snapshot
+from .models import KPISnapshot
+
+
+def _json(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+
+def _authenticate(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    return result and result[0]
+
+
+def jwt_view(roles=None):
+    """``GET`` only, bearer token required, optionally restricted to ``roles``."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return _json({'detail': f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+            user = await run(_authenticate, request)
+            if user is None or not user.is_active:
+                return _json({'detail': 'Authentication credentials were not provided.'}, status.HTTP_401_UNAUTHORIZED)
+            if roles and user.role not in roles:
+                return _json({'message': 'Forbidden'}, status.HTTP_403_FORBIDDEN)
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def _kpi_snapshot():
+    this_month, last_month = current_period()
+    snapshot = await run(KPISnapshot.objects.filter(pk=SNAPSHOT_ID).first)
+    if snapshot is None or snapshot.period_start != this_month:
+        sections = await gather(section_queries(this_month, last_month))
+        snapshot = await run(store_snapshot, this_month, sections)
+    return snapshot
+
+
+@jwt_view()
+async def dashboard_kpi(request):
+    """Get KPI data for dashboard overview cards"""
+    try:
+        return _json(kpi_cards(await _kpi_snapshot()))
+    except Exception as e:
+        return _json({'message': 'Error fetching KPI data', 'error': str(e)}, status=500)
+
+
+@jwt_view()
+async def dashboard_monthly_stats(request):
+    """Get monthly statistics for dashboard"""
+    try:
+        return _json(monthly_stats(await gather(monthly_stats_queries())))
+    except Exception as e:
+        return _json({'message': 'Error fetching monthly stats', 'error': str(e)}, status=500)
+
+
+@jwt_view(roles=('admin', 'supervisor'))
+async def admin_system_health(request):
+    """Get system health metrics"""
+    try:
+        return _json(system_health(await gather(system_health_queries())))
+    except Exception as e:
+        return _json({'message': 'Error fetching system health', 'error': str(e)}, status=500)
+
+
+@jwt_view()
+async def job_stats(request, technician_id=None, customer_id=None):
+    """Get job statistics (?technician=, ?customer=, ?from=/?to= on creation date)
+
+    The change marker decides the cache key, so the two queries of a miss
+    cannot overlap; the view still frees the event loop while they run.
+    """
+    try:
+        filters = requested_filters(request, technician_id, customer_id)
+    except InvalidFilter as e:
+        return _json({'message': str(e)}, status.HTTP_400_BAD_REQUEST)
+    try:
+        return _json(await run(cached_job_stats, **filters))
+    except Exception as e:
+        return _json({'message': str(e)}, status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,119 @@
+"""Response cache for read-mostly endpoints.
+
+``cached_response`` caches the rendered JSON of successful GET responses.
+The key is built from the endpoint, its URL arguments, the query string,
+the caller's role and the current version of every model the endpoint
+reads. Model versions are counters kept in the cache itself and bumped by
+the signal handlers in ``api.signals`` after each committed write, so an
+edit made through any worker invalidates the entry for all of them (as long
+as the configured cache backend is shared, see ``CACHE_BACKEND``).
+
+Hit and miss counters per endpoint are kept alongside and reported by
+``cache_stats``.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+VERSION_KEY = 'model-version:{}'
+STATS_KEY = 'response-stats:{}:{}'
+
+# endpoints decorated with cached_response, for cache_stats
+_endpoints = set()
+
+
+def _initial_version():
+    # time based so a counter that was evicted never reuses an old value
+    return int(time.time() * 1000)
+
+
+def get_versions(labels):
+    """Return {label: version} for the given model labels."""
+    keys = {VERSION_KEY.format(label): label for label in labels}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, _initial_version(), None)
+        found[key] = cache.get(key)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_version(label):
+    """Invalidate every cached response that depends on ``label``."""
+    key = VERSION_KEY.format(label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def schedule_bump(label):
+    """Bump ``label`` once the current transaction commits."""
+    transaction.on_commit(lambda: bump_version(label), robust=True)
+
+
+def _count(endpoint, outcome):
+    key = STATS_KEY.format(endpoint, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def cache_stats():
+    """Hit/miss counters for every cached endpoint."""
+    keys = {STATS_KEY.format(e, o): (e, o) for e in _endpoints for o in ('hits', 'misses')}
+    values = cache.get_many(keys)
+    stats = {}
+    for key, (endpoint, outcome) in keys.items():
+        stats.setdefault(endpoint, {'hits': 0, 'misses': 0})[outcome] = values.get(key, 0)
+    for counters in stats.values():
+        total = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / total * 100, 1) if total else 0
+    return stats
+
+
+def response_cache_key(endpoint, request, args, kwargs, versions):
+    role = getattr(request.user, 'role', None) or 'anonymous'
+    params = sorted((k, v) for k in request.GET for v in request.GET.getlist(k))
+    raw = repr((args, sorted(kwargs.items()), params, sorted(versions.items())))
+    return f'response:{endpoint}:{role}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def cached_response(*models, timeout=None):
+    """Cache successful GET responses of a DRF function view.
+
+    ``models`` are the ``app_label.ModelName`` labels whose changes must
+    invalidate the cached response. Place the decorator directly above the
+    view function, below ``@api_view`` and the auth decorators.
+    """
+    def decorator(view):
+        endpoint = view.__name__
+        _endpoints.add(endpoint)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            key = response_cache_key(endpoint, request, args, kwargs, get_versions(models))
+            content = cache.get(key)
+            if content is not None:
+                _count(endpoint, 'hits')
+                response = HttpResponse(content, content_type='application/json')
+                response['X-Cache'] = 'HIT'
+                return response
+            _count(endpoint, 'misses')
+            response = view(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                cache.set(key, JSONRenderer().render(response.data),
+                          timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT)
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
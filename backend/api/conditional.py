@@ -0,0 +1,103 @@
+"""Conditional GET (ETag / Last-Modified) for list and detail endpoints.
+
+The validators are derived from cheap change markers, never from the
+response body, so a matching ``If-None-Match`` returns ``304 Not Modified``
+before any serializer runs:
+
+* lists use ``table_fingerprint``: ``MAX(updated_at)`` and ``COUNT(*)`` of
+  every table the response is built from (the count catches deletes);
+* details use ``row_fingerprint``: the row's own ``updated_at`` plus the
+  newest timestamp and the row count of any nested relation (the count
+  catches deleted children).
+
+``If-Modified-Since`` is only honoured for details. ``MAX(updated_at)`` does
+not move when a row is deleted, so for lists only the ETag is trustworthy.
+"""
+import hashlib
+from functools import wraps
+
+from django.apps import apps
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def table_fingerprint(*labels):
+    """Fingerprint every row of the given ``app_label.ModelName`` tables."""
+    def fingerprint(request, *args, **kwargs):
+        parts, newest = [], None
+        for label in labels:
+            marker = apps.get_model(label).objects.aggregate(last=Max('updated_at'), count=Count('pk'))
+            parts.append((label, marker['count'], marker['last'] and marker['last'].isoformat()))
+            if marker['last'] and (newest is None or marker['last'] > newest):
+                newest = marker['last']
+        return parts, newest, False
+    return fingerprint
+
+
+def row_fingerprint(label, *related, lookup='pk'):
+    """Fingerprint the row named by the ``lookup`` URL argument.
+
+    ``related`` are lookups of timestamp columns on nested relations (for
+    example ``'parts_used__added_at'``) whose changes do not touch the
+    row's own ``updated_at``. Each relation is also counted, since deleting
+    a child leaves the newest timestamp unchanged or moves it back.
+    """
+    def fingerprint(request, *args, **kwargs):
+        model = apps.get_model(label)
+        markers = {'updated_at': Max('updated_at')}
+        markers.update({name: Max(name) for name in related})
+        counts = {f'{name}:count': Count(name.rsplit('__', 1)[0], distinct=True) for name in related}
+        markers['found'] = Count('pk', distinct=True)
+        values = model.objects.filter(pk=kwargs[lookup]).aggregate(**markers, **counts)
+        if not values.pop('found'):
+            return None
+        counted = [(name, values.pop(name)) for name in counts]
+        stamps = [v for v in values.values() if v is not None]
+        parts = sorted((k, v.isoformat() if v else None) for k, v in values.items()) + counted
+        return parts, max(stamps) if stamps else None, True
+    return fingerprint
+
+
+def _etag(request, endpoint, args, kwargs, parts):
+    role = getattr(request.user, 'role', None) or 'anonymous'
+    raw = repr((endpoint, role, args, sorted(kwargs.items()), sorted(request.GET.lists()), parts))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def conditional_get(fingerprint):
+    """Answer matching conditional GETs with 304 before the view runs.
+
+    Place below ``@api_view`` and the auth decorators. Successful responses
+    are given ``ETag`` and ``Last-Modified`` headers.
+    """
+    def decorator(view):
+        endpoint = view.__name__
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            marker = fingerprint(request, *args, **kwargs)
+            if marker is None:
+                return view(request, *args, **kwargs)
+            parts, last_modified, trust_date = marker
+            etag = _etag(request, endpoint, args, kwargs, parts)
+
+            if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+            if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+            if if_none_match:
+                not_modified = etag in parse_etags(if_none_match) or '*' in parse_etags(if_none_match)
+            else:
+                not_modified = bool(trust_date and last_modified and if_modified_since
+                                    and int(last_modified.timestamp()) <= if_modified_since)
+
+            response = Response(status=status.HTTP_304_NOT_MODIFIED) if not_modified else view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if last_modified:
+                    response['Last-Modified'] = http_date(last_modified.timestamp())
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,75 @@
+"""Aggregates behind the monthly stats and system health dashboard cards.
+
+Each card is described as a dict of independent query callables plus a
+function that shapes their results, so the WSGI views can run the queries
+in turn (``async_db.run_all``) and the async views concurrently
+(``async_db.gather``).
+"""
+from django.db.models import Avg, Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import User
+from .periods import start_of
+
+ASSIGNED_STATUSES = ('pending', 'in_progress')
+
+
+def monthly_stats_queries():
+    from jobs.models import Job
+    this_month = start_of(timezone.localdate().replace(day=1))
+    completed = Job.objects.filter(status='completed')
+    return {
+        'total_jobs': lambda: Job.objects.filter(created_at__gte=this_month).count(),
+        'revenue': lambda: completed.filter(completed_at__gte=this_month).aggregate(
+            total=Sum('actual_cost'))['total'] or 0,
+        'avg_duration': lambda: completed.filter(actual_hours__isnull=False).aggregate(
+            avg=Avg('actual_hours'))['avg'] or 0,
+        'completion': lambda: completed.aggregate(
+            completed=Count('id'), on_time=Count('id', filter=Q(completed_at__date__lte=F('due_date')))),
+    }
+
+
+def monthly_stats(results):
+    completion = results['completion']
+    on_time = completion['on_time'] / completion['completed'] * 100 if completion['completed'] else 0
+    return {
+        'totalJobs': results['total_jobs'],
+        'monthlyRevenue': float(results['revenue']),
+        'avgJobDuration': f"{results['avg_duration']:.1f}h" if results['avg_duration'] > 0 else '0h',
+        'onTimeCompletion': round(on_time, 1),
+    }
+
+
+def system_health_queries():
+    from inventory.models import Part
+    from jobs.models import Job
+    return {
+        'jobs': lambda: Job.objects.aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='completed')),
+            assigned=Count('id', filter=Q(assigned_technician__isnull=False, status__in=ASSIGNED_STATUSES)),
+        ),
+        'users': lambda: User.objects.aggregate(
+            technicians=Count('id', filter=Q(role='technician', is_active=True)),
+            logged_in=Count('id', filter=Q(last_login__isnull=False)),
+        ),
+        'parts': lambda: Part.objects.aggregate(total=Count('id'), available=Count('id', filter=Q(current_stock__gt=0))),
+    }
+
+
+def _percent(part, whole):
+    return round(part / whole * 100, 1) if whole else 0
+
+
+def system_health(results):
+    jobs, users, parts = results['jobs'], results['users'], results['parts']
+    return {
+        'status': 'healthy',
+        'uptime': '99.9%',  # simplified - in production you'd track actual uptime
+        'lastBackup': timezone.now().isoformat(),
+        'activeConnections': users['logged_in'],
+        'jobCompletionRate': _percent(jobs['completed'], jobs['total']),
+        'technicianUtilization': _percent(jobs['assigned'], users['technicians']),
+        'customerSatisfaction': 96.0,  # this would come from a customer feedback system
+        'partsAvailability': _percent(parts['available'], parts['total']),
+    }
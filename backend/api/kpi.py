@@ -0,0 +1,294 @@
+"""Dashboard KPI snapshot maintenance.
+
+The dashboard reads a single ``KPISnapshot`` row instead of running a query
+per counter. Every section below is computed with one conditional-aggregate
+query over half-open datetime ranges (no ``__date`` lookups, so the
+``created_at``/``completed_at``/``date`` columns stay usable by an index).
+
+Signal handlers in ``api.signals`` call ``schedule_refresh`` for the section
+whose source table changed; ``rebuild_kpi_snapshot`` recomputes everything
+and is also used when the calendar month rolls over.
+"""
+from datetime import timedelta
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .async_db import run_all
+from .models import KPISnapshot
+from .periods import start_of
+
+SNAPSHOT_ID = 1
+SECTIONS = ('jobs', 'sales', 'parts', 'customers', 'technicians')
+
+
+def current_period():
+    """Return (this_month, last_month) as dates for the current local day."""
+    today = timezone.localdate()
+    this_month = today.replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    return this_month, last_month
+
+
+def _jobs(this_month, last_month):
+    from jobs.models import Job
+    this_start, last_start = start_of(this_month), start_of(last_month)
+    completed = Q(status='completed')
+    data = Job.objects.aggregate(
+        total_jobs=Count('id'),
+        pending_jobs=Count('id', filter=Q(status='pending')),
+        completed_jobs=Count('id', filter=completed),
+        in_progress_jobs=Count('id', filter=Q(status='in_progress')),
+        this_month_jobs=Count('id', filter=Q(created_at__gte=this_start)),
+        last_month_jobs=Count('id', filter=Q(created_at__gte=last_start, created_at__lt=this_start)),
+        total_revenue=Sum('actual_cost', filter=completed),
+        this_month_revenue=Sum('actual_cost', filter=completed & Q(completed_at__gte=this_start)),
+        last_month_revenue=Sum(
+            'actual_cost',
+            filter=completed & Q(completed_at__gte=last_start, completed_at__lt=this_start),
+        ),
+    )
+    for key in ('total_revenue', 'this_month_revenue', 'last_month_revenue'):
+        data[key] = data[key] or 0
+    return data
+
+
+def _sales(this_month, last_month):
+    from sales.models import Sale
+    this_start, last_start = start_of(this_month), start_of(last_month)
+    data = Sale.objects.aggregate(
+        total_sales=Count('id'),
+        sales_revenue=Sum('total'),
+        this_month_sales=Count('id', filter=Q(date__gte=this_start)),
+        last_month_sales=Count('id', filter=Q(date__gte=last_start, date__lt=this_start)),
+    )
+    data['sales_revenue'] = data['sales_revenue'] or 0
+    return data
+
+
+def _parts(this_month, last_month):
+    from inventory.models import Part
+    return Part.objects.aggregate(
+        total_parts=Count('id'),
+        low_stock_parts=Count('id', filter=Q(current_stock__lte=F('minimum_threshold'))),
+    )
+
+
+def _customers(this_month, last_month):
+    from inventory.models import Customer
+    return Customer.objects.aggregate(
+        total_customers=Count('id'),
+        active_customers=Count('id', filter=Q(status='active')),
+    )
+
+
+def _technicians(this_month, last_month):
+    return get_user_model().objects.filter(role='technician').aggregate(
+        total_technicians=Count('id'),
+        active_technicians=Count('id', filter=Q(is_active=True)),
+    )
+
+
+_COMPUTE = {
+    'jobs': _jobs,
+    'sales': _sales,
+    'parts': _parts,
+    'customers': _customers,
+    'technicians': _technicians,
+}
+
+
+def section_queries(this_month, last_month):
+    """{section: callable} computing every section, for ``async_db.run_all``/``gather``."""
+    return {section: partial(_COMPUTE[section], this_month, last_month) for section in SECTIONS}
+
+
+def store_snapshot(this_month, sections):
+    """Save the computed ``{section: values}`` as the snapshot of ``this_month``."""
+    values = {'period_start': this_month}
+    for section_values in sections.values():
+        values.update(section_values)
+    snapshot, _ = KPISnapshot.objects.update_or_create(pk=SNAPSHOT_ID, defaults=values)
+    return snapshot
+
+
+def rebuild_kpi_snapshot():
+    """Recompute every section and store the result. Returns the snapshot."""
+    this_month, last_month = current_period()
+    return store_snapshot(this_month, run_all(section_queries(this_month, last_month)))
+
+
+def refresh_kpi_snapshot(*sections):
+    """Recompute only the given sections of the stored snapshot.
+
+    Falls back to a full rebuild when the row is missing or was computed for
+    a previous month (the month-over-month counters would be wrong).
+    """
+    this_month, last_month = current_period()
+    values = {'updated_at': timezone.now()}
+    for section in sections:
+        values.update(_COMPUTE[section](this_month, last_month))
+    updated = KPISnapshot.objects.filter(pk=SNAPSHOT_ID, period_start=this_month).update(**values)
+    if not updated:
+        rebuild_kpi_snapshot()
+
+
+def schedule_refresh(*sections):
+    """Refresh sections once the current transaction commits.
+
+    Sections scheduled within one transaction are collected on the
+    connection and refreshed by a single callback, so a bulk write
+    recomputes each section once instead of once per saved row.
+
+    Failures are logged rather than raised so that a KPI refresh can never
+    break the write that triggered it; the snapshot catches up on the next
+    refresh or rebuild.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'kpi_pending_refresh', None)
+    # the callback is gone once it ran or its transaction was rolled back
+    if pending is not None and any(func is pending[1] for _, func, _ in connection.run_on_commit):
+        pending[0].update(sections)
+        return
+
+    pending_sections = set(sections)
+
+    def refresh():
+        connection.kpi_pending_refresh = None
+        refresh_kpi_snapshot(*(section for section in SECTIONS if section in pending_sections))
+    connection.kpi_pending_refresh = (pending_sections, refresh)
+    transaction.on_commit(refresh, robust=True)
+
+
+def get_kpi_snapshot():
+    """Return the current snapshot, rebuilding it if missing or stale."""
+    this_month, _ = current_period()
+    snapshot = KPISnapshot.objects.filter(pk=SNAPSHOT_ID).first()
+    if snapshot is None or snapshot.period_start != this_month:
+        snapshot = rebuild_kpi_snapshot()
+    return snapshot
+
+
+def kpi_cards(kpi):
+    """The dashboard overview cards for ``kpi``, a ``KPISnapshot``."""
+    total_jobs = kpi.total_jobs
+    pending_jobs = kpi.pending_jobs
+    completed_jobs = kpi.completed_jobs
+    in_progress_jobs = kpi.in_progress_jobs
+    total_revenue = kpi.total_revenue
+    total_sales = kpi.total_sales
+    sales_revenue = kpi.sales_revenue
+    total_parts = kpi.total_parts
+    low_stock_parts = kpi.low_stock_parts
+    total_customers = kpi.total_customers
+    active_customers = kpi.active_customers
+    total_technicians = kpi.total_technicians
+
+    # Monthly comparisons
+    jobs_change = ((kpi.this_month_jobs - kpi.last_month_jobs) / max(kpi.last_month_jobs, 1)) * 100 if kpi.last_month_jobs > 0 else 0
+    revenue_change = ((kpi.this_month_revenue - kpi.last_month_revenue) / max(kpi.last_month_revenue, 1)) * 100 if kpi.last_month_revenue > 0 else 0
+    sales_change = ((kpi.this_month_sales - kpi.last_month_sales) / max(kpi.last_month_sales, 1)) * 100 if kpi.last_month_sales > 0 else 0
+
+    # Build KPI data array
+    kpi_data = [
+        {
+            'title': 'Total Jobs',
+            'value': str(total_jobs),
+            'change': f'{abs(jobs_change):.1f}%',
+            'changeType': 'increase' if jobs_change >= 0 else 'decrease',
+            'icon': 'Briefcase',
+            'color': 'primary'
+        },
+        {
+            'title': 'Pending Jobs',
+            'value': str(pending_jobs),
+            'change': None,
+            'changeType': None,
+            'icon': 'Clock',
+            'color': 'warning'
+        },
+        {
+            'title': 'Completed Jobs',
+            'value': str(completed_jobs),
+            'change': None,
+            'changeType': None,
+            'icon': 'CheckCircle',
+            'color': 'success'
+        },
+        {
+            'title': 'Active Jobs',
+            'value': str(in_progress_jobs),
+            'change': None,
+            'changeType': None,
+            'icon': 'Play',
+            'color': 'accent'
+        },
+        {
+            'title': 'Total Revenue',
+            'value': f'${total_revenue:,.0f}',
+            'change': f'{abs(revenue_change):.1f}%',
+            'changeType': 'increase' if revenue_change >= 0 else 'decrease',
+            'icon': 'DollarSign',
+            'color': 'success'
+        },
+        {
+            'title': 'Total Sales',
+            'value': str(total_sales),
+            'change': f'{abs(sales_change):.1f}%',
+            'changeType': 'increase' if sales_change >= 0 else 'decrease',
+            'icon': 'ShoppingCart',
+            'color': 'primary'
+        },
+        {
+            'title': 'Sales Revenue',
+            'value': f'${sales_revenue:,.0f}',
+            'change': None,
+            'changeType': None,
+            'icon': 'TrendingUp',
+            'color': 'success'
+        },
+        {
+            'title': 'Total Parts',
+            'value': str(total_parts),
+            'change': None,
+            'changeType': None,
+            'icon': 'Package',
+            'color': 'accent'
+        },
+        {
+            'title': 'Low Stock Items',
+            'value': str(low_stock_parts),
+            'change': None,
+            'changeType': None,
+            'icon': 'AlertTriangle',
+            'color': 'warning'
+        },
+        {
+            'title': 'Total Customers',
+            'value': str(total_customers),
+            'change': None,
+            'changeType': None,
+            'icon': 'Users',
+            'color': 'primary'
+        },
+        {
+            'title': 'Active Customers',
+            'value': str(active_customers),
+            'change': None,
+            'changeType': None,
+            'icon': 'UserCheck',
+            'color': 'success'
+        },
+        {
+            'title': 'Total Technicians',
+            'value': str(total_technicians),
+            'change': None,
+            'changeType': None,
+            'icon': 'Wrench',
+            'color': 'accent'
+        }
+    ]
+    return kpi_data
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.kpi import rebuild_kpi_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Recompute the dashboard KPI snapshot from scratch'
+
+    def handle(self, *args, **kwargs):
+        snapshot = rebuild_kpi_snapshot()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt KPI snapshot for {snapshot.period_start}'))
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KPISnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(blank=True, null=True)),
+                ('total_jobs', models.IntegerField(default=0)),
+                ('pending_jobs', models.IntegerField(default=0)),
+                ('completed_jobs', models.IntegerField(default=0)),
+                ('in_progress_jobs', models.IntegerField(default=0)),
+                ('this_month_jobs', models.IntegerField(default=0)),
+                ('last_month_jobs', models.IntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('this_month_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('last_month_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_sales', models.IntegerField(default=0)),
+                ('sales_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('this_month_sales', models.IntegerField(default=0)),
+                ('last_month_sales', models.IntegerField(default=0)),
+                ('total_parts', models.IntegerField(default=0)),
+                ('low_stock_parts', models.IntegerField(default=0)),
+                ('total_customers', models.IntegerField(default=0)),
+                ('active_customers', models.IntegerField(default=0)),
+                ('total_technicians', models.IntegerField(default=0)),
+                ('active_technicians', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
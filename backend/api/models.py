@@ -49,3 +49,48 @@ class OTP(models.Model):
 
     def __str__(self):
         return f"OTP for {self.email}: {self.code}"
+
+
+class KPISnapshot(models.Model):
+    """Materialized dashboard counters, kept as a single row.
+
+    Each section (jobs, sales, parts, customers, technicians) is refreshed by
+    signal handlers in ``api.signals`` when the underlying tables change, so
+    ``dashboard_kpi`` only has to read this row. See ``api.kpi``.
+    """
+    # first day of the month the month-over-month counters were computed for
+    period_start = models.DateField(null=True, blank=True)
+
+    # Jobs
+    total_jobs = models.IntegerField(default=0)
+    pending_jobs = models.IntegerField(default=0)
+    completed_jobs = models.IntegerField(default=0)
+    in_progress_jobs = models.IntegerField(default=0)
+    this_month_jobs = models.IntegerField(default=0)
+    last_month_jobs = models.IntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    this_month_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_month_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Sales
+    total_sales = models.IntegerField(default=0)
+    sales_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    this_month_sales = models.IntegerField(default=0)
+    last_month_sales = models.IntegerField(default=0)
+
+    # Inventory
+    total_parts = models.IntegerField(default=0)
+    low_stock_parts = models.IntegerField(default=0)
+
+    # Customers
+    total_customers = models.IntegerField(default=0)
+    active_customers = models.IntegerField(default=0)
+
+    # Technicians
+    total_technicians = models.IntegerField(default=0)
+    active_technicians = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"KPI snapshot for {self.period_start} (updated {self.updated_at})"
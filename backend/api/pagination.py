@@ -0,0 +1,159 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pages are selected with ``WHERE (col, id) < (last_col, last_id)`` style
+filters instead of ``OFFSET``, so fetching page 500 of the transaction
+ledger costs the same as fetching page 1. The cursor handed to clients is
+an opaque base64 token of the last row's ordering value and id.
+
+Query parameters understood by ``paginate``:
+
+* ``page_size`` - rows per page (capped at ``API_MAX_PAGE_SIZE``)
+* ``cursor`` - ``next_cursor`` from the previous page
+* ``include_total=1`` - add an ``approximate_total`` to the envelope
+* ``paginate=0/1`` - force the legacy bare list or the paginated envelope
+
+Unless ``API_PAGINATE_BY_DEFAULT`` is enabled, requests without any of these
+parameters get the legacy unpaginated list so the current frontend keeps
+working. Endpoints without legacy clients pass ``always=True`` and are
+paginated regardless.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.response import Response
+
+APPROXIMATE_TOTAL_CAP = 10000
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _encode(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (int, str)) or value is None:
+        return value
+    return str(value)
+
+
+class KeysetPaginator:
+    def __init__(self, ordering, page_size=None, max_page_size=None):
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+        self.default_page_size = page_size or getattr(settings, 'API_PAGE_SIZE', 50)
+        self.max_page_size = max_page_size or getattr(settings, 'API_MAX_PAGE_SIZE', 500)
+
+    @property
+    def order_by(self):
+        prefix = '-' if self.descending else ''
+        if self.field == 'id':
+            return (prefix + 'id',)
+        return (prefix + self.field, prefix + 'id')
+
+    def is_requested(self, request):
+        flag = request.GET.get('paginate')
+        if flag is not None:
+            return flag.lower() not in ('0', 'false', 'no')
+        if 'cursor' in request.GET or 'page_size' in request.GET:
+            return True
+        return getattr(settings, 'API_PAGINATE_BY_DEFAULT', False)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET.get('page_size', self.default_page_size))
+        except ValueError:
+            size = self.default_page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, row):
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+        key = [_encode(get('id'))]
+        if self.field != 'id':
+            key.insert(0, _encode(get(self.field)))
+        raw = json.dumps(key, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, model, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if self.field == 'id':
+                value, pk = None, key[0]
+            else:
+                value, pk = key
+                value = model._meta.get_field(self.field).to_python(value)
+            return value, int(pk)
+        except (binascii.Error, ValueError, TypeError, IndexError, ValidationError) as e:
+            raise InvalidCursor(str(e))
+
+    def after(self, model, cursor):
+        value, pk = self.decode_cursor(model, cursor)
+        op = 'lt' if self.descending else 'gt'
+        if self.field == 'id':
+            return Q(**{f'id__{op}': pk})
+        return Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'id__{op}': pk})
+
+    def paginate_queryset(self, queryset, request):
+        """Return (rows, next_cursor) for the requested page."""
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.order_by)
+        cursor = request.GET.get('cursor')
+        if cursor:
+            queryset = queryset.filter(self.after(queryset.model, cursor))
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = self.encode_cursor(rows[-1]) if has_more else None
+        return rows, next_cursor
+
+
+def approximate_count(queryset):
+    """Cheap row count for the envelope.
+
+    Unfiltered MySQL tables use the optimizer's row estimate; anything else
+    is counted exactly up to ``APPROXIMATE_TOTAL_CAP`` rows.
+    """
+    if connection.vendor == 'mysql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] is not None:
+            return row[0]
+    return queryset.order_by()[:APPROXIMATE_TOTAL_CAP].count()
+
+
+def paginate(request, queryset, ordering, serialize, always=False):
+    """Build the list response for ``queryset``.
+
+    ``serialize`` turns a list of rows into JSON-ready data. Returns the
+    legacy bare list when pagination was not requested (and ``always`` is
+    not set), otherwise an envelope with ``results``, ``next_cursor``,
+    ``has_more`` and ``page_size``.
+    """
+    paginator = KeysetPaginator(ordering)
+    if not always and not paginator.is_requested(request):
+        return Response(serialize(queryset))
+    try:
+        rows, next_cursor = paginator.paginate_queryset(queryset, request)
+    except InvalidCursor:
+        return Response({'message': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    data = {
+        'results': serialize(rows),
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+        'page_size': paginator.get_page_size(request),
+    }
+    if request.GET.get('include_total', '').lower() in ('1', 'true', 'yes'):
+        data['approximate_total'] = approximate_count(queryset)
+    return Response(data)
@@ -0,0 +1,85 @@
+"""Calendar buckets for period reports (sales summary, revenue series).
+
+A bucket is a local day, a week starting on Monday or a calendar month, and
+is named by its first day. ``trunc`` maps a date or datetime column onto the
+same buckets in SQL so reports can ``GROUP BY`` it.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import DateField
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .exports import InvalidDateRange, date_range
+
+BUCKETS = ('day', 'week', 'month')
+
+
+class InvalidPeriod(Exception):
+    pass
+
+
+def start_of(day):
+    """Aware datetime of local midnight starting ``day``.
+
+    Filter datetime columns on ``[start_of(a), start_of(b))`` rather than
+    with ``__date`` lookups, which keep an index from being used.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def bucket_start(day, bucket):
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, bucket):
+    if bucket == 'week':
+        return day + timedelta(days=7)
+    if bucket == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def periods(start, end, bucket):
+    """First day of every bucket overlapping ``start``..``end``."""
+    period = bucket_start(start, bucket)
+    while period <= end:
+        yield period
+        period = next_bucket(period, bucket)
+
+
+def trunc(field, bucket):
+    """SQL expression giving the bucket (a date) of ``field``."""
+    return Trunc(field, bucket, output_field=DateField())
+
+
+def requested_days(request, default_days=30):
+    """Return (start, end) from ``?from=`` and ``?to=``.
+
+    Days are local and inclusive; without ``?from=`` the range covers the
+    ``default_days`` up to ``?to=`` (default today). Raises ``InvalidPeriod``.
+    """
+    try:
+        start, end = date_range(request)
+    except InvalidDateRange as e:
+        raise InvalidPeriod(str(e))
+    end = timezone.localdate(end) if end else timezone.localdate()
+    start = timezone.localdate(start) if start else end - timedelta(days=default_days - 1)
+    if start > end:
+        raise InvalidPeriod("'from' must not be after 'to'")
+    if (end - start).days > settings.REPORT_MAX_DAYS:
+        raise InvalidPeriod(f'Range is limited to {settings.REPORT_MAX_DAYS} days')
+    return start, end
+
+
+def requested_period(request, default_days=30, default_bucket='day'):
+    """``requested_days`` plus the ``?bucket=``: return (start, end, bucket)."""
+    bucket = request.GET.get('bucket', default_bucket)
+    if bucket not in BUCKETS:
+        raise InvalidPeriod("'bucket' must be one of day, week, month")
+    return (*requested_days(request, default_days), bucket)
@@ -0,0 +1,55 @@
+"""Revenue time series for the reports page.
+
+Each source is aggregated in SQL with one grouped query over the requested
+range, bucketed with ``api.periods.trunc``:
+
+* job revenue: ``actual_cost`` of completed jobs, by ``completed_at``;
+* job parts cost: ``JobPart.total_cost`` of those same jobs;
+* sales revenue: the daily sales rollup (``sales.rollup``);
+* purchases: value of stock received into inventory (``stock-in`` ledger
+  rows, leaving out stock put back by sale edits and deletions, which are
+  recorded with ``source='sale'``).
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+
+from .periods import periods, start_of, trunc
+
+
+def _grouped(queryset, field, bucket, start, end, **aggregates):
+    rows = (queryset.filter(**{f'{field}__gte': start_of(start), f'{field}__lt': start_of(end + timedelta(days=1))})
+            .values(period=trunc(field, bucket)).annotate(**aggregates))
+    return {row['period']: row for row in rows}
+
+
+def revenue_series(start, end, bucket='month'):
+    """Revenue and costs per ``bucket`` for the days ``start``..``end``, empty buckets included."""
+    from inventory.models import InventoryTransaction
+    from jobs.models import Job, JobPart
+    from sales.rollup import summary
+
+    jobs = _grouped(Job.objects.filter(status='completed'), 'completed_at', bucket, start, end,
+                    revenue=Sum('actual_cost'), count=Count('id'))
+    parts = _grouped(JobPart.objects.filter(job__status='completed'), 'job__completed_at', bucket, start, end,
+                     cost=Sum('total_cost'))
+    purchases = _grouped(InventoryTransaction.objects.filter(type='stock-in').exclude(source='sale'),
+                         'timestamp', bucket, start, end, value=Sum('value'))
+    sales = {row['period']: row for row in summary(start, end, bucket)}
+
+    series = []
+    for period in periods(start, end, bucket):
+        job = jobs.get(period, {})
+        sale = sales[period.isoformat()]
+        job_revenue = float(job.get('revenue') or 0)
+        series.append({
+            'period': period.isoformat(),
+            'revenue': job_revenue + sale['total'],
+            'job_revenue': job_revenue,
+            'sales_revenue': sale['total'],
+            'jobs_completed': job.get('count') or 0,
+            'sales_count': sale['count'],
+            'job_parts_cost': float(parts.get(period, {}).get('cost') or 0),
+            'purchases': float(purchases.get(period, {}).get('value') or 0),
+        })
+    return series
@@ -0,0 +1,66 @@
+"""Signal handlers that keep derived data current.
+
+Writes to the source tables refresh the matching section of the dashboard
+KPI snapshot (``api.kpi``) and bump the model version used to key cached
+API responses (``api.cache``).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from inventory.models import Category, Customer, Part, Supplier
+from inventory.signals import parts_changed
+from jobs.models import Job, JobPart
+from sales.models import Sale
+
+from .cache import schedule_bump
+from .kpi import schedule_refresh
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=Job)
+def job_changed(sender, **kwargs):
+    schedule_refresh('jobs')
+    schedule_bump('jobs.Job')
+
+
+@receiver([post_save, post_delete], sender=Sale)
+def sale_changed(sender, **kwargs):
+    schedule_refresh('sales')
+    schedule_bump('sales.Sale')
+
+
+@receiver([post_save, post_delete], sender=JobPart)
+def job_part_changed(sender, **kwargs):
+    schedule_bump('jobs.JobPart')
+
+
+@receiver([post_save, post_delete], sender=Part)
+@receiver(parts_changed)
+def part_changed(sender, **kwargs):
+    schedule_refresh('parts')
+    schedule_bump('inventory.Part')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, **kwargs):
+    schedule_bump('inventory.Category')
+
+
+@receiver([post_save, post_delete], sender=Supplier)
+def supplier_changed(sender, **kwargs):
+    schedule_bump('inventory.Supplier')
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def customer_changed(sender, **kwargs):
+    schedule_refresh('customers')
+    schedule_bump('inventory.Customer')
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # logins only touch last_login, which nothing derived depends on
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    schedule_refresh('technicians')
+    schedule_bump('api.User')
@@ -0,0 +1,297 @@
+import asyncio
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from inventory.models import Category, Customer, Part
+from inventory.stock import add_stock
+from jobs import views as job_views
+from jobs.models import Job, JobPart
+from sales.models import DailySalesRollup
+
+from . import async_views, views
+from .cache import bump_version, cache_stats, get_versions
+from .kpi import get_kpi_snapshot, rebuild_kpi_snapshot
+from .models import KPISnapshot, User
+
+
+class KPISnapshotTests(TestCase):
+    def setUp(self):
+        # run the refreshes scheduled by the fixtures so each test starts with none pending
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer = Customer.objects.create(name='Tendai')
+            Part.objects.create(part_number='P-1', current_stock=1, minimum_threshold=5)
+        self.customers = Customer.objects.count()
+
+    def make_job(self, **fields):
+        return Job.objects.create(customer=self.customer, customer_name='Tendai', vehicle_model='Hilux',
+                                  vehicle_plate='ABC-1', vehicle_year=2018, service_description='Service',
+                                  estimated_hours=1, estimated_cost=100, due_date=timezone.localdate(), **fields)
+
+    def test_rebuild_counts_every_section(self):
+        self.make_job(status='completed', actual_cost=250, completed_at=timezone.now())
+        self.make_job()
+        snapshot = rebuild_kpi_snapshot()
+        self.assertEqual(snapshot.period_start, timezone.localdate().replace(day=1))
+        self.assertEqual((snapshot.total_jobs, snapshot.pending_jobs, snapshot.completed_jobs), (2, 1, 1))
+        self.assertEqual((snapshot.this_month_jobs, snapshot.this_month_revenue), (2, 250))
+        self.assertEqual((snapshot.total_parts, snapshot.low_stock_parts, snapshot.total_customers), (1, 1, self.customers))
+
+    def test_sections_refresh_after_commit_only(self):
+        rebuild_kpi_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_job()
+            self.assertEqual(KPISnapshot.objects.get().total_jobs, 0)
+        self.assertEqual(KPISnapshot.objects.get().total_jobs, 1)
+
+    def test_one_refresh_per_section_per_transaction(self):
+        rebuild_kpi_snapshot()
+        with self.captureOnCommitCallbacks() as callbacks:
+            for n in range(5):
+                Part.objects.create(part_number=f'Q-{n}', current_stock=0, minimum_threshold=1)
+            Customer.objects.create(name='Chipo')
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(sum('AS "low_stock_parts"' in sql for sql in selects), 1)
+        self.assertEqual(sum('AS "active_customers"' in sql for sql in selects), 1)
+        snapshot = KPISnapshot.objects.get()
+        self.assertEqual((snapshot.total_parts, snapshot.low_stock_parts, snapshot.total_customers), (6, 6, self.customers + 1))
+
+    def test_month_rollover_rebuilds_the_whole_snapshot(self):
+        rebuild_kpi_snapshot()
+        last_month = (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+        KPISnapshot.objects.update(period_start=last_month, total_parts=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_job()
+        snapshot = KPISnapshot.objects.get()
+        self.assertEqual((snapshot.period_start, snapshot.total_jobs, snapshot.total_parts),
+                         (timezone.localdate().replace(day=1), 1, 1))
+
+        KPISnapshot.objects.update(period_start=last_month)
+        self.assertEqual(get_kpi_snapshot().period_start, timezone.localdate().replace(day=1))
+
+    def test_rebuild_command(self):
+        self.make_job()
+        out = StringIO()
+        call_command('rebuild_kpi_snapshot', stdout=out)
+        self.assertIn('Rebuilt KPI snapshot', out.getvalue())
+        self.assertEqual(KPISnapshot.objects.get().total_jobs, 1)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.supervisor = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor')
+        self.technician = User.objects.create_user('tech', 'tech@example.com', 'pw', role='technician')
+        Category.objects.create(name='Brakes')
+
+    def get(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get('/api/inventory/categories/')
+
+    def test_second_get_is_a_hit(self):
+        first, second = self.get(self.supervisor), self.get(self.supervisor)
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(json.loads(second.content), first.data)
+        self.assertEqual(cache_stats()['categories'], {'hits': 1, 'misses': 1, 'hit_rate': 50.0})
+
+    def test_committed_write_invalidates(self):
+        self.get(self.supervisor)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Filters')
+        response = self.get(self.supervisor)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([row['name'] for row in response.data], ['Brakes', 'Filters'])
+
+    def test_no_invalidation_before_commit(self):
+        self.get(self.supervisor)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name='Filters')
+            self.assertEqual(self.get(self.supervisor)['X-Cache'], 'HIT')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get(self.supervisor)['X-Cache'], 'MISS')
+
+    def test_roles_are_cached_separately(self):
+        self.get(self.supervisor)
+        self.assertEqual(self.get(self.technician)['X-Cache'], 'MISS')
+        self.assertEqual(self.get(self.technician)['X-Cache'], 'HIT')
+
+    def test_bump_version(self):
+        before = get_versions(['inventory.Category'])['inventory.Category']
+        bump_version('inventory.Category')
+        self.assertEqual(get_versions(['inventory.Category'])['inventory.Category'], before + 1)
+
+
+class RevenueReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+        self.today = timezone.localdate()
+        customer = Customer.objects.create(name='Tendai')
+        for cost, status in ((200, 'completed'), (300, 'completed'), (999, 'in_progress')):
+            job = Job.objects.create(customer=customer, customer_name='Tendai', vehicle_model='Hilux',
+                                     vehicle_plate='ABC-1', vehicle_year=2018, service_description='Service',
+                                     estimated_hours=1, estimated_cost=cost, due_date=self.today,
+                                     actual_cost=cost, status=status, completed_at=timezone.now())
+            JobPart.objects.create(job=job, part_number='P-1', part_name='Filter', quantity_used=2, unit_cost=15)
+        DailySalesRollup.objects.create(day=self.today, total=120, sale_count=2, items_sold=4)
+        part = Part.objects.create(part_number='P-1', unit_cost=15)
+        add_stock([{'part': part, 'quantity': 10}], notes='Reorder')
+        add_stock([{'part': part, 'quantity': 1, 'value': 50}], notes='Sale #1 deleted - stock restored', source='sale')
+        # the note alone does not make a movement a sale restock
+        add_stock([{'part': part, 'quantity': 1, 'value': 20}], notes='Sale #2 supplier credit')
+
+    def get(self, **params):
+        return self.client.get('/api/auth/reports/revenue', params)
+
+    def test_day_buckets(self):
+        start = self.today - timedelta(days=2)
+        response = self.get(bucket='day', **{'from': start.isoformat(), 'to': self.today.isoformat()})
+        self.assertEqual([row['period'] for row in response.data['results']],
+                         [(start + timedelta(days=n)).isoformat() for n in range(3)])
+        self.assertEqual(response.data['results'][0]['revenue'], 0)
+        self.assertEqual(response.data['results'][-1], {
+            'period': self.today.isoformat(), 'revenue': 620.0, 'job_revenue': 500.0, 'sales_revenue': 120.0,
+            'jobs_completed': 2, 'sales_count': 2, 'job_parts_cost': 60.0, 'purchases': 170.0,
+        })
+
+    def test_default_is_monthly_and_responses_are_cached(self):
+        response = self.get()
+        self.assertEqual(response.data['bucket'], 'month')
+        self.assertEqual(response.data['results'][-1]['period'], self.today.replace(day=1).isoformat())
+        self.assertEqual(response.data['results'][-1]['revenue'], 620.0)
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+        self.assertEqual(self.get(bucket='week')['X-Cache'], 'MISS')
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.get(bucket='year').status_code, 400)
+        self.assertEqual(self.get(**{'from': '2026-02-01', 'to': '2026-01-01'}).status_code, 400)
+        self.assertEqual(self.get(**{'from': date(1990, 1, 1).isoformat()}).status_code, 400)
+
+
+def make_jobs(customer, count, technician=None):
+    today = timezone.localdate()
+    Job.objects.bulk_create([
+        Job(customer=customer, customer_name=customer.name, vehicle_model='Hilux', vehicle_plate=f'ABC-{n}',
+            vehicle_year=2018, service_description='Service', estimated_hours=2, estimated_cost=100,
+            actual_hours=2 + n % 3, actual_cost=100, due_date=today, assigned_technician=technician,
+            status=('pending', 'in_progress', 'completed')[n % 3],
+            completed_at=timezone.now() if n % 3 == 2 else None)
+        for n in range(count)
+    ])
+
+
+class AsyncDashboardViewTests(TransactionTestCase):
+    """The async views run their queries on other threads, so the rows must be committed."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor')
+        self.technician = User.objects.create_user('tech', 'tech@example.com', 'pw', role='technician')
+        make_jobs(Customer.objects.create(name='Tendai'), 9, self.technician)
+        Part.objects.create(part_number='P-1', current_stock=3)
+        Part.objects.create(part_number='P-2', current_stock=0)
+
+    def call_async(self, view, user, path='/', **kwargs):
+        request = AsyncRequestFactory().get(path, headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'})
+        response = async_to_sync(view)(request, **kwargs)
+        return response.status_code, json.loads(response.content)
+
+    def call_sync(self, view, user, path='/', **kwargs):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user)
+        response = view(request, **kwargs)
+        response.render()
+        return response.status_code, json.loads(response.content)
+
+    def test_same_bodies_as_the_sync_views(self):
+        for name, sync_view in (('dashboard_kpi', views.dashboard_kpi),
+                                ('dashboard_monthly_stats', views.dashboard_monthly_stats),
+                                ('admin_system_health', views.admin_system_health),
+                                ('job_stats', job_views.job_stats)):
+            with self.subTest(name):
+                code, body = self.call_async(getattr(async_views, name), self.user)
+                self.assertEqual(code, 200)
+                expected = self.call_sync(sync_view, self.user)[1]
+                if name == 'admin_system_health':
+                    del body['lastBackup'], expected['lastBackup']
+                self.assertEqual(body, expected)
+
+    def test_system_health_counts(self):
+        _, body = self.call_async(async_views.admin_system_health, self.user)
+        self.assertEqual((body['jobCompletionRate'], body['technicianUtilization'], body['partsAvailability']),
+                         (33.3, 600.0, 50.0))
+
+    def test_authentication_and_roles(self):
+        response = async_to_sync(async_views.dashboard_kpi)(AsyncRequestFactory().get('/'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.call_async(async_views.admin_system_health, self.technician)[0], 403)
+        code, body = self.call_async(async_views.job_stats, self.technician, technician_id=self.technician.pk)
+        self.assertEqual((code, body['total_jobs']), (200, 9))
+
+    async def test_csv_exports_stream_under_asgi(self):
+        token = AccessToken.for_user(self.user)
+        response = await self.async_client.get('/api/jobs/export/', headers={'Authorization': f'Bearer {token}'})
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(body.strip().splitlines()), 10)
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class AsyncDashboardBenchmark(TransactionTestCase):
+    """p50/p99 latency of the dashboard aggregates, sync views on worker threads vs async views."""
+    JOBS = 20000
+    CLIENTS = 16
+    REQUESTS = 10
+
+    def test_latency_under_concurrent_load(self):
+        user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor')
+        make_jobs(Customer.objects.create(name='Bench'), self.JOBS)
+        header = f'Bearer {AccessToken.for_user(user)}'
+        names = ('dashboard_monthly_stats', 'admin_system_health')
+
+        def sync_request(name):
+            request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=header)
+            start = time.perf_counter()
+            getattr(views, name)(request).render()
+            return time.perf_counter() - start
+
+        async def async_request(name):
+            request = AsyncRequestFactory().get('/', headers={'Authorization': header})
+            start = time.perf_counter()
+            await getattr(async_views, name)(request)
+            return time.perf_counter() - start
+
+        async def async_load(name):
+            async def client():
+                return [await async_request(name) for _ in range(self.REQUESTS)]
+            return sum(await asyncio.gather(*(client() for _ in range(self.CLIENTS))), [])
+
+        for name in names:
+            # sync: one thread per concurrent client, like a threaded WSGI server
+            with ThreadPoolExecutor(self.CLIENTS) as pool:
+                wsgi = list(pool.map(sync_request, [name] * self.CLIENTS * self.REQUESTS))
+            asgi = asyncio.run(async_load(name))
+            for label, latencies in (('wsgi', wsgi), ('asgi', asgi)):
+                cuts = statistics.quantiles(latencies, n=100)
+                print(f'{name} {label}: p50 {cuts[49] * 1000:.1f}ms p99 {cuts[98] * 1000:.1f}ms')
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from . import views
+from . import async_views, views
+
+aggregates = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path('register', views.register, name='register'),
@@ -19,8 +22,13 @@ urlpatterns += [
     path('admin/technicians/<int:technician_id>', views.delete_technician, name='delete_technician'),
     path('admin/technicians/<int:technician_id>/toggle-active', views.toggle_technician_active, name='toggle_technician_active'),
     path('admin/recent-activity', views.admin_recent_activity, name='admin_recent_activity'),
-    path('admin/system-health', views.admin_system_health, name='admin_system_health'),
+    path('admin/system-health', aggregates.admin_system_health, name='admin_system_health'),
+    path('admin/cache-stats', views.admin_cache_stats, name='admin_cache_stats'),
     # Dashboard endpoints
-    path('dashboard/kpi', views.dashboard_kpi, name='dashboard_kpi'),
-    path('dashboard/monthly-stats', views.dashboard_monthly_stats, name='dashboard_monthly_stats'),
+    path('dashboard/kpi', aggregates.dashboard_kpi, name='dashboard_kpi'),
+    path('dashboard/monthly-stats', aggregates.dashboard_monthly_stats, name='dashboard_monthly_stats'),
+    path('dashboard/active-jobs', views.dashboard_active_jobs, name='dashboard_active_jobs'),
+    path('dashboard/technician-activity', views.dashboard_technician_activity, name='dashboard_technician_activity'),
+    # Reports endpoints
+    path('reports/revenue', views.reports_revenue, name='reports_revenue'),
 ]
@@ -14,6 +14,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from .serializers import RegisterSerializer, LoginSerializer, OTPSerializer, UserSerializer
+from .cache import cached_response
 import logging
 
 User = get_user_model()
@@ -363,20 +364,21 @@ def admin_technicians(request):
         return Response({'message': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        from jobs.models import Job
-        
-        technicians = User.objects.filter(role='technician').order_by('username')
+        from django.db.models import Count
+
+        technicians = User.objects.filter(role='technician').order_by('username').annotate(
+            assigned_jobs_count=Count('technician_jobs')
+        )
         technician_data = []
-        
+
         for tech in technicians:
-            assigned_jobs_count = Job.objects.filter(assigned_technician=tech).count()
             technician_data.append({
                 'id': tech.id,
                 'username': tech.username,
                 'email': tech.email,
                 'is_active': tech.is_active,
                 'last_login': tech.last_login,
-                'assigned_jobs_count': assigned_jobs_count,
+                'assigned_jobs_count': tech.assigned_jobs_count,
                 'date_joined': tech.date_joined
             })
         
@@ -484,45 +486,26 @@ def admin_system_health(request):
         return Response({'message': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        from jobs.models import Job
-        from inventory.models import Part
-        import psutil
-        import os
-        
-        # Calculate system metrics
-        total_jobs = Job.objects.count()
-        completed_jobs = Job.objects.filter(status='Completed').count()
-        completion_rate = (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0
-        
-        # Technician utilization
-        active_technicians = User.objects.filter(role='technician', is_active=True).count()
-        assigned_jobs = Job.objects.filter(assigned_technician__isnull=False, status__in=['Assigned', 'In Progress']).count()
-        technician_utilization = (assigned_jobs / active_technicians * 100) if active_technicians > 0 else 0
-        
-        # Parts availability
-        total_parts = Part.objects.count()
-        available_parts = Part.objects.filter(quantity__gt=0).count()
-        parts_availability = (available_parts / total_parts * 100) if total_parts > 0 else 0
-        
-        # System uptime (simplified - in production you'd track actual uptime)
-        uptime = "99.9%"
-        
-        # Active connections (simplified)
-        active_connections = User.objects.filter(last_login__isnull=False).count()
-        
-        return Response({
-            'status': 'healthy',
-            'uptime': uptime,
-            'lastBackup': timezone.now().isoformat(),
-            'activeConnections': active_connections,
-            'jobCompletionRate': round(completion_rate, 1),
-            'technicianUtilization': round(technician_utilization, 1),
-            'customerSatisfaction': 96.0,  # This would come from customer feedback system
-            'partsAvailability': round(parts_availability, 1)
-        })
+        from .async_db import run_all
+        from .dashboard import system_health, system_health_queries
+        return Response(system_health(run_all(system_health_queries())))
     except Exception as e:
         return Response({'message': 'Error fetching system health', 'error': str(e)}, status=500)
 
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def admin_cache_stats(request):
+    """Get hit/miss counters for the API response cache"""
+    if request.user.role not in ['admin', 'supervisor']:
+        return Response({'message': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+
+    from .cache import cache_stats
+    return Response({
+        'backend': settings.CACHE_BACKEND,
+        'endpoints': cache_stats(),
+    })
+
 # Dashboard KPI endpoints
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
@@ -530,178 +513,10 @@ def admin_system_health(request):
 def dashboard_kpi(request):
     """Get KPI data for dashboard overview cards"""
     try:
-        from jobs.models import Job
-        from inventory.models import Part, Customer, Supplier
-        from sales.models import Sale
-        from django.db.models import Sum, Count, Q
-        from django.utils import timezone
-        from datetime import datetime, timedelta
-        
-        # Calculate date ranges
-        today = timezone.now().date()
-        this_month = today.replace(day=1)
-        last_month = (this_month - timedelta(days=1)).replace(day=1)
-        
-        # Jobs KPIs
-        total_jobs = Job.objects.count()
-        pending_jobs = Job.objects.filter(status='pending').count()
-        completed_jobs = Job.objects.filter(status='completed').count()
-        in_progress_jobs = Job.objects.filter(status='in_progress').count()
-        
-        # Monthly job comparison
-        this_month_jobs = Job.objects.filter(created_at__date__gte=this_month).count()
-        last_month_jobs = Job.objects.filter(
-            created_at__date__gte=last_month,
-            created_at__date__lt=this_month
-        ).count()
-        jobs_change = ((this_month_jobs - last_month_jobs) / max(last_month_jobs, 1)) * 100 if last_month_jobs > 0 else 0
-        
-        # Revenue KPIs
-        total_revenue = Job.objects.filter(status='completed').aggregate(
-            total=Sum('actual_cost')
-        )['total'] or 0
-        
-        this_month_revenue = Job.objects.filter(
-            status='completed',
-            completed_at__date__gte=this_month
-        ).aggregate(total=Sum('actual_cost'))['total'] or 0
-        
-        last_month_revenue = Job.objects.filter(
-            status='completed',
-            completed_at__date__gte=last_month,
-            completed_at__date__lt=this_month
-        ).aggregate(total=Sum('actual_cost'))['total'] or 0
-        
-        revenue_change = ((this_month_revenue - last_month_revenue) / max(last_month_revenue, 1)) * 100 if last_month_revenue > 0 else 0
-        
-        # Sales KPIs
-        total_sales = Sale.objects.count()
-        sales_revenue = Sale.objects.aggregate(total=Sum('total'))['total'] or 0
-        
-        this_month_sales = Sale.objects.filter(date__date__gte=this_month).count()
-        last_month_sales = Sale.objects.filter(
-            date__date__gte=last_month,
-            date__date__lt=this_month
-        ).count()
-        sales_change = ((this_month_sales - last_month_sales) / max(last_month_sales, 1)) * 100 if last_month_sales > 0 else 0
-        
-        # Inventory KPIs
-        total_parts = Part.objects.count()
-        from django.db import models as django_models
-        low_stock_parts = Part.objects.filter(
-            current_stock__lte=django_models.F('minimum_threshold')
-        ).count()
-        
-        # Customer KPIs
-        total_customers = Customer.objects.count()
-        active_customers = Customer.objects.filter(status='active').count()
-        
-        # Technician KPIs
-        total_technicians = User.objects.filter(role='technician').count()
-        active_technicians = User.objects.filter(role='technician', is_active=True).count()
-        
-        # Build KPI data array
-        kpi_data = [
-            {
-                'title': 'Total Jobs',
-                'value': str(total_jobs),
-                'change': f'{abs(jobs_change):.1f}%',
-                'changeType': 'increase' if jobs_change >= 0 else 'decrease',
-                'icon': 'Briefcase',
-                'color': 'primary'
-            },
-            {
-                'title': 'Pending Jobs',
-                'value': str(pending_jobs),
-                'change': None,
-                'changeType': None,
-                'icon': 'Clock',
-                'color': 'warning'
-            },
-            {
-                'title': 'Completed Jobs',
-                'value': str(completed_jobs),
-                'change': None,
-                'changeType': None,
-                'icon': 'CheckCircle',
-                'color': 'success'
-            },
-            {
-                'title': 'Active Jobs',
-                'value': str(in_progress_jobs),
-                'change': None,
-                'changeType': None,
-                'icon': 'Play',
-                'color': 'accent'
-            },
-            {
-                'title': 'Total Revenue',
-                'value': f'${total_revenue:,.0f}',
-                'change': f'{abs(revenue_change):.1f}%',
-                'changeType': 'increase' if revenue_change >= 0 else 'decrease',
-                'icon': 'DollarSign',
-                'color': 'success'
-            },
-            {
-                'title': 'Total Sales',
-                'value': str(total_sales),
-                'change': f'{abs(sales_change):.1f}%',
-                'changeType': 'increase' if sales_change >= 0 else 'decrease',
-                'icon': 'ShoppingCart',
-                'color': 'primary'
-            },
-            {
-                'title': 'Sales Revenue',
-                'value': f'${sales_revenue:,.0f}',
-                'change': None,
-                'changeType': None,
-                'icon': 'TrendingUp',
-                'color': 'success'
-            },
-            {
-                'title': 'Total Parts',
-                'value': str(total_parts),
-                'change': None,
-                'changeType': None,
-                'icon': 'Package',
-                'color': 'accent'
-            },
-            {
-                'title': 'Low Stock Items',
-                'value': str(low_stock_parts),
-                'change': None,
-                'changeType': None,
-                'icon': 'AlertTriangle',
-                'color': 'warning'
-            },
-            {
-                'title': 'Total Customers',
-                'value': str(total_customers),
-                'change': None,
-                'changeType': None,
-                'icon': 'Users',
-                'color': 'primary'
-            },
-            {
-                'title': 'Active Customers',
-                'value': str(active_customers),
-                'change': None,
-                'changeType': None,
-                'icon': 'UserCheck',
-                'color': 'success'
-            },
-            {
-                'title': 'Total Technicians',
-                'value': str(total_technicians),
-                'change': None,
-                'changeType': None,
-                'icon': 'Wrench',
-                'color': 'accent'
-            }
-        ]
-        
-        return Response(kpi_data)
-        
+        from .kpi import get_kpi_snapshot, kpi_cards
+
+        # All counters come from the materialized snapshot (see api.kpi)
+        return Response(kpi_cards(get_kpi_snapshot()))
     except Exception as e:
         return Response({'message': 'Error fetching KPI data', 'error': str(e)}, status=500)
 
@@ -711,50 +526,52 @@ def dashboard_kpi(request):
 def dashboard_monthly_stats(request):
     """Get monthly statistics for dashboard"""
     try:
-        from jobs.models import Job
-        from django.db.models import Sum, Avg, Count
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Calculate current month stats
-        today = timezone.now().date()
-        this_month = today.replace(day=1)
-        
-        # Total jobs this month
-        total_jobs = Job.objects.filter(created_at__date__gte=this_month).count()
-        
-        # Monthly revenue from completed jobs
-        monthly_revenue = Job.objects.filter(
-            status='completed',
-            completed_at__date__gte=this_month
-        ).aggregate(total=Sum('actual_cost'))['total'] or 0
-        
-        # Average job duration (in hours)
-        avg_duration = Job.objects.filter(
-            status='completed',
-            actual_hours__isnull=False
-        ).aggregate(avg=Avg('actual_hours'))['avg'] or 0
-        
-        # Format duration
-        avg_job_duration = f"{avg_duration:.1f}h" if avg_duration > 0 else "0h"
-        
-        # On-time completion rate
-        completed_jobs = Job.objects.filter(status='completed')
-        from django.db import models as django_models
-        on_time_jobs = completed_jobs.filter(
-            completed_at__date__lte=django_models.F('due_date')
-        ).count()
-        total_completed = completed_jobs.count()
-        on_time_completion = (on_time_jobs / total_completed * 100) if total_completed > 0 else 0
-        
-        return Response({
-            'totalJobs': total_jobs,
-            'monthlyRevenue': float(monthly_revenue),
-            'avgJobDuration': avg_job_duration,
-            'onTimeCompletion': round(on_time_completion, 1)
-        })
-        
+        from .async_db import run_all
+        from .dashboard import monthly_stats, monthly_stats_queries
+        return Response(monthly_stats(run_all(monthly_stats_queries())))
     except Exception as e:
         return Response({'message': 'Error fetching monthly stats', 'error': str(e)}, status=500)
 
+
+def _bounded_int(request, name, default, maximum):
+    try:
+        value = int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(1, min(value, maximum))
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def dashboard_active_jobs(request):
+    """Active jobs grouped by status, at most ?limit= (default 10) per column"""
+    from jobs.dashboard import active_jobs
+    return Response({'columns': active_jobs(_bounded_int(request, 'limit', 10, 50))})
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def dashboard_technician_activity(request):
+    """Current job and the latest ?events= (default 5) updates of every active technician"""
+    from jobs.dashboard import technician_activity
+    return Response(technician_activity(_bounded_int(request, 'events', 5, 20)))
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+@cached_response('jobs.Job', 'jobs.JobPart', 'sales.Sale', 'inventory.Part')
+def reports_revenue(request):
+    """Revenue and costs per ?bucket=day|week|month between ?from= and ?to= (default: months of the last year)"""
+    from .periods import InvalidPeriod, requested_period
+    from .reports import revenue_series
+    try:
+        start, end, bucket = requested_period(request, default_days=365, default_bucket='month')
+    except InvalidPeriod as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'bucket': bucket, 'from': start, 'to': end, 'results': revenue_series(start, end, bucket)})
+
+
 # inventory endpoints moved to the inventory app
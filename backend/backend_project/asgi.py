@@ -0,0 +1,13 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_project.settings')
+# serve the async dashboard views (api/async_views.py) unless told otherwise;
+# streaming responses (event stream, CSV exports) switch to async iterators
+# on their own (api.async_db.streaming_content)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+application = get_asgi_application()
+
+# The barcode map is not warmed here as in wsgi.py: ASGI servers usually
+# import the application from inside their event loop, where the ORM cannot
+# be used synchronously. The first scan loads it instead.
@@ -29,6 +29,8 @@ INSTALLED_APPS = [
     'suppliers',
     'sales',
     'jobs',
+    'sync',
+    'events',
 ]
 
 MIDDLEWARE = [
@@ -75,6 +77,14 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend_project.wsgi.application'
+ASGI_APPLICATION = 'backend_project.asgi.application'
+
+# Serve the async dashboard views (api/async_views.py) in place of the sync
+# ones; backend_project.asgi turns this on. Their concurrent queries run on
+# a pool of at most ASYNC_DB_WORKERS threads (and database connections) per
+# process.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False').lower() == 'true'
+ASYNC_DB_WORKERS = int(os.environ.get('ASYNC_DB_WORKERS', '8'))
 
 # Database (MySQL via PythonAnywhere)
 DATABASES = {
@@ -113,6 +123,31 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache used for API responses (see api/cache.py). Local memory is fine for a
+# single worker; with several WSGI workers use 'file' or 'db' so the per-model
+# version counters are shared ('db' needs `python manage.py createcachetable`).
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'regimark',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_response_cache',
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '300'))
+# Job counters (jobs/stats.py) are also keyed on the Job table's change marker
+JOB_STATS_CACHE_TIMEOUT = int(os.environ.get('JOB_STATS_CACHE_TIMEOUT', '30'))
+
 # CORS - Allow all origins in development for easier testing
 if DEBUG:
     CORS_ALLOW_ALL_ORIGINS = True
@@ -145,6 +180,55 @@ REST_FRAMEWORK = {
     ],
 }
 
+# List endpoints (see api/pagination.py). The frontend still expects bare
+# arrays, so pagination is opt-in per request (?page_size= / ?cursor=) until
+# API_PAGINATE_BY_DEFAULT is switched on; ?paginate=0 always returns the old shape.
+API_PAGINATE_BY_DEFAULT = os.environ.get('API_PAGINATE_BY_DEFAULT', 'False').lower() == 'true'
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+# /api/customers/?search= returns at most this many matches (?limit= up to the max)
+CUSTOMER_SEARCH_LIMIT = 20
+CUSTOMER_SEARCH_MAX_LIMIT = 100
+
+# CSV exports (api/exports.py) are streamed this many rows per query
+EXPORT_CHUNK_SIZE = 2000
+
+# Longest range (in days) the period reports (api/periods.py) will bucket
+REPORT_MAX_DAYS = 3660
+
+# Parts CSV import (inventory/importer.py) works through the file this many rows at a time
+IMPORT_BATCH_SIZE = 1000
+
+# Barcode scans are served from a per-worker map (inventory/barcode_cache.py)
+# loaded when the worker starts; set BARCODE_CACHE_WARM=False to load it on
+# the first scan instead.
+BARCODE_CACHE_WARM = os.environ.get('BARCODE_CACHE_WARM', 'True').lower() == 'true'
+BARCODE_BATCH_MAX = 500
+
+# Delta sync (/api/sync/). Tombstones of deleted rows are pruned after
+# SYNC_TOMBSTONE_RETENTION_DAYS (manage.py prune_tombstones); clients with an
+# older token must resync from scratch.
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 2000
+SYNC_OVERLAP_SECONDS = 5
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# Live updates (/api/events/stream/). Each stream polls the event table every
+# EVENTS_POLL_SECONDS and is closed after EVENTS_STREAM_SECONDS so it does not
+# pin a worker; browsers reconnect after EVENTS_RETRY_MS and resume from the
+# last event id. Ids are taken at insert but can commit out of order, so each
+# poll also re-reads the last EVENTS_OVERLAP_SECONDS of events (longer than a
+# reconnect). Events are pruned after EVENTS_RETENTION_HOURS
+# (manage.py prune_events).
+EVENTS_POLL_SECONDS = float(os.environ.get('EVENTS_POLL_SECONDS', '2'))
+EVENTS_STREAM_SECONDS = int(os.environ.get('EVENTS_STREAM_SECONDS', '60'))
+EVENTS_KEEPALIVE_SECONDS = 15
+EVENTS_RETRY_MS = 3000
+EVENTS_OVERLAP_SECONDS = 10
+EVENTS_BATCH_SIZE = 100
+EVENTS_RETENTION_HOURS = int(os.environ.get('EVENTS_RETENTION_HOURS', '24'))
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -15,6 +15,8 @@ urlpatterns = [
     path('api/suppliers/', include('suppliers.urls')),
     path('api/sales/', include('sales.urls')),
     path('api/jobs/', include('jobs.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/events/', include('events.urls')),
 ]
 
 # Serve static files in development
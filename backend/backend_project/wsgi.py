@@ -3,3 +3,14 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_project.settings')
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.BARCODE_CACHE_WARM:
+    from django.db import DatabaseError  # noqa: E402
+    from inventory.barcode_cache import barcode_cache  # noqa: E402
+    try:
+        barcode_cache.warm()
+    except DatabaseError:
+        # not migrated yet or the database is down; the first scan loads it
+        pass
@@ -2,15 +2,20 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from inventory.models import Customer
 from inventory.serializers import CustomerSerializer
-from inventory.views import decode_jwt_from_request
+from inventory.views import decode_jwt_from_request, search_limit
+from api.conditional import conditional_get, row_fingerprint, table_fingerprint
+from api.pagination import paginate
 
 
 @api_view(['GET', 'POST'])
+@conditional_get(table_fingerprint('inventory.Customer'))
 def customers(request):
     if request.method == 'GET':
+        search = request.GET.get('search', '').strip()
+        if search:
+            return Response(CustomerSerializer(Customer.objects.search(search, search_limit(request)), many=True).data)
         qs = Customer.objects.all()
-        serializer = CustomerSerializer(qs, many=True)
-        return Response(serializer.data)
+        return paginate(request, qs, 'id', lambda rows: CustomerSerializer(rows, many=True).data)
     payload, err = decode_jwt_from_request(request)
     if err:
         return Response(err, status=401)
@@ -24,6 +29,7 @@ def customers(request):
 
 
 @api_view(['GET', 'PATCH', 'DELETE'])
+@conditional_get(row_fingerprint('inventory.Customer'))
 def customer_detail(request, pk):
     try:
         cust = Customer.objects.get(pk=pk)
@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import Event
+
+
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'roles', 'user', 'created_at')
+    list_filter = ('kind',)
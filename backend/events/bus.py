@@ -0,0 +1,156 @@
+"""Domain events for the live ``text/event-stream`` endpoint.
+
+Write paths ``publish`` an event; it is stored in the ``Event`` table once
+the surrounding transaction commits, so rolled back writes never announce
+anything. Each streaming request tails the table from the client's last
+seen id, which works no matter how many workers serve the streams. Events
+are addressed to roles and/or a single user and a client only receives
+events for its own role or its own id.
+
+Ids are handed out at insert, so a writer can commit id 10 after another
+has committed id 11 and a stream may already have moved past 10. Every
+poll therefore also re-reads the events created in the last
+``EVENTS_OVERLAP_SECONDS`` and sends those it has not sent yet. A resumed
+stream cannot know which of them the client already has and sends the
+whole window again; clients ignore event ids they have seen.
+
+Rows are only needed until every client has caught up; ``prune_events``
+deletes them after ``EVENTS_RETENTION_HOURS``.
+"""
+import asyncio
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from api.async_db import run
+from api.models import User
+
+from .models import Event
+
+STAFF = ('admin', 'supervisor')
+EVERYONE = tuple(role for role, _ in User.ROLE_CHOICES)
+
+
+def _audience(roles):
+    return f",{','.join(roles)}," if roles else ''
+
+
+def publish(kind, data, roles=STAFF, user=None):
+    """Record ``kind`` for ``roles`` and ``user`` when the transaction commits.
+
+    ``data`` may be a callable, evaluated at commit time, for payloads that
+    should reflect the committed state; returning ``None`` drops the event.
+    """
+    user_id = getattr(user, 'pk', user)
+
+    def write():
+        payload = data() if callable(data) else data
+        if payload is not None:
+            Event.objects.create(kind=kind, data=payload, roles=_audience(roles), user_id=user_id)
+    transaction.on_commit(write, robust=True)
+
+
+def visible_to(user):
+    return Event.objects.filter(Q(roles__contains=f',{user.role},') | Q(user=user))
+
+
+def latest_id():
+    return Event.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def events_after(user, last_id, since=None, floor=0, skip=(), limit=None):
+    """Events for ``user`` after ``last_id``, in id order.
+
+    With ``since``, events created since then with an id above ``floor`` are
+    included too, except the ``skip`` ids.
+    """
+    limit = limit or settings.EVENTS_BATCH_SIZE
+    condition = Q(id__gt=last_id)
+    if since is not None:
+        condition |= Q(id__gt=floor, created_at__gte=since)
+    return list(visible_to(user).filter(condition).exclude(id__in=skip).order_by('id')[:limit])
+
+
+def format_event(event):
+    data = json.dumps({'at': event.created_at, **event.data}, cls=DjangoJSONEncoder)
+    return f'id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n'
+
+
+class _Tail:
+    """Position of one stream in the event table, kept between polls."""
+
+    def __init__(self, user, last_id, resumed):
+        self.user = user
+        self.last_id = last_id
+        self.floor = 0 if resumed else last_id
+        self.sent = {}  # id: created_at of the events sent within the overlap
+        self.deadline = time.monotonic() + settings.EVENTS_STREAM_SECONDS
+        self.last_sent = time.monotonic()
+
+    def poll(self):
+        """Return (chunks to send, seconds until the next poll or ``None`` to end the stream)."""
+        since = timezone.now() - timedelta(seconds=settings.EVENTS_OVERLAP_SECONDS)
+        self.sent = {pk: at for pk, at in self.sent.items() if at >= since}
+        events = events_after(self.user, self.last_id, since=since, floor=self.floor, skip=self.sent)
+        chunks = []
+        for event in events:
+            self.last_id = max(self.last_id, event.id)
+            self.sent[event.id] = event.created_at
+            chunks.append(format_event(event))
+        if len(events) == settings.EVENTS_BATCH_SIZE:
+            return chunks, 0
+
+        now = time.monotonic()
+        if now >= self.deadline:
+            return chunks, None
+        if events:
+            self.last_sent = now
+        elif now - self.last_sent >= settings.EVENTS_KEEPALIVE_SECONDS:
+            self.last_sent = now
+            chunks.append(': keepalive\n\n')
+        return chunks, settings.EVENTS_POLL_SECONDS
+
+
+def event_stream(user, last_id, resumed=True):
+    """Yield server-sent events for ``user`` after ``last_id``.
+
+    A new (not ``resumed``) stream only re-reads events above ``last_id``,
+    since the client loads the current state when it connects.
+
+    The stream ends after ``EVENTS_STREAM_SECONDS`` so a worker is not held
+    forever; ``EventSource`` reconnects by itself and resumes from the
+    ``Last-Event-ID`` it last saw. Quiet streams get a comment every
+    ``EVENTS_KEEPALIVE_SECONDS`` to keep proxies from closing them.
+    """
+    tail = _Tail(user, last_id, resumed)
+    yield f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+    while True:
+        chunks, delay = tail.poll()
+        yield from chunks
+        if delay is None:
+            return
+        time.sleep(delay)
+
+
+async def aevent_stream(user, last_id, resumed=True):
+    """``event_stream`` for ASGI servers.
+
+    Polls run on the query pool (``api.async_db``) and waits are
+    ``asyncio.sleep``, so an open stream holds neither a thread nor the
+    event loop between polls.
+    """
+    tail = _Tail(user, last_id, resumed)
+    yield f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+    while True:
+        chunks, delay = await run(tail.poll)
+        for chunk in chunks:
+            yield chunk
+        if delay is None:
+            return
+        await asyncio.sleep(delay)
@@ -0,0 +1,17 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from api.models import User
+
+
+class Event(models.Model):
+    """A domain event waiting to be streamed to clients (see events.bus)."""
+    kind = models.CharField(max_length=50)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # ',admin,supervisor,' - every role that receives the event
+    roles = models.CharField(max_length=100, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='events')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} at {self.created_at:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,100 @@
+"""Publish domain events from the existing write paths.
+
+Every status change of a job is recorded as a ``JobStatusHistory`` row, so
+status events hang off that model; assignments are detected by comparing a
+job's technicians before and after it is saved. Stock levels only move
+through ``inventory.stock``, which sends ``parts_changed``.
+"""
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from inventory.models import Part
+from inventory.signals import parts_changed
+from jobs.models import Job, JobStatusHistory, TechnicianMessage
+from sales.models import Sale
+
+from .bus import EVERYONE, publish
+
+_TECHNICIAN_FIELDS = {'assigned_technician', 'technician'}
+
+
+def _technician(job):
+    return job.assigned_technician_id or job.technician_id
+
+
+def _job(job):
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'priority': job.priority,
+        'customer_name': job.customer_name,
+        'vehicle_plate': job.vehicle_plate,
+        'technician_id': _technician(job),
+    }
+
+
+@receiver(pre_save, sender=Job)
+def remember_technician(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields and not _TECHNICIAN_FIELDS & set(update_fields)):
+        instance._previous_technician = None if instance.pk is None else _technician(instance)
+        return
+    previous = Job.objects.filter(pk=instance.pk).values_list('assigned_technician', 'technician').first()
+    instance._previous_technician = previous and (previous[0] or previous[1])
+
+
+@receiver(post_save, sender=Job)
+def job_assigned(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    previous, current = getattr(instance, '_previous_technician', None), _technician(instance)
+    if previous == current:
+        return
+    publish('job.assigned', _job(instance), user=current)
+    if previous:
+        publish('job.unassigned', {**_job(instance), 'previous_technician_id': previous}, roles=(), user=previous)
+
+
+@receiver(post_save, sender=JobStatusHistory)
+def job_status_changed(sender, instance, created, raw=False, **kwargs):
+    if raw or not created or instance.old_status == instance.new_status:
+        return
+    job = instance.job
+    publish('job.created' if not instance.old_status else 'job.status', {
+        **_job(job),
+        'old_status': instance.old_status,
+        'new_status': instance.new_status,
+        'changed_by': instance.changed_by_id,
+        'notes': instance.notes,
+    }, user=_technician(job))
+
+
+@receiver(post_save, sender=TechnicianMessage)
+def message_sent(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    publish('message.created', {
+        'message_id': instance.id,
+        'job_id': instance.job_id,
+        'sender_id': instance.sender_id,
+        'sender': instance.sender.username,
+        'message': instance.message[:200],
+    }, roles=(), user=instance.recipient_id)
+
+
+@receiver(post_save, sender=Sale)
+def sale_created(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    pk = instance.pk
+    # the total and stock are final only once the whole sale has been written
+    publish('sale.created', lambda: Sale.objects.filter(pk=pk).values(
+        'id', 'date', 'total', 'customer_id', 'customer__name').first())
+
+
+@receiver(parts_changed)
+def stock_moved(sender, part_ids, fields=None, **kwargs):
+    if fields is not None and 'current_stock' not in fields:
+        return
+    part_ids = list(part_ids)
+    publish('stock.changed', lambda: {'parts': list(Part.objects.filter(pk__in=part_ids).values(
+        'id', 'part_number', 'current_stock', 'minimum_threshold'))}, roles=EVERYONE)
@@ -0,0 +1,114 @@
+import time
+from datetime import date, timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import User
+from inventory.models import Customer, Part
+from inventory.stock import remove_stock
+from jobs.models import Job, JobStatusHistory, TechnicianMessage
+from sales.models import Sale
+
+from .bus import event_stream, publish
+from .models import Event
+
+
+@override_settings(EVENTS_STREAM_SECONDS=0)
+class EventStreamTests(TestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor')
+        self.tendai = User.objects.create_user('tendai', 'tendai@example.com', 'pw', role='technician')
+        self.chipo = User.objects.create_user('chipo', 'chipo@example.com', 'pw', role='technician')
+        customer = Customer.objects.create(name='Tendai')
+        self.job = Job.objects.create(customer=customer, customer_name='Tendai', vehicle_model='Corolla',
+                                      vehicle_plate='ABC-123', vehicle_year=2015, service_description='Brakes',
+                                      estimated_hours=2, estimated_cost=100, due_date=date.today())
+
+    def read(self, user, last_event_id=0):
+        response = self.client.get('/api/events/stream/', {'token': str(AccessToken.for_user(user))},
+                                   HTTP_LAST_EVENT_ID=str(last_event_id))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        return [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+
+    def test_write_paths_publish_after_commit(self):
+        part = Part.objects.create(part_number='P-1', current_stock=5, unit_cost=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.assigned_technician = self.tendai
+            self.job.save()
+            JobStatusHistory.objects.create(job=self.job, old_status='pending', new_status='in_progress',
+                                            changed_by=self.tendai)
+            TechnicianMessage.objects.create(job=self.job, sender=self.supervisor, recipient=self.tendai,
+                                             message='Parts are in')
+            remove_stock([{'part': part, 'quantity': 2}])
+            Sale.objects.create(total=20)
+        self.assertEqual(list(Event.objects.order_by('id').values_list('kind', flat=True)),
+                         ['job.assigned', 'job.status', 'message.created', 'stock.changed', 'sale.created'])
+        self.assertEqual(Event.objects.get(kind='stock.changed').data['parts'][0]['current_stock'], 3)
+
+    def test_nothing_is_published_without_a_commit(self):
+        self.job.assigned_technician = self.tendai
+        self.job.save()
+        self.assertFalse(Event.objects.exists())
+
+    def test_stream_is_filtered_by_role_and_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            publish('sale.created', {'id': 1})
+            publish('job.assigned', {'job_id': self.job.pk}, user=self.tendai)
+            publish('stock.changed', {'parts': []}, roles=('admin', 'supervisor', 'technician'))
+        self.assertEqual(self.read(self.supervisor), ['sale.created', 'job.assigned', 'stock.changed'])
+        self.assertEqual(self.read(self.tendai), ['job.assigned', 'stock.changed'])
+        self.assertEqual(self.read(self.chipo), ['stock.changed'])
+
+    def test_resume_from_last_event_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            publish('job.status', {'job_id': 1})
+            publish('job.status', {'job_id': 2})
+        first = Event.objects.order_by('id').first()
+        # outside the overlap that a resumed stream sends again
+        Event.objects.filter(pk=first.pk).update(created_at=first.created_at - timedelta(minutes=5))
+        response = self.client.get('/api/events/stream/', {'token': str(AccessToken.for_user(self.supervisor))},
+                                   HTTP_LAST_EVENT_ID=str(first.pk))
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'id: {first.pk + 1}\n', body)
+        self.assertNotIn(f'id: {first.pk}\n', body)
+        self.assertTrue(body.startswith('retry: '))
+
+    @override_settings(EVENTS_STREAM_SECONDS=1, EVENTS_POLL_SECONDS=0.05)
+    def test_event_committed_after_a_higher_id_is_still_sent(self):
+        stream = event_stream(self.supervisor, 0)
+        next(stream)
+        Event.objects.create(pk=100, kind='job.status', data={}, roles=',supervisor,')
+        self.assertIn('id: 100\n', next(stream))
+        # a writer that took id 99 commits after 100 was sent
+        Event.objects.create(pk=99, kind='job.status', data={}, roles=',supervisor,')
+        self.assertIn('id: 99\n', next(stream))
+        self.assertEqual([chunk for chunk in stream if chunk.startswith('id: ')], [])
+
+    def test_rejects_missing_or_bad_token(self):
+        self.assertEqual(self.client.get('/api/events/stream/').status_code, 401)
+        self.assertEqual(self.client.get('/api/events/stream/', {'token': 'nope'}).status_code, 401)
+
+
+@override_settings(EVENTS_STREAM_SECONDS=1, EVENTS_POLL_SECONDS=0.05)
+class AsgiEventStreamTests(TransactionTestCase):
+    """Under ASGI the stream polls on other threads, so the rows must be committed."""
+
+    def setUp(self):
+        self.supervisor = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor')
+        self.event = Event.objects.create(kind='job.status', data={'job_id': 1}, roles=',supervisor,')
+
+    async def test_events_are_sent_as_they_are_read(self):
+        started = time.monotonic()
+        response = await self.async_client.get(
+            '/api/events/stream/', {'token': str(AccessToken.for_user(self.supervisor))},
+            headers={'Last-Event-ID': str(self.event.pk - 1)})
+        self.assertTrue(response.is_async)
+        arrived = {}
+        async for chunk in response.streaming_content:
+            arrived.setdefault(chunk.decode().split('\n', 1)[0], time.monotonic() - started)
+        self.assertIn(f'id: {self.event.pk}', arrived)
+        # sent on the first poll, not when the stream closes a second later
+        self.assertLess(arrived[f'id: {self.event.pk}'], 0.5)
+        self.assertGreaterEqual(time.monotonic() - started, 1)
@@ -0,0 +1,52 @@
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from api.async_db import served_by_asgi
+
+from .bus import aevent_stream, event_stream, latest_id
+
+
+def _authenticate(request):
+    """The user of the bearer token, or of ``?token=`` (``EventSource`` cannot send headers)."""
+    auth = JWTAuthentication()
+    try:
+        result = auth.authenticate(request)
+        if result is not None:
+            return result[0]
+        if request.GET.get('token'):
+            return auth.get_user(auth.get_validated_token(request.GET['token']))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        pass
+    return None
+
+
+def stream(request):
+    """Server-sent events for the caller's role and user.
+
+    Resumes after the ``Last-Event-ID`` header (or ``?last_event_id=``);
+    without one only events published from now on are sent.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'message': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+    user = _authenticate(request)
+    if user is None or not user.is_active:
+        return JsonResponse({'message': 'Authentication credentials were not provided or are invalid'},
+                            status=status.HTTP_401_UNAUTHORIZED)
+
+    last_id = request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('last_event_id')
+    try:
+        resumed = bool(last_id)
+        last_id = int(last_id) if resumed else latest_id()
+    except ValueError:
+        return JsonResponse({'message': 'Invalid Last-Event-ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # ASGI servers drain a sync iterator completely before sending any of it
+    stream = aevent_stream if served_by_asgi(request) else event_stream
+    response = StreamingHttpResponse(stream(user, last_id, resumed), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # stop nginx (PythonAnywhere, most reverse proxies) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
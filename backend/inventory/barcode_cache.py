@@ -0,0 +1,136 @@
+"""In-process part_number -> part record map for barcode scans.
+
+Each worker keeps every part as a ready-to-send record keyed by its
+normalized part number, so a scan is a dictionary lookup instead of a
+query plus a nested serializer. The map is warmed when the worker starts
+(``backend_project.wsgi``) and kept coherent with the model versions that
+the Part and Category signal handlers bump in ``api.cache``:
+
+* before answering, the versions are read from the shared cache (one
+  ``get_many``);
+* if ``inventory.Part`` moved, parts with a newer ``updated_at`` are
+  reloaded and parts deleted since the last load (``sync.Tombstone``) are
+  dropped;
+* if ``inventory.Category`` moved, the whole map is rebuilt, since
+  renaming a category does not touch its parts.
+
+Coherence across workers therefore needs a shared ``CACHE_BACKEND``.
+"""
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from api.cache import get_versions
+
+from .models import Part
+
+LABELS = ('inventory.Part', 'inventory.Category')
+_FIELDS = (
+    'id', 'part_number', 'description', 'current_stock', 'minimum_threshold', 'supplier',
+    'unit_cost', 'unit', 'location', 'notes', 'category_id', 'category__name', 'category__description',
+)
+
+
+def normalize_code(code):
+    return str(code or '').strip().casefold()
+
+
+def _record(row):
+    # same shape as PartSerializer so scan responses do not change
+    category = None
+    if row['category_id'] is not None:
+        category = {'id': row['category_id'], 'name': row['category__name'],
+                    'description': row['category__description']}
+    return {
+        'id': row['id'],
+        'part_number': row['part_number'],
+        'description': row['description'],
+        'category': category,
+        'current_stock': row['current_stock'],
+        'minimum_threshold': row['minimum_threshold'],
+        'supplier': row['supplier'],
+        'unit_cost': str(row['unit_cost']),
+        'unit': row['unit'],
+        'location': row['location'],
+        'notes': row['notes'],
+    }
+
+
+class BarcodeCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_code = {}
+        self._code_of = {}
+        self._versions = None
+        self._loaded_at = None
+
+    def _store(self, row):
+        record = _record(row)
+        old = self._code_of.get(record['id'])
+        if old is not None:
+            self._by_code.pop(old, None)
+        code = normalize_code(record['part_number'])
+        self._by_code[code] = record
+        self._code_of[record['id']] = code
+
+    def _drop(self, part_id):
+        code = self._code_of.pop(part_id, None)
+        if code is not None:
+            self._by_code.pop(code, None)
+
+    def _full_load(self, versions):
+        started = timezone.now()
+        by_code, code_of = {}, {}
+        for row in Part.objects.values(*_FIELDS).iterator(chunk_size=2000):
+            code = normalize_code(row['part_number'])
+            by_code[code] = _record(row)
+            code_of[row['id']] = code
+        # swapped in whole so concurrent scans never see a half built map
+        self._by_code, self._code_of = by_code, code_of
+        self._versions, self._loaded_at = versions, started
+
+    def _delta_load(self, versions):
+        from sync.models import Tombstone
+        started = timezone.now()
+        # overlap so rows committed late with an older updated_at are not missed
+        since = self._loaded_at - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        for row in Part.objects.filter(updated_at__gte=since).values(*_FIELDS).iterator(chunk_size=2000):
+            self._store(row)
+        deleted = Tombstone.objects.filter(model='inventory.Part', deleted_at__gte=since)
+        for part_id in deleted.values_list('object_id', flat=True):
+            self._drop(part_id)
+        self._versions, self._loaded_at = versions, started
+
+    def refresh(self):
+        """Bring the map up to date with the current model versions."""
+        versions = get_versions(LABELS)
+        if versions == self._versions:
+            return
+        with self._lock:
+            if versions == self._versions:
+                return
+            if self._versions is None or versions['inventory.Category'] != self._versions['inventory.Category']:
+                self._full_load(versions)
+            else:
+                self._delta_load(versions)
+
+    def warm(self):
+        with self._lock:
+            self._full_load(get_versions(LABELS))
+
+    def get(self, code):
+        self.refresh()
+        return self._by_code.get(normalize_code(code))
+
+    def get_many(self, codes):
+        """Return {code: record or None} for ``codes``."""
+        self.refresh()
+        return {code: self._by_code.get(normalize_code(code)) for code in codes}
+
+    def __len__(self):
+        return len(self._by_code)
+
+
+barcode_cache = BarcodeCache()
@@ -0,0 +1,238 @@
+"""Bulk parts import from CSV.
+
+The CSV is read row by row and handled ``IMPORT_BATCH_SIZE`` rows at a
+time. For each batch:
+
+* the categories named in the batch are resolved with one query (missing
+  ones are created with one ``bulk_create``);
+* the existing parts are loaded with one ``select_for_update`` query keyed
+  by ``part_number``;
+* new parts go in with ``bulk_create``, changed parts with ``bulk_update``
+  of just the columns present in the file, and every stock change writes
+  an ``adjustment`` ledger row with the signed difference.
+
+Only columns present in the header are touched, so a supplier price list
+with ``part_number,unit_cost`` updates prices and nothing else. The export
+header (``/api/inventory/export/``) and the frontend's camelCase names are
+both accepted.
+
+The whole import is one transaction: if any row is invalid nothing is
+written and every error is reported. With ``dry_run`` the same report is
+produced without writing anything.
+"""
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, InventoryTransaction, Part
+from .signals import parts_changed
+
+TEXT_FIELDS = ('description', 'supplier', 'unit', 'location', 'notes')
+INT_FIELDS = ('current_stock', 'minimum_threshold')
+ALIASES = {
+    'partnumber': 'part_number',
+    'currentstock': 'current_stock',
+    'minimumthreshold': 'minimum_threshold',
+    'unitcost': 'unit_cost',
+}
+MAX_ERRORS = 100
+MAX_CHANGES = 200
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def _columns(fieldnames):
+    """Map CSV header names to Part fields, ignoring unknown columns."""
+    known = {'part_number', 'category', 'unit_cost', *TEXT_FIELDS, *INT_FIELDS}
+    columns = {}
+    for name in fieldnames or ():
+        key = (name or '').strip().lower().replace(' ', '_')
+        key = ALIASES.get(key.replace('_', ''), key)
+        if key in known:
+            columns[name] = key
+    if 'part_number' not in columns.values():
+        raise ImportFormatError('The CSV needs a part_number column')
+    return columns
+
+
+def _parse(row, columns):
+    values = {}
+    for name, field in columns.items():
+        raw = (row.get(name) or '').strip()
+        if field in INT_FIELDS:
+            try:
+                values[field] = int(raw or 0)
+            except ValueError:
+                values[field] = -1
+            if values[field] < 0:
+                raise ValueError(f'{field} must be a whole number of 0 or more')
+        elif field == 'unit_cost':
+            try:
+                values[field] = Decimal(raw or 0).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                values[field] = Decimal(-1)
+            if not values[field].is_finite() or values[field] < 0:
+                raise ValueError('unit_cost must be a number of 0 or more')
+        else:
+            values[field] = raw
+    if not values['part_number']:
+        raise ValueError('part_number is required')
+    if 'unit' in values and not values['unit']:
+        del values['unit']  # keep the model default / current unit
+    return values
+
+
+def _batches(reader, size):
+    batch = []
+    # line 1 is the header
+    for line, row in enumerate(reader, start=2):
+        batch.append((line, row))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Import:
+    def __init__(self, dry_run, notes):
+        self.dry_run = dry_run
+        self.notes = notes
+        self.categories = {}
+        self.seen = set()
+        self.created_ids, self.updated_ids, self.updated_fields = [], [], set()
+        self.report = {
+            'dry_run': dry_run, 'created': 0, 'updated': 0, 'unchanged': 0,
+            'categories_created': [], 'errors': [], 'changes': [],
+        }
+
+    @property
+    def writing(self):
+        return not self.dry_run and not self.report['errors']
+
+    def error(self, line, message, part_number=None):
+        if len(self.report['errors']) < MAX_ERRORS:
+            self.report['errors'].append({'line': line, 'part_number': part_number, 'message': message})
+        else:
+            self.report['errors_truncated'] = True
+
+    def change(self, line, part_number, action, fields):
+        if len(self.report['changes']) < MAX_CHANGES:
+            self.report['changes'].append({'line': line, 'part_number': part_number, 'action': action, 'fields': fields})
+
+    def resolve_categories(self, names):
+        names = {n for n in names if n and n not in self.categories}
+        if not names:
+            return
+        found = dict(Category.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = sorted(names - found.keys())
+        if missing:
+            self.report['categories_created'] += missing
+            if self.writing:
+                Category.objects.bulk_create([Category(name=n) for n in missing])
+                found.update(Category.objects.filter(name__in=missing).values_list('name', 'id'))
+        for name in names:
+            # None: to be created by a dry run
+            self.categories[name] = found.get(name)
+
+    def batch(self, rows, columns):
+        number_column = next(name for name, field in columns.items() if field == 'part_number')
+        parsed = []
+        for line, row in rows:
+            try:
+                values = _parse(row, columns)
+            except ValueError as e:
+                self.error(line, str(e), (row.get(number_column) or '').strip() or None)
+                continue
+            if values['part_number'] in self.seen:
+                self.error(line, 'Duplicate part_number in file', values['part_number'])
+                continue
+            self.seen.add(values['part_number'])
+            parsed.append((line, values))
+
+        self.resolve_categories(v.get('category') for _, v in parsed)
+        existing = Part.objects.filter(part_number__in=[v['part_number'] for _, v in parsed])
+        if self.writing:
+            existing = existing.select_for_update()
+        existing = {p.part_number: p for p in existing}
+
+        created, updated, update_fields, adjustments = [], [], set(), []
+        for line, values in parsed:
+            shown = {k: _show(v) for k, v in values.items()}
+            if 'category' in values:
+                name = values.pop('category')
+                values['category_id'] = self.categories.get(name) if name else None
+            part = existing.get(values['part_number'])
+            if part is None:
+                created.append(Part(**values))
+                self.change(line, values['part_number'], 'create', shown)
+                continue
+            diff = {f: (getattr(part, f), v) for f, v in values.items() if getattr(part, f) != v}
+            if not diff:
+                self.report['unchanged'] += 1
+                continue
+            if 'current_stock' in diff:
+                adjustments.append((part, diff['current_stock'][1] - diff['current_stock'][0], values.get('unit_cost', part.unit_cost)))
+            for field, (_, new) in diff.items():
+                setattr(part, field, new)
+            updated.append(part)
+            update_fields.update(diff)
+            self.change(line, part.part_number, 'update', {f: [_show(a), _show(b)] for f, (a, b) in diff.items()})
+
+        self.report['created'] += len(created)
+        self.report['updated'] += len(updated)
+        if self.writing:
+            self.write(created, updated, update_fields, adjustments)
+
+    def write(self, created, updated, update_fields, adjustments):
+        now = timezone.now()
+        if created:
+            Part.objects.bulk_create(created)
+            # bulk_create does not return ids on MySQL
+            ids = dict(Part.objects.filter(part_number__in=[p.part_number for p in created]).values_list('part_number', 'id'))
+            for part in created:
+                part.id = ids[part.part_number]
+                if part.current_stock:
+                    adjustments.append((part, part.current_stock, part.unit_cost))
+        if updated:
+            Part.objects.bulk_update(updated, sorted(update_fields), batch_size=500)
+            # one value for every row, so not worth a CASE branch per row in bulk_update
+            Part.objects.filter(pk__in=[p.pk for p in updated]).update(updated_at=now)
+        InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(part_id=part.id, type='adjustment', quantity=delta,
+                                 value=Decimal(delta) * unit_cost, notes=self.notes,
+                                 balance_after=part.current_stock, source='import')
+            for part, delta, unit_cost in adjustments
+        ])
+        self.created_ids += [p.id for p in created]
+        self.updated_ids += [p.id for p in updated]
+        self.updated_fields |= update_fields
+
+
+def _show(value):
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def import_parts(lines, dry_run=False, notes='Parts import', batch_size=None):
+    """Import parts from an iterable of CSV lines and return the report.
+
+    Raises ``ImportFormatError`` if the header has no part number column.
+    """
+    reader = csv.DictReader(lines)
+    columns = _columns(reader.fieldnames)
+    job = _Import(dry_run, notes)
+    with transaction.atomic():
+        for rows in _batches(reader, batch_size or settings.IMPORT_BATCH_SIZE):
+            job.batch(rows, columns)
+        if not job.writing:
+            transaction.set_rollback(True)
+    if job.writing and job.created_ids:
+        parts_changed.send(sender=Part, part_ids=job.created_ids, fields=None)
+    if job.writing and job.updated_ids:
+        parts_changed.send(sender=Part, part_ids=job.updated_ids, fields=tuple(sorted(job.updated_fields)))
+    return job.report
@@ -0,0 +1,141 @@
+"""Point-in-time stock from the running-balance ledger.
+
+Every ``InventoryTransaction`` stores ``balance_after``, the part's stock
+once the movement was applied. The stock of a part at a given moment is the
+balance of its last transaction at or before that moment: a single seek on
+the ``(part, timestamp, id)`` index instead of a replay of the ledger.
+
+``StockSnapshot`` rows freeze the closing stock of every part for a day
+(``snapshot_stock`` command) and are preferred over the ledger when present.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import InventoryTransaction, Part, StockSnapshot
+
+# net effect of a transaction on stock; transfers do not change the total
+SIGNED_QUANTITY = Case(
+    When(type='stock-out', then=-F('quantity')),
+    When(type__in=('stock-in', 'adjustment'), then=F('quantity')),
+    default=Value(0),
+    output_field=IntegerField(),
+)
+
+
+def end_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.max))
+
+
+def _ledger_balance(when, inclusive=True):
+    """Stock at ``when`` for the outer part, from the ledger alone.
+
+    Parts without movements up to ``when`` take the balance before their
+    first later movement, or their current stock if they never moved.
+    """
+    before = Q(timestamp__lte=when) if inclusive else Q(timestamp__lt=when)
+    moves = InventoryTransaction.objects.filter(part=OuterRef('pk'))
+    last = moves.filter(before).order_by('-timestamp', '-id').values('balance_after')[:1]
+    first_after = (moves.exclude(before).order_by('timestamp', 'id')
+                   .annotate(opening=F('balance_after') - SIGNED_QUANTITY).values('opening')[:1])
+    return Coalesce(Subquery(last), Subquery(first_after), F('current_stock'), output_field=IntegerField())
+
+
+def stock_at(parts, when):
+    """Annotate ``parts`` with ``balance``, their stock at the moment ``when``."""
+    return parts.annotate(balance=_ledger_balance(when))
+
+
+def stock_on(parts, day):
+    """Annotate ``parts`` with ``balance``, their closing stock on ``day``.
+
+    Snapshot rows for the day win over the ledger.
+    """
+    snapshot = StockSnapshot.objects.filter(part=OuterRef('pk'), date=day).values('balance')[:1]
+    return parts.annotate(balance=Coalesce(Subquery(snapshot), _ledger_balance(end_of_day(day)),
+                                           output_field=IntegerField()))
+
+
+def movements(parts, start=None, end=None):
+    """Annotate ``parts`` with the opening/closing stock and flows between ``start`` and ``end``.
+
+    ``stock_in`` and ``stock_out`` are positive quantities and ``adjustments``
+    is signed, so ``opening + stock_in - stock_out + adjustments == closing``
+    unless stock was edited outside the ledger.
+    """
+    window = InventoryTransaction.objects.filter(part=OuterRef('pk'))
+    if start:
+        window = window.filter(timestamp__gte=start)
+    if end:
+        window = window.filter(timestamp__lte=end)
+
+    def total(**filters):
+        rows = window.filter(**filters).values('part').annotate(total=Sum('quantity')).values('total')
+        return Coalesce(Subquery(rows), Value(0), output_field=IntegerField())
+
+    count = window.values('part').annotate(count=Count('id')).values('count')
+    return parts.annotate(
+        opening=_ledger_balance(start, inclusive=False) if start else Value(0, output_field=IntegerField()),
+        closing=_ledger_balance(end) if end else F('current_stock'),
+        stock_in=total(type='stock-in'),
+        stock_out=total(type='stock-out'),
+        adjustments=total(type='adjustment'),
+        movement_count=Coalesce(Subquery(count), Value(0), output_field=IntegerField()),
+    )
+
+
+def take_snapshot(day=None, batch_size=1000):
+    """Record the closing stock of every part on ``day`` (default yesterday).
+
+    Re-running for the same day overwrites that day's rows.
+    """
+    day = day or timezone.localdate() - timedelta(days=1)
+    rows = stock_at(Part.objects.order_by('id'), end_of_day(day)).values_list('id', 'balance')
+    snapshots = [StockSnapshot(part_id=pk, date=day, balance=balance) for pk, balance in rows.iterator(chunk_size=batch_size)]
+    with transaction.atomic():
+        StockSnapshot.objects.bulk_create(snapshots, batch_size=batch_size, update_conflicts=True,
+                                          unique_fields=['part', 'date'], update_fields=['balance'])
+    return len(snapshots)
+
+
+def rebuild_balances(part_ids=None, batch_size=1000):
+    """Recompute ``balance_after`` for every transaction, anchored on current stock.
+
+    The newest transaction of a part gets its current stock and earlier ones
+    are derived backwards from it.
+    """
+    stock = Part.objects.all()
+    if part_ids is not None:
+        stock = stock.filter(pk__in=part_ids)
+    stock = dict(stock.values_list('id', 'current_stock'))
+
+    qs = InventoryTransaction.objects.all()
+    if part_ids is not None:
+        qs = qs.filter(part_id__in=list(stock))
+    qs = qs.order_by('part_id', '-timestamp', '-id').only('id', 'part_id', 'type', 'quantity', 'balance_after')
+    pending, count, part_id, balance = [], 0, None, 0
+    for tx in qs.iterator(chunk_size=batch_size):
+        if tx.part_id != part_id:
+            part_id, balance = tx.part_id, stock.get(tx.part_id, 0)
+        if tx.balance_after != balance:
+            tx.balance_after = balance
+            pending.append(tx)
+        balance -= signed(tx)
+        count += 1
+        if len(pending) >= batch_size:
+            InventoryTransaction.objects.bulk_update(pending, ['balance_after'])
+            pending = []
+    InventoryTransaction.objects.bulk_update(pending, ['balance_after'])
+    return count
+
+
+def signed(tx):
+    """Python counterpart of ``SIGNED_QUANTITY``."""
+    if tx.type == 'stock-out':
+        return -tx.quantity
+    if tx.type in ('stock-in', 'adjustment'):
+        return tx.quantity
+    return 0
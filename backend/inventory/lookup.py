@@ -0,0 +1,139 @@
+"""Typo tolerant part lookup backed by a trigram table.
+
+Part numbers and description words are lower-cased, stripped of
+punctuation and padded (``"5W-30"`` -> ``" 5w30 "``) before being cut into
+overlapping three-character grams, stored in ``PartNGram``. Grams from the
+part number weigh more than grams from the description.
+
+A lookup cuts the query the same way and makes one query over the
+covering ``(gram, part, weight)`` index that sums the weights of the grams
+each part shares with it. The best ``CANDIDATES_PER_RESULT`` parts per
+requested result are then rescored in Python against their part number
+and description words. Partial codes (``"5W3"``), missing
+separators and single typos (``"BRKE"``) still find their part.
+"""
+import re
+from difflib import SequenceMatcher
+
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+
+from .models import Part, PartNGram
+
+PART_NUMBER_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+INDEXED_FIELDS = frozenset({'part_number', 'description'})
+CANDIDATES_PER_RESULT = 5
+INDEX_CHUNK = 500
+INSERT_BATCH = 5000
+_WORD = re.compile(r'[^\W_]+')
+
+
+def _clean(text):
+    return ''.join(_WORD.findall((text or '').lower()))
+
+
+def _grams(word):
+    padded = f' {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def part_grams(part):
+    """Return {gram: weight} for a part."""
+    grams = {}
+    for word in _WORD.findall((part.description or '').lower()):
+        for gram in _grams(word):
+            grams[gram] = DESCRIPTION_WEIGHT
+    number = _clean(part.part_number)
+    if number:
+        for gram in _grams(number):
+            grams[gram] = PART_NUMBER_WEIGHT
+    return grams
+
+
+def _insert(rows):
+    """Insert ``(part_id, gram, weight)`` rows without building model instances."""
+    qn = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}, {}, {}) VALUES (%s, %s, %s)'.format(
+        qn(PartNGram._meta.db_table), qn('part_id'), qn('gram'), qn('weight'))
+    with connection.cursor() as cursor:
+        for i in range(0, len(rows), INSERT_BATCH):
+            cursor.executemany(sql, rows[i:i + INSERT_BATCH])
+
+
+def _index_chunk(parts):
+    wanted = {part.pk: part_grams(part) for part in parts}
+    current = {}
+    for part_id, gram, weight in PartNGram.objects.filter(part_id__in=wanted).values_list('part_id', 'gram', 'weight'):
+        current.setdefault(part_id, {})[gram] = weight
+    stale = Q()
+    missing = []
+    for part_id, grams in wanted.items():
+        have = current.get(part_id, {})
+        dropped = [g for g, w in have.items() if grams.get(g) != w]
+        if dropped:
+            stale |= Q(part_id=part_id, gram__in=dropped)
+        missing += [(part_id, g, w) for g, w in grams.items() if have.get(g) != w]
+    if stale:
+        PartNGram.objects.filter(stale).delete()
+    _insert(missing)
+
+
+def index_parts(parts):
+    """Bring the index entries of ``parts`` up to date, writing only the difference."""
+    parts = list(parts)
+    with transaction.atomic():
+        for i in range(0, len(parts), INDEX_CHUNK):
+            _index_chunk(parts[i:i + INDEX_CHUNK])
+
+
+def rebuild_index(batch_size=1000):
+    """Rebuild the index for every part; returns the number of parts indexed."""
+    count = 0
+    with transaction.atomic():
+        PartNGram.objects.all().delete()
+        rows = []
+        for part in Part.objects.only('id', 'part_number', 'description').order_by('id').iterator(chunk_size=batch_size):
+            rows += [(part.pk, g, w) for g, w in part_grams(part).items()]
+            count += 1
+            if len(rows) >= INSERT_BATCH:
+                _insert(rows)
+                rows = []
+        _insert(rows)
+    return count
+
+
+def _similarity(query, text):
+    if not text:
+        return 0.0
+    ratio = SequenceMatcher(None, query, text).ratio()
+    if text.startswith(query):
+        # a typed prefix of the code is as good as it gets for counter staff
+        ratio = max(ratio, 0.9 + 0.1 * len(query) / len(text))
+    elif query in text:
+        ratio = max(ratio, 0.8)
+    return ratio
+
+
+def score(query, part):
+    """Similarity of ``part`` to ``query`` between 0 and 1."""
+    q = _clean(query)
+    best = _similarity(q, _clean(part.part_number))
+    for word in _WORD.findall((part.description or '').lower()):
+        if word.startswith(q) or SequenceMatcher(None, q, word).quick_ratio() * 0.9 > best:
+            best = max(best, 0.9 * _similarity(q, word))
+    return round(best, 3)
+
+
+def lookup(query, limit=10):
+    """Return (part, score) pairs for the ``limit`` best matches."""
+    words = _WORD.findall((query or '').lower())
+    if not words:
+        return []
+    grams = _grams(''.join(words)).union(*(_grams(word) for word in words))
+    candidates = (PartNGram.objects.filter(gram__in=grams).values('part_id')
+                  .annotate(hits=Sum('weight')).order_by('-hits')[:max(limit * CANDIDATES_PER_RESULT, 50)])
+    parts = Part.objects.select_related('category').in_bulk([row['part_id'] for row in candidates])
+    scored = sorted(((part, score(query, part)) for part in parts.values()),
+                    key=lambda pair: (-pair[1], pair[0].part_number))
+    return [pair for pair in scored[:limit] if pair[1] > 0]
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importer import ImportFormatError, import_parts
+
+
+class Command(BaseCommand):
+    help = 'Create or update parts from a CSV file (see inventory/importer.py for the columns)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them')
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding=options['encoding']) as f:
+                report = import_parts(f, dry_run=options['dry_run'], notes=f'Import of {options["path"]}')
+        except (OSError, ImportFormatError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+        if report['errors']:
+            self.stderr.write(json.dumps(report['errors'], indent=2))
+            raise CommandError(f'{len(report["errors"])} invalid rows, nothing was imported')
+        counts = report['created'], report['updated'], report['unchanged']
+        if options['dry_run']:
+            message = 'Dry run: {} parts to create, {} to update, {} unchanged'.format(*counts)
+        else:
+            message = 'Created {} parts, updated {}, {} unchanged'.format(*counts)
+        self.stdout.write(self.style.SUCCESS(message))
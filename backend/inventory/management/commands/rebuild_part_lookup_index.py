@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory.lookup import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram index behind the part lookup API'
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} parts'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory.ledger import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = 'Recompute the running stock balance of every inventory transaction'
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_balances()
+        self.stdout.write(self.style.SUCCESS(f'Checked {count} transactions'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventory.ledger import take_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Record the closing stock of every part for a day (default yesterday)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to snapshot (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        day = None
+        if options['date']:
+            try:
+                day = parse_date(options['date'])
+            except ValueError:
+                day = None
+            if day is None:
+                raise CommandError('--date must be YYYY-MM-DD')
+        count = take_snapshot(day)
+        self.stdout.write(self.style.SUCCESS(f'Recorded {count} stock snapshots'))
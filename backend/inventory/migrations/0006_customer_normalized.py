@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:25
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# frozen copies of inventory.models.normalize_name/normalize_phone as of this migration
+def normalize_name(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.casefold().split())
+
+
+def normalize_phone(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def backfill(apps, schema_editor):
+    Customer = apps.get_model('inventory', 'Customer')
+    batch = []
+    for customer in Customer.objects.only('id', 'name', 'email', 'phone').iterator(chunk_size=2000):
+        customer.name_normalized = normalize_name(customer.name)
+        customer.email_normalized = (customer.email or '').strip().lower()
+        customer.phone_normalized = normalize_phone(customer.phone)
+        batch.append(customer)
+        if len(batch) == 2000:
+            Customer.objects.bulk_update(batch, ['name_normalized', 'email_normalized', 'phone_normalized'])
+            batch = []
+    Customer.objects.bulk_update(batch, ['name_normalized', 'email_normalized', 'phone_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='email_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='name_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=50),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:32
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# frozen copy of inventory.lookup.part_grams as of this migration
+PART_NUMBER_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+_WORD = re.compile(r'[^\W_]+')
+
+
+def _grams(word):
+    padded = f' {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def part_grams(part):
+    grams = {}
+    for word in _WORD.findall((part.description or '').lower()):
+        for gram in _grams(word):
+            grams[gram] = DESCRIPTION_WEIGHT
+    number = ''.join(_WORD.findall((part.part_number or '').lower()))
+    if number:
+        for gram in _grams(number):
+            grams[gram] = PART_NUMBER_WEIGHT
+    return grams
+
+
+def index_existing_parts(apps, schema_editor):
+    Part = apps.get_model('inventory', 'Part')
+    PartNGram = apps.get_model('inventory', 'PartNGram')
+    batch = []
+    for part in Part.objects.only('id', 'part_number', 'description').iterator(chunk_size=1000):
+        batch += [PartNGram(part_id=part.id, gram=g, weight=w) for g, w in part_grams(part).items()]
+        if len(batch) >= 5000:
+            PartNGram.objects.bulk_create(batch)
+            batch = []
+    PartNGram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_customer_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartNGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('part', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ngrams', to='inventory.part')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gram', 'part', 'weight'], name='inventory_p_gram_1a01c5_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='partngram',
+            constraint=models.UniqueConstraint(fields=('part', 'gram'), name='unique_part_ngram'),
+        ),
+        migrations.RunPython(index_existing_parts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_balances(apps, schema_editor):
+    # newest transaction of each part gets its current stock, earlier ones
+    # are derived backwards from it (as inventory.ledger.rebuild_balances did)
+    Part = apps.get_model('inventory', 'Part')
+    InventoryTransaction = apps.get_model('inventory', 'InventoryTransaction')
+    stock = dict(Part.objects.values_list('id', 'current_stock'))
+    transactions = InventoryTransaction.objects.order_by('part_id', '-timestamp', '-id').only(
+        'id', 'part_id', 'type', 'quantity', 'balance_after')
+    pending, part_id, balance = [], None, 0
+    for tx in transactions.iterator(chunk_size=1000):
+        if tx.part_id != part_id:
+            part_id, balance = tx.part_id, stock.get(tx.part_id, 0)
+        tx.balance_after = balance
+        pending.append(tx)
+        if tx.type == 'stock-out':
+            balance += tx.quantity
+        elif tx.type in ('stock-in', 'adjustment'):
+            balance -= tx.quantity
+        if len(pending) >= 1000:
+            InventoryTransaction.objects.bulk_update(pending, ['balance_after'])
+            pending = []
+    InventoryTransaction.objects.bulk_update(pending, ['balance_after'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_partngram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('balance', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='inventorytransaction',
+            name='balance_after',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='inventorytransaction',
+            index=models.Index(fields=['part', 'timestamp', 'id'], name='inv_tx_part_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='stocksnapshot',
+            name='part',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory.part'),
+        ),
+        migrations.AddIndex(
+            model_name='stocksnapshot',
+            index=models.Index(fields=['date', 'part'], name='inv_snapshot_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='stocksnapshot',
+            constraint=models.UniqueConstraint(fields=('part', 'date'), name='unique_part_snapshot_date'),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+def backfill_source(apps, schema_editor):
+    # the note formats written by sales and job assignment before this field existed
+    InventoryTransaction = apps.get_model('inventory', 'InventoryTransaction')
+    InventoryTransaction.objects.filter(notes__startswith='Sale #').update(source='sale')
+    InventoryTransaction.objects.filter(source='', type='stock-out', related_job_id__isnull=False).update(source='job')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_transaction_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventorytransaction',
+            name='source',
+            field=models.CharField(blank=True, choices=[('', 'Unspecified'), ('reorder', 'Reorder'), ('sale', 'Sale'), ('job', 'Job'), ('import', 'Import')], default='', max_length=20),
+        ),
+        migrations.RunPython(backfill_source, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
+import re
+import unicodedata
+
 from django.db import models
 
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -20,6 +24,7 @@ class Part(models.Model):
     unit = models.CharField(max_length=20, default='pcs')
     location = models.CharField(max_length=200, blank=True)
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.part_number} - {self.description[:40]}"
@@ -32,6 +37,13 @@ class InventoryTransaction(models.Model):
         ('adjustment', 'Adjustment'),
         ('transfer', 'Transfer'),
     )
+    SOURCES = (
+        ('', 'Unspecified'),
+        ('reorder', 'Reorder'),
+        ('sale', 'Sale'),
+        ('job', 'Job'),
+        ('import', 'Import'),
+    )
     part = models.ForeignKey(Part, on_delete=models.CASCADE, related_name='transactions')
     type = models.CharField(max_length=20, choices=TRANSACTION_TYPES)
     quantity = models.IntegerField()
@@ -39,11 +51,39 @@ class InventoryTransaction(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
     related_job_id = models.CharField(max_length=100, blank=True, null=True)
+    # what caused the movement; reports filter on this rather than on ``notes``
+    source = models.CharField(max_length=20, choices=SOURCES, blank=True, default='')
+    # part.current_stock once this movement was applied (see inventory.ledger)
+    balance_after = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['part', 'timestamp', 'id'], name='inv_tx_part_time_idx'),
+            # transactions feed: newest first, optionally narrowed by type or job
+            models.Index(fields=['timestamp', 'id'], name='inv_tx_time_idx'),
+            models.Index(fields=['type', 'timestamp', 'id'], name='inv_tx_type_time_idx'),
+            models.Index(fields=['related_job_id', 'timestamp', 'id'], name='inv_tx_job_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.type} {self.quantity} x {self.part.part_number} @ {self.timestamp}"
 
 
+class StockSnapshot(models.Model):
+    """Closing stock of a part on a day, frozen for audits (month-end positions)."""
+    part = models.ForeignKey(Part, on_delete=models.CASCADE, related_name='snapshots')
+    date = models.DateField()
+    balance = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['part', 'date'], name='unique_part_snapshot_date')]
+        indexes = [models.Index(fields=['date', 'part'], name='inv_snapshot_date_idx')]
+
+    def __str__(self):
+        return f"{self.part.part_number} @ {self.date}: {self.balance}"
+
+
 class Supplier(models.Model):
     name = models.CharField(max_length=200, unique=True)
     contact = models.CharField(max_length=200, blank=True)
@@ -57,11 +97,48 @@ class Supplier(models.Model):
     previous = models.TextField(blank=True)
     future = models.TextField(blank=True)
     payments = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
 
 
+def normalize_name(value):
+    """Case-folded, accent-free name with single spaces, for lookups."""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.casefold().split())
+
+
+def normalize_phone(value):
+    return re.sub(r'\D', '', value or '')
+
+
+class CustomerQuerySet(models.QuerySet):
+    def search(self, query, limit=20):
+        """Customers whose name, email or phone starts with ``query``.
+
+        Matches are prefix lookups on the indexed ``*_normalized`` columns,
+        exact name matches first.
+        """
+        name = normalize_name(query)
+        if not name:
+            return self.none()
+        condition = models.Q(name_normalized__startswith=name) | models.Q(email_normalized__startswith=name)
+        digits = normalize_phone(query)
+        if len(digits) >= 3:
+            condition |= models.Q(phone_normalized__startswith=digits)
+        exact = models.Case(models.When(name_normalized=name, then=0), default=1)
+        return self.filter(condition).order_by(exact, 'name_normalized', 'id')[:limit]
+
+    def get_or_create_by_name(self, name, defaults=None):
+        """Like ``get_or_create(name=...)`` but matched on the normalized name."""
+        customer = self.filter(name_normalized=normalize_name(name)).order_by('id').first()
+        if customer:
+            return customer, False
+        return self.create(name=name, **(defaults or {})), True
+
+
 class Customer(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField(blank=True)
@@ -75,6 +152,36 @@ class Customer(models.Model):
     total_spent = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     # simple JSON storage for related arrays (invoices, payments, vehicles)
     metadata = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # lookup columns for search, kept in sync by save()
+    name_normalized = models.CharField(max_length=200, db_index=True, editable=False, default='')
+    email_normalized = models.CharField(max_length=254, db_index=True, editable=False, default='')
+    phone_normalized = models.CharField(max_length=50, db_index=True, editable=False, default='')
+
+    objects = CustomerQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.name_normalized = normalize_name(self.name)
+        self.email_normalized = (self.email or '').strip().lower()
+        self.phone_normalized = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'name_normalized', 'email_normalized', 'phone_normalized'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} <{self.email}>"
+
+
+class PartNGram(models.Model):
+    """Trigram of a part's number or description words (see inventory.lookup)."""
+    part = models.ForeignKey(Part, on_delete=models.CASCADE, related_name='ngrams')
+    gram = models.CharField(max_length=3)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [models.Index(fields=['gram', 'part', 'weight'])]
+        constraints = [models.UniqueConstraint(fields=['part', 'gram'], name='unique_part_ngram')]
+
+    def __str__(self):
+        return f"{self.gram!r} -> {self.part_id}"
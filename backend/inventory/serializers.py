@@ -25,7 +25,7 @@ class InventoryTransactionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = InventoryTransaction
-        fields = ('id', 'part', 'part_id', 'type', 'quantity', 'value', 'timestamp', 'notes', 'related_job_id')
+        fields = ('id', 'part', 'part_id', 'type', 'quantity', 'value', 'timestamp', 'notes', 'related_job_id', 'balance_after', 'source')
 
 
 class SupplierSerializer(serializers.ModelSerializer):
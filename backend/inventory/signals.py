@@ -0,0 +1,30 @@
+"""Inventory signals.
+
+``parts_changed`` is sent by write paths that bypass ``Part.save()``
+(conditional ``UPDATE`` statements, bulk operations) so that anything
+derived from the parts table can stay coherent. ``part_ids`` lists the
+affected rows and ``fields`` the columns that changed (``None`` means any).
+
+The receivers below keep the part lookup index (``inventory.lookup``) in step.
+"""
+from django.db.models.signals import post_save
+from django.dispatch import Signal, receiver
+
+parts_changed = Signal()
+
+
+@receiver(post_save, sender='inventory.Part')
+def reindex_saved_part(sender, instance, update_fields=None, **kwargs):
+    from .lookup import INDEXED_FIELDS, index_parts
+    if update_fields and not INDEXED_FIELDS & set(update_fields):
+        return
+    index_parts([instance])
+
+
+@receiver(parts_changed)
+def reindex_changed_parts(sender, part_ids, fields=None, **kwargs):
+    from .lookup import INDEXED_FIELDS, index_parts
+    from .models import Part
+    if fields is not None and not INDEXED_FIELDS & set(fields):
+        return
+    index_parts(Part.objects.filter(pk__in=part_ids).only('id', 'part_number', 'description'))
@@ -0,0 +1,183 @@
+"""Stock movement service shared by job assignment, reorders and sales.
+
+Stock levels are never read, modified in Python and saved back. Every call
+issues a single conditional ``UPDATE`` for all of its lines::
+
+    UPDATE part SET current_stock = current_stock - CASE id WHEN .. END
+    WHERE id IN (..) AND ((id = .. AND current_stock >= ..) OR ..)
+
+so two counters selling the last unit at the same time cannot both succeed.
+The matching ``InventoryTransaction`` rows are written with one
+``bulk_create``. If any line cannot be applied nothing is changed and a
+``StockMovementError`` listing the failing lines is raised.
+
+A line is a dict with ``quantity`` and one of ``part`` (a ``Part``
+instance), ``part_id`` or ``part_number``. ``value`` (the ledger value of
+the line) and ``notes`` are optional; value defaults to quantity x unit
+cost. ``source`` records what caused the movement (one of
+``InventoryTransaction.SOURCES``).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .models import InventoryTransaction, Part
+from .signals import parts_changed
+
+
+class StockMovementError(Exception):
+    """Raised when one or more lines of a movement cannot be applied.
+
+    ``failures`` holds one dict per failing line with its ``index`` in the
+    submitted lines, ``part_id``, ``part_number``, ``requested``,
+    ``available`` and a human readable ``message``.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__('; '.join(f['message'] for f in failures))
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _resolve_parts(lines):
+    """Load every part referenced by ``lines`` with a single query."""
+    parts = {}
+    ids, numbers = set(), set()
+    for line in lines:
+        part = line.get('part')
+        if part is not None:
+            parts[part.id] = part
+        elif line.get('part_id'):
+            ids.add(int(line['part_id']))
+        elif line.get('part_number'):
+            numbers.add(line['part_number'])
+    if ids or numbers:
+        qs = Part.objects.filter(Q(id__in=ids) | Q(part_number__in=numbers))
+        for part in qs.only('id', 'part_number', 'unit_cost', 'current_stock'):
+            parts[part.id] = part
+    by_number = {p.part_number: p for p in parts.values()}
+
+    resolved = []
+    for line in lines:
+        part = line.get('part')
+        if part is None and line.get('part_id'):
+            part = parts.get(int(line['part_id']))
+        elif part is None and line.get('part_number'):
+            part = by_number.get(line['part_number'])
+        resolved.append(part)
+    return resolved
+
+
+def _failure(index, line, part, message, available=None):
+    return {
+        'index': index,
+        'part_id': part.id if part else line.get('part_id'),
+        'part_number': part.part_number if part else line.get('part_number'),
+        'requested': line.get('quantity'),
+        'available': available,
+        'message': message,
+    }
+
+
+def _move(lines, sign, tx_type, notes, related_job_id, ignore_missing, source):
+    lines = list(lines)
+    parts = _resolve_parts(lines)
+
+    failures = []
+    totals = {}
+    applied = []
+    for index, (line, part) in enumerate(zip(lines, parts)):
+        try:
+            quantity = int(line.get('quantity') or 0)
+        except (TypeError, ValueError):
+            quantity = 0
+        if part is None:
+            if not ignore_missing:
+                failures.append(_failure(index, line, part, f"Part not found: {line.get('part_number') or line.get('part_id')}"))
+            continue
+        if quantity <= 0:
+            failures.append(_failure(index, line, part, f'Quantity for {part.part_number} must be greater than zero'))
+            continue
+        totals[part.id] = totals.get(part.id, 0) + quantity
+        applied.append((index, line, part, quantity))
+    if failures:
+        raise StockMovementError(failures)
+    if not applied:
+        return []
+
+    delta = Case(
+        *[When(pk=pk, then=Value(qty)) for pk, qty in totals.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    qs = Part.objects.filter(pk__in=totals)
+    if sign < 0:
+        condition = Q()
+        for pk, qty in totals.items():
+            condition |= Q(pk=pk, current_stock__gte=qty)
+        qs = qs.filter(condition)
+        new_stock = F('current_stock') - delta
+    else:
+        new_stock = F('current_stock') + delta
+
+    try:
+        with transaction.atomic():
+            if qs.update(current_stock=new_stock, updated_at=timezone.now()) != len(totals):
+                raise _Rollback()
+            # the rows stay locked until commit, so these are this movement's balances
+            stock = dict(Part.objects.filter(pk__in=totals).values_list('id', 'current_stock'))
+            balances = []
+            for index, line, part, quantity in reversed(applied):
+                balances.append(stock[part.id])
+                stock[part.id] -= sign * quantity
+            txs = InventoryTransaction.objects.bulk_create([
+                InventoryTransaction(
+                    part=part,
+                    type=tx_type,
+                    quantity=quantity,
+                    value=line['value'] if line.get('value') is not None
+                    else round(quantity * Decimal(part.unit_cost), 2),
+                    notes=line.get('notes', notes),
+                    related_job_id=line.get('related_job_id', related_job_id),
+                    source=source,
+                    balance_after=balance,
+                )
+                for (index, line, part, quantity), balance in zip(applied, reversed(balances))
+            ])
+    except _Rollback:
+        available = dict(Part.objects.filter(pk__in=totals).values_list('id', 'current_stock'))
+        failures = [
+            _failure(index, line, part,
+                     f'Insufficient stock for {part.part_number}. Available: {available.get(part.id, 0)}',
+                     available=available.get(part.id, 0))
+            for index, line, part, quantity in applied
+            if available.get(part.id, 0) < totals[part.id]
+        ]
+        # stock was replenished between the update and this read
+        failures = failures or [
+            _failure(index, line, part, f'Stock for {part.part_number} changed, please retry',
+                     available=available.get(part.id, 0))
+            for index, line, part, quantity in applied
+        ]
+        raise StockMovementError(failures)
+
+    parts_changed.send(sender=Part, part_ids=list(totals), fields=('current_stock',))
+    return txs
+
+
+def remove_stock(lines, tx_type='stock-out', notes='', related_job_id=None, ignore_missing=False, source=''):
+    """Take stock out for every line, all or nothing.
+
+    Returns the created ``InventoryTransaction`` rows in line order.
+    """
+    return _move(lines, -1, tx_type, notes, related_job_id, ignore_missing, source)
+
+
+def add_stock(lines, tx_type='stock-in', notes='', related_job_id=None, ignore_missing=False, source=''):
+    """Put stock back (reorders, returns, cancelled sales)."""
+    return _move(lines, 1, tx_type, notes, related_job_id, ignore_missing, source)
@@ -0,0 +1,451 @@
+import os
+import random
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import User
+
+from .barcode_cache import BarcodeCache
+from .importer import import_parts
+from .ledger import end_of_day, rebuild_balances, stock_on, take_snapshot
+from .lookup import lookup, rebuild_index
+from .models import Category, Customer, InventoryTransaction, Part, PartNGram, StockSnapshot
+from .signals import parts_changed
+from .stock import StockMovementError, add_stock, remove_stock
+
+
+class StockMovementTests(TestCase):
+    def setUp(self):
+        self.oil = Part.objects.create(part_number='OIL-5W30', current_stock=10, unit_cost=25)
+        self.filter = Part.objects.create(part_number='FIL-001', current_stock=2, unit_cost=12)
+
+    def test_remove_stock_updates_all_lines_and_writes_ledger(self):
+        txs = remove_stock([
+            {'part_number': 'OIL-5W30', 'quantity': 4},
+            {'part_id': self.filter.id, 'quantity': 2, 'value': 30},
+        ], notes='Sale #1')
+        self.oil.refresh_from_db()
+        self.filter.refresh_from_db()
+        self.assertEqual(self.oil.current_stock, 6)
+        self.assertEqual(self.filter.current_stock, 0)
+        self.assertEqual([tx.value for tx in txs], [100, 30])
+        self.assertEqual(InventoryTransaction.objects.filter(type='stock-out', notes='Sale #1').count(), 2)
+
+    def test_remove_stock_is_all_or_nothing(self):
+        with self.assertRaises(StockMovementError) as ctx:
+            remove_stock([
+                {'part_number': 'OIL-5W30', 'quantity': 4},
+                {'part_number': 'FIL-001', 'quantity': 3},
+                {'part_number': 'NOPE', 'quantity': 1},
+            ])
+        self.assertEqual([f['index'] for f in ctx.exception.failures], [2])
+        with self.assertRaises(StockMovementError) as ctx:
+            remove_stock([
+                {'part_number': 'OIL-5W30', 'quantity': 4},
+                {'part_number': 'FIL-001', 'quantity': 3},
+            ])
+        failure, = ctx.exception.failures
+        self.assertEqual((failure['index'], failure['available']), (1, 2))
+        self.oil.refresh_from_db()
+        self.assertEqual(self.oil.current_stock, 10)
+        self.assertFalse(InventoryTransaction.objects.exists())
+
+    def test_duplicate_lines_are_checked_against_their_total(self):
+        with self.assertRaises(StockMovementError):
+            remove_stock([
+                {'part_number': 'FIL-001', 'quantity': 2},
+                {'part_number': 'FIL-001', 'quantity': 1},
+            ])
+        add_stock([{'part_number': 'FIL-001', 'quantity': 1}])
+        remove_stock([
+            {'part_number': 'FIL-001', 'quantity': 2},
+            {'part_number': 'FIL-001', 'quantity': 1},
+        ])
+        self.filter.refresh_from_db()
+        self.assertEqual(self.filter.current_stock, 0)
+
+
+class CustomerSearchTests(TestCase):
+    def setUp(self):
+        Customer.objects.create(name='Tendai  Moyo', email='T.Moyo@example.com', phone='+263 77 123 4567')
+        Customer.objects.create(name='Tendayi Banda', phone='0712 555 000')
+        Customer.objects.create(name='Chipo Dube', email='chipo@example.com')
+
+    def names(self, query):
+        return [c.name for c in Customer.objects.search(query)]
+
+    def test_prefix_search_across_name_email_and_phone(self):
+        self.assertEqual(self.names('tend'), ['Tendai  Moyo', 'Tendayi Banda'])
+        self.assertEqual(self.names('TENDAI moyo'), ['Tendai  Moyo'])
+        self.assertEqual(self.names('chipo@'), ['Chipo Dube'])
+        self.assertEqual(self.names('263 77'), ['Tendai  Moyo'])
+        self.assertEqual(self.names('   '), [])
+
+    def test_get_or_create_by_name_matches_normalized_name(self):
+        customer, created = Customer.objects.get_or_create_by_name('  chipo DUBE ')
+        self.assertFalse(created)
+        self.assertEqual(customer.email, 'chipo@example.com')
+        _, created = Customer.objects.get_or_create_by_name('Rudo Ncube')
+        self.assertTrue(created)
+
+
+class PartLookupTests(TestCase):
+    def setUp(self):
+        self.oil = Part.objects.create(part_number='OIL-5W30', description='Engine oil 5 litre')
+        self.pads = Part.objects.create(part_number='BRK-PAD-01', description='Front brake pads')
+        self.disc = Part.objects.create(part_number='BRK-DSC-02', description='Brake disc')
+        Part.objects.create(part_number='FIL-001', description='Oil filter')
+
+    def numbers(self, query, limit=10):
+        return [part.part_number for part, _ in lookup(query, limit)]
+
+    def test_partial_codes_and_typos(self):
+        self.assertEqual(self.numbers('5W3')[0], 'OIL-5W30')
+        self.assertEqual(self.numbers('oil5w30')[0], 'OIL-5W30')
+        self.assertEqual(set(self.numbers('BRK', 2)), {'BRK-PAD-01', 'BRK-DSC-02'})
+        self.assertEqual(self.numbers('brkae')[:2], ['BRK-DSC-02', 'BRK-PAD-01'])
+        self.assertEqual(self.numbers('...'), [])
+
+    def test_index_follows_saves_and_bulk_changes(self):
+        self.oil.part_number = 'OIL-10W40'
+        self.oil.save()
+        self.assertEqual(self.numbers('10W4')[0], 'OIL-10W40')
+        Part.objects.filter(pk=self.disc.pk).update(description='Clutch plate')
+        parts_changed.send(sender=Part, part_ids=[self.disc.pk], fields=('description',))
+        self.assertEqual(self.numbers('clutch')[0], 'BRK-DSC-02')
+
+    def test_rebuild_matches_incremental_index(self):
+        before = set(PartNGram.objects.values_list('part_id', 'gram', 'weight'))
+        self.assertEqual(rebuild_index(), 4)
+        self.assertEqual(set(PartNGram.objects.values_list('part_id', 'gram', 'weight')), before)
+
+
+class BarcodeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Oils')
+        self.oil = Part.objects.create(part_number='OIL-5W30', current_stock=10, unit_cost=25, category=self.category)
+        self.filter = Part.objects.create(part_number='FIL-001', current_stock=2)
+        self.barcodes = BarcodeCache()
+        self.barcodes.warm()
+
+    def test_scan_needs_no_queries_while_nothing_changed(self):
+        with self.assertNumQueries(0):
+            record = self.barcodes.get(' oil-5w30 ')
+        self.assertEqual(record['category']['name'], 'Oils')
+        self.assertEqual(record['unit_cost'], '25.00')
+
+    def test_committed_changes_are_picked_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            remove_stock([{'part_number': 'OIL-5W30', 'quantity': 3}])
+            self.filter.delete()
+        self.assertEqual(self.barcodes.get('OIL-5W30')['current_stock'], 7)
+        self.assertIsNone(self.barcodes.get('FIL-001'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Lubricants'
+            self.category.save()
+        self.assertEqual(self.barcodes.get('OIL-5W30')['category']['name'], 'Lubricants')
+
+    def test_batch_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('cl', 'cl@example.com', 'pw', verified=True))
+        response = client.post('/api/inventory/scan/batch/', {'codes': ['FIL-001', 'NOPE', 'OIL-5W30']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['part'] and r['part']['id'] for r in response.data['results']],
+                         [self.filter.pk, None, self.oil.pk])
+        self.assertEqual(response.data['missing'], ['NOPE'])
+        self.assertEqual(client.post('/api/inventory/scan/batch/', {'codes': []}, format='json').status_code, 400)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('ex', 'ex@example.com', 'pw', verified=True))
+        oils = Category.objects.create(name='Oils')
+        self.parts = [Part.objects.create(part_number=f'P-{i}', category=oils if i % 2 else None) for i in range(5)]
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_parts_stream_in_chunks_without_per_row_queries(self):
+        response = self.client.get('/api/inventory/export/')
+        with self.assertNumQueries(3):
+            lines = self.read(response)
+        self.assertEqual(lines[0].split(',')[:4], ['id', 'part_number', 'description', 'category'])
+        self.assertEqual([line.split(',')[1] for line in lines[1:]], [f'P-{i}' for i in range(5)])
+        self.assertEqual(lines[2].split(',')[3], 'Oils')
+
+    def test_transactions_date_range(self):
+        add_stock([{'part_number': 'P-1', 'quantity': 4}])
+        today = date.today().isoformat()
+        self.assertEqual(len(self.read(self.client.get('/api/inventory/export/transactions/', {'from': today}))), 2)
+        self.assertEqual(len(self.read(self.client.get('/api/inventory/export/transactions/', {'to': '2000-01-01'}))), 1)
+        self.assertEqual(self.client.get('/api/inventory/export/transactions/', {'from': 'yesterday'}).status_code, 400)
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class ExportMemoryBenchmark(TestCase):
+    def test_peak_memory_is_flat(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('ex', 'ex@example.com', 'pw', verified=True))
+        part = Part.objects.create(part_number='BENCH')
+        created = 0
+        for total in (1000, 10000, 100000):
+            InventoryTransaction.objects.bulk_create([
+                InventoryTransaction(part=part, type='stock-in', quantity=1, notes='benchmark row ' * 4)
+                for _ in range(total - created)
+            ], batch_size=5000)
+            created = total
+            tracemalloc.start()
+            response = client.get('/api/inventory/export/transactions/')
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{total} rows, {size / 1e6:.1f}MB of CSV, peak {peak / 1e6:.2f}MB')
+
+
+class PartImportTests(TestCase):
+    def setUp(self):
+        self.oil = Part.objects.create(part_number='OIL-5W30', description='Engine oil', current_stock=10, unit_cost=25)
+
+    def test_creates_updates_and_writes_adjustments(self):
+        csv_lines = [
+            'part_number,description,category,current_stock,unit_cost',
+            'OIL-5W30,Engine oil,Oils,7,25',
+            'FIL-001,Oil filter,Filters,3,12.5',
+            'BRK-001,Brake pads,,0,40',
+        ]
+        report = import_parts(csv_lines)
+        self.assertEqual((report['created'], report['updated'], report['unchanged']), (2, 1, 0))
+        self.assertEqual(sorted(report['categories_created']), ['Filters', 'Oils'])
+        self.oil.refresh_from_db()
+        self.assertEqual((self.oil.current_stock, self.oil.category.name), (7, 'Oils'))
+        ledger = dict(InventoryTransaction.objects.filter(type='adjustment').values_list('part__part_number', 'quantity'))
+        self.assertEqual(ledger, {'OIL-5W30': -3, 'FIL-001': 3})
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def queries(count, start):
+            lines = ['part_number,category,current_stock'] + [f'P-{i},Group {start}-{i % 3},{i}' for i in range(start, start + count)]
+            with CaptureQueriesContext(connection) as captured:
+                import_parts(lines)
+            return len(captured)
+        self.assertEqual(queries(5, 0), queries(50, 100))
+
+    def test_price_list_only_touches_its_columns(self):
+        report = import_parts(['Part Number,Unit Cost', 'OIL-5W30,27.5'])
+        self.assertEqual(report['changes'][0]['fields'], {'unit_cost': ['25.00', '27.50']})
+        self.oil.refresh_from_db()
+        self.assertEqual((self.oil.unit_cost, self.oil.current_stock, self.oil.description), (Decimal('27.50'), 10, 'Engine oil'))
+
+    def test_dry_run_and_errors_write_nothing(self):
+        report = import_parts(['part_number,current_stock', 'OIL-5W30,2', 'NEW-1,5'], dry_run=True)
+        self.assertEqual((report['created'], report['updated']), (1, 1))
+        report = import_parts(['part_number,current_stock', 'NEW-2,5', 'OIL-5W30,lots', 'NEW-2,1'], batch_size=1)
+        self.assertEqual([(e['line'], e['message']) for e in report['errors']],
+                         [(3, 'current_stock must be a whole number of 0 or more'), (4, 'Duplicate part_number in file')])
+        self.assertEqual(list(Part.objects.values_list('part_number', 'current_stock')), [('OIL-5W30', 10)])
+        self.assertFalse(InventoryTransaction.objects.exists())
+
+
+class TransactionFeedTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+        category = Category.objects.create(name='Oils')
+        self.oil = Part.objects.create(part_number='OIL-5W30', current_stock=10, unit_cost=25, category=category)
+        self.filter = Part.objects.create(part_number='FIL-001', current_stock=5, unit_cost=12)
+        remove_stock([{'part': self.oil, 'quantity': 2}], related_job_id='17')
+        add_stock([{'part': self.filter, 'quantity': 3}])
+        remove_stock([{'part': self.filter, 'quantity': 1}])
+
+    def feed(self, **params):
+        response = self.client.get('/api/inventory/transactions/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_compact_rows_newest_first(self):
+        rows = self.feed()
+        self.assertEqual([(r['part']['part_number'], r['type']) for r in rows],
+                         [('FIL-001', 'stock-out'), ('FIL-001', 'stock-in'), ('OIL-5W30', 'stock-out')])
+        self.assertEqual(rows[0]['part'], {'id': self.filter.pk, 'part_number': 'FIL-001'})
+        self.assertEqual(rows[0]['balance_after'], 7)
+        self.assertIn('category', self.feed(shape='full')[0]['part'])
+
+    def test_filters(self):
+        self.assertEqual(len(self.feed(part=self.filter.pk)), 2)
+        self.assertEqual(len(self.feed(part_number='OIL-5W30')), 1)
+        self.assertEqual(len(self.feed(type='stock-out')), 2)
+        self.assertEqual(len(self.feed(type='stock-in,adjustment')), 1)
+        self.assertEqual([r['part']['part_number'] for r in self.feed(related_job_id='17')], ['OIL-5W30'])
+        self.assertEqual(len(self.feed(to='2000-01-01')), 0)
+        self.assertEqual(self.client.get('/api/inventory/transactions/', {'part': 'oil'}).status_code, 400)
+
+    def test_page_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            page = self.feed(page_size=2)
+        self.assertEqual(len(page['results']), 2)
+        rest = self.feed(page_size=2, cursor=page['next_cursor'])
+        self.assertEqual([r['part']['part_number'] for r in rest['results']], ['OIL-5W30'])
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.part = Part.objects.create(part_number='BRK-01', current_stock=0, unit_cost=10)
+        self.other = Part.objects.create(part_number='BRK-02', current_stock=4, unit_cost=10)
+        self.days = [date(2026, 1, d) for d in (10, 20, 31)]
+        moves = [add_stock, remove_stock, add_stock]
+        for day, move, qty in zip(self.days, moves, (10, 3, 5)):
+            tx, = move([{'part': self.part, 'quantity': qty}])
+            InventoryTransaction.objects.filter(pk=tx.pk).update(timestamp=end_of_day(day) - timedelta(hours=12))
+
+    def balances(self, day):
+        return dict(stock_on(Part.objects.all(), day).values_list('part_number', 'balance'))
+
+    def test_transactions_carry_running_balance(self):
+        history = self.part.transactions.order_by('timestamp', 'id').values_list('balance_after', flat=True)
+        self.assertEqual(list(history), [10, 7, 12])
+        InventoryTransaction.objects.update(balance_after=None)
+        rebuild_balances()
+        self.assertEqual(list(history), [10, 7, 12])
+
+    def test_stock_on_a_day(self):
+        self.assertEqual(self.balances(date(2026, 1, 1)), {'BRK-01': 0, 'BRK-02': 4})
+        self.assertEqual(self.balances(self.days[1]), {'BRK-01': 7, 'BRK-02': 4})
+        self.assertEqual(self.balances(date(2026, 2, 1)), {'BRK-01': 12, 'BRK-02': 4})
+
+    def test_snapshots_are_preferred_over_the_ledger(self):
+        self.assertEqual(take_snapshot(self.days[1]), 2)
+        self.assertEqual(StockSnapshot.objects.get(part=self.part, date=self.days[1]).balance, 7)
+        StockSnapshot.objects.filter(part=self.part).update(balance=6)
+        self.assertEqual(self.balances(self.days[1])['BRK-01'], 6)
+
+    def test_stock_at_and_movement_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+        response = client.get('/api/inventory/stock-at/', {'date': '2026-01-20', 'part': self.part.pk})
+        self.assertEqual([row['balance'] for row in response.data], [7])
+        response = client.get('/api/inventory/movements/', {'from': '2026-01-15', 'to': '2026-01-31', 'part': self.part.pk})
+        row, = response.data
+        self.assertEqual((row['opening'], row['stock_in'], row['stock_out'], row['closing'], row['movement_count']),
+                         (10, 5, 3, 12, 2))
+        self.assertEqual(client.get('/api/inventory/stock-at/').status_code, 400)
+        self.assertEqual(client.get('/api/inventory/movements/', {'part': 'x'}).status_code, 400)
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class PartImportBenchmark(TestCase):
+    def test_price_list_import(self):
+        lines = ['part_number,description,category,current_stock,unit_cost']
+        lines += [f'SUP-{i:05d},Supplier part {i},Group {i % 40},{i % 50},{i % 900}.99' for i in range(20000)]
+        for label in ('create', 'update'):
+            start = time.perf_counter()
+            report = import_parts(lines)
+            print(f'{label}: {report["created"]} created, {report["updated"]} updated in {time.perf_counter() - start:.2f}s')
+            lines = [lines[0]] + [line.replace('.99', '.49') for line in lines[1:]]
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class PartLookupBenchmark(TestCase):
+    PARTS = 50000
+
+    def test_lookup_latency(self):
+        rng = random.Random(1)
+        syllables = ['ba', 'ke', 'ro', 'ti', 'lu', 'mo', 'ra', 'di', 'at', 'or', 'en', 'gi', 'ne', 'sp', 'ar', 'ch', 'pa']
+        vocab = [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(2000)]
+        prefixes = [''.join(rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ') for _ in range(3)) for _ in range(300)]
+        Part.objects.bulk_create([
+            Part(part_number=f'{rng.choice(prefixes)}-{rng.randint(0, 99999):05d}-{i}',
+                 description=' '.join(rng.choice(vocab) for _ in range(rng.randint(2, 5))))
+            for i in range(self.PARTS)
+        ], batch_size=5000)
+        rebuild_index()
+        part = Part.objects.order_by('?').first()
+        word = part.description.split()[0]
+        for query in (part.part_number[:6], part.part_number[:3], word[:-1] + 'q', '5W3'):
+            start = time.perf_counter()
+            for _ in range(5):
+                lookup(query)
+            print(f'lookup {query!r}: {(time.perf_counter() - start) / 5 * 1000:.1f}ms')
+
+
+def sell_concurrently(part_ids, threads, attempts_per_thread):
+    """Sell one of each part ``attempts_per_thread`` times from each of ``threads`` threads.
+
+    Returns (applied, rejected, elapsed seconds).
+    """
+    outcomes = {'sold': 0, 'rejected': 0}
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker():
+        start.wait()
+        try:
+            for _ in range(attempts_per_thread):
+                while True:
+                    try:
+                        remove_stock([{'part_id': part_id, 'quantity': 1} for part_id in part_ids], notes='stress')
+                        outcome = 'sold'
+                    except StockMovementError:
+                        outcome = 'rejected'
+                    except OperationalError:
+                        # SQLite reports lock contention instead of waiting
+                        time.sleep(0.001)
+                        continue
+                    break
+                with lock:
+                    outcomes[outcome] += 1
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    began = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return outcomes['sold'], outcomes['rejected'], time.perf_counter() - began
+
+
+class StockMovementStressTests(TransactionTestCase):
+    """Many threads selling from the same shelf must never oversell it."""
+
+    threads = 8
+    attempts_per_thread = 25
+    initial_stock = 100
+
+    def test_concurrent_sales_do_not_oversell(self):
+        part = Part.objects.create(part_number='BRK-001', current_stock=self.initial_stock, unit_cost=45)
+        other = Part.objects.create(part_number='BAT-12V', current_stock=self.initial_stock * 10, unit_cost=90)
+        sold, rejected, _ = sell_concurrently([part.id, other.id], self.threads, self.attempts_per_thread)
+
+        part.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(sold + rejected, self.threads * self.attempts_per_thread)
+        self.assertEqual(sold, self.initial_stock)
+        self.assertEqual(part.current_stock, 0)
+        self.assertEqual(other.current_stock, self.initial_stock * 9)
+        self.assertEqual(InventoryTransaction.objects.filter(part=part).count(), self.initial_stock)
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class StockMovementBenchmark(TransactionTestCase):
+    def test_throughput(self):
+        threads, attempts_per_thread = 8, 100
+        part = Part.objects.create(part_number='BRK-001', current_stock=threads * attempts_per_thread // 2)
+        other = Part.objects.create(part_number='BAT-12V', current_stock=threads * attempts_per_thread)
+        sold, rejected, elapsed = sell_concurrently([part.id, other.id], threads, attempts_per_thread)
+        attempts = threads * attempts_per_thread
+        print(f'\n{attempts} stock movements in {elapsed:.2f}s ({attempts / elapsed:.0f}/s), '
+              f'{sold} applied, {rejected} rejected')
@@ -4,12 +4,18 @@ from . import views
 urlpatterns = [
     path('categories/', views.categories, name='inventory_categories'),
     path('parts/', views.parts, name='inventory_parts'),
+    path('parts/lookup/', views.part_lookup, name='inventory_part_lookup'),
     path('parts/<int:pk>/', views.part_detail, name='inventory_part_detail'),
     path('parts/<int:pk>/history/', views.part_history, name='inventory_part_history'),
+    path('stock-at/', views.stock_at_date, name='inventory_stock_at'),
+    path('movements/', views.stock_movements, name='inventory_stock_movements'),
     path('assign-to-job/', views.assign_to_job, name='inventory_assign_to_job'),
     path('reorder/', views.reorder_part, name='inventory_reorder'),
+    path('import/', views.import_parts_csv, name='inventory_import'),
     path('export/', views.export_parts_csv, name='inventory_export'),
+    path('export/transactions/', views.export_transactions_csv, name='inventory_export_transactions'),
     path('scan/', views.scan_barcode, name='inventory_scan'),
+    path('scan/batch/', views.scan_batch, name='inventory_scan_batch'),
     path('suppliers/', views.suppliers, name='inventory_suppliers'),
     path('transactions/', views.transactions, name='inventory_transactions'),
     path('customers/', views.customers, name='inventory_customers'),
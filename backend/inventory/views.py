@@ -1,13 +1,14 @@
+import codecs
+
 import jwt
 from django.conf import settings
 from django.db.models import Q
+from django.utils.dateparse import parse_date
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import HttpResponse
-import csv
 from functools import wraps
 
 from .models import Category, Part, InventoryTransaction, Supplier
@@ -15,11 +16,21 @@ from .serializers import CategorySerializer, PartSerializer, InventoryTransactio
 from .serializers import SupplierSerializer
 from .models import Customer
 from .serializers import CustomerSerializer
+from .barcode_cache import barcode_cache
+from .importer import ImportFormatError, import_parts
+from .ledger import movements, stock_on
+from .lookup import lookup
+from .stock import StockMovementError, add_stock, remove_stock
+from api.cache import cached_response
+from api.exports import InvalidDateRange, csv_response, date_range, filter_dates
+from api.conditional import conditional_get, row_fingerprint, table_fingerprint
+from api.pagination import paginate
 
 
 @api_view(['GET', 'POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@cached_response('inventory.Category')
 def categories(request):
     if request.method == 'GET':
         cats = Category.objects.all()
@@ -38,9 +49,31 @@ def categories(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def serialize_parts(parts):
+    """Serialize parts and convert snake_case to camelCase for the frontend."""
+    transformed_data = []
+    for item in PartSerializer(parts, many=True).data:
+        transformed_data.append({
+            'id': item['id'],
+            'partNumber': item['part_number'],
+            'description': item['description'],
+            'currentStock': item['current_stock'],
+            'minimumThreshold': item['minimum_threshold'],
+            'unitCost': item['unit_cost'],
+            'unit': item['unit'],
+            'category': item.get('category'),
+            'supplier': item.get('supplier', ''),
+            'location': item.get('location', ''),
+            'notes': item.get('notes', '')
+        })
+    return transformed_data
+
+
 @api_view(['GET', 'POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_get(table_fingerprint('inventory.Part', 'inventory.Category'))
+@cached_response('inventory.Part', 'inventory.Category')
 def parts(request):
     """List all parts or create a new part"""
     if request.method == 'GET':
@@ -58,26 +91,7 @@ def parts(request):
                     Q(description__icontains=search)
                 )
             
-            serializer = PartSerializer(qs, many=True)
-            data = serializer.data
-            
-            # Convert snake_case to camelCase for frontend
-            transformed_data = []
-            for item in data:
-                transformed_data.append({
-                    'id': item['id'],
-                    'partNumber': item['part_number'],
-                    'description': item['description'],
-                    'currentStock': item['current_stock'],
-                    'minimumThreshold': item['minimum_threshold'],
-                    'unitCost': item['unit_cost'],
-                    'unit': item['unit'],
-                    'category': item.get('category'),
-                    'supplier': item.get('supplier', ''),
-                    'location': item.get('location', ''),
-                    'notes': item.get('notes', '')
-                })
-            return Response(transformed_data)
+            return paginate(request, qs, 'id', serialize_parts)
         except Exception as e:
             return Response(
                 {'error': 'Failed to fetch parts', 'detail': str(e)},
@@ -105,6 +119,7 @@ def parts(request):
 
 
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
+@conditional_get(row_fingerprint('inventory.Part', 'category__updated_at'))
 def part_detail(request, pk):
     try:
         part = Part.objects.get(pk=pk)
@@ -140,15 +155,13 @@ def assign_to_job(request):
     if not part_id or quantity <= 0:
         return Response({'message': 'Invalid payload'}, status=400)
     try:
-        part = Part.objects.get(id=part_id)
-    except Part.DoesNotExist:
-        return Response({'message': 'Part not found'}, status=404)
-    if part.current_stock < quantity:
-        return Response({'message': 'Insufficient stock'}, status=400)
-    # decrement stock
-    part.current_stock -= quantity
-    part.save()
-    tx = InventoryTransaction.objects.create(part=part, type='stock-out', quantity=quantity, value=round(quantity * float(part.unit_cost), 2), notes=notes, related_job_id=job_id)
+        tx, = remove_stock([{'part_id': part_id, 'quantity': quantity}], notes=notes, related_job_id=job_id,
+                           source='job')
+    except StockMovementError as e:
+        failure = e.failures[0]
+        if failure['available'] is None:
+            return Response({'message': 'Part not found'}, status=404)
+        return Response({'message': 'Insufficient stock', 'available': failure['available']}, status=400)
     return Response({'message': 'Assigned to job', 'transaction': InventoryTransactionSerializer(tx).data})
 
 
@@ -156,9 +169,42 @@ def assign_to_job(request):
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def transactions(request):
-    qs = InventoryTransaction.objects.select_related('part').all().order_by('-timestamp')
-    serializer = InventoryTransactionSerializer(qs, many=True)
-    return Response(serializer.data)
+    """Inventory ledger, newest first.
+
+    Filters: ?part=<id>, ?part_number=, ?type=<type>[,<type>...], ?related_job_id=
+    and ?from=/?to=. Rows carry only the part's id and number; ?shape=full
+    returns the old rows with the whole part embedded.
+    """
+    qs = InventoryTransaction.objects.order_by('-timestamp', '-id')
+    try:
+        qs = filter_dates(qs, 'timestamp', request)
+        if request.GET.get('part'):
+            qs = qs.filter(part_id=int(request.GET['part']))
+    except InvalidDateRange as e:
+        return Response({'message': str(e)}, status=400)
+    except ValueError:
+        return Response({'message': "'part' must be an id"}, status=400)
+    if request.GET.get('part_number'):
+        qs = qs.filter(part__part_number=request.GET['part_number'])
+    if request.GET.get('type'):
+        qs = qs.filter(type__in=request.GET['type'].split(','))
+    if request.GET.get('related_job_id'):
+        qs = qs.filter(related_job_id=request.GET['related_job_id'])
+
+    if request.GET.get('shape') == 'full':
+        qs = qs.select_related('part__category')
+        return paginate(request, qs, '-timestamp', lambda rows: InventoryTransactionSerializer(rows, many=True).data)
+    rows = qs.values(*COMPACT_TRANSACTION_FIELDS)
+    return paginate(request, rows, '-timestamp', lambda rows: [compact_transaction(row) for row in rows])
+
+
+COMPACT_TRANSACTION_FIELDS = ('id', 'part_id', 'part__part_number', 'type', 'quantity', 'value',
+                              'balance_after', 'timestamp', 'notes', 'related_job_id', 'source')
+
+
+def compact_transaction(row):
+    row['part'] = {'id': row.pop('part_id'), 'part_number': row.pop('part__part_number')}
+    return row
 
 
 def decode_jwt_from_request(request):
@@ -193,9 +239,56 @@ def part_history(request, pk):
         part = Part.objects.get(pk=pk)
     except Part.DoesNotExist:
         return Response({'message': 'Part not found'}, status=status.HTTP_404_NOT_FOUND)
-    txs = part.transactions.all().order_by('-timestamp')
-    serializer = InventoryTransactionSerializer(txs, many=True)
-    return Response(serializer.data)
+    txs = part.transactions.select_related('part__category').order_by('-timestamp')
+    return paginate(request, txs, '-timestamp', lambda rows: InventoryTransactionSerializer(rows, many=True).data)
+
+
+def _ledger_parts(request):
+    """Parts narrowed by ``?part=<id>[,<id>...]`` and ``?category=<id>``; returns (parts, error)."""
+    parts = Part.objects.all()
+    try:
+        if request.GET.get('part'):
+            parts = parts.filter(pk__in=[int(pk) for pk in request.GET['part'].split(',') if pk.strip()])
+        if request.GET.get('category'):
+            parts = parts.filter(category_id=int(request.GET['category']))
+    except ValueError:
+        return None, {'message': "'part' and 'category' must be ids"}
+    return parts, None
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def stock_at_date(request):
+    """Closing stock of every part on ?date= (snapshots first, then the running-balance ledger)"""
+    try:
+        day = parse_date(request.GET.get('date') or '')
+    except ValueError:
+        day = None
+    if day is None:
+        return Response({'message': "'date' must be a date (YYYY-MM-DD)"}, status=400)
+    parts, err = _ledger_parts(request)
+    if err:
+        return Response(err, status=400)
+    rows = stock_on(parts, day).values('id', 'part_number', 'description', 'balance')
+    return paginate(request, rows, 'part_number', list)
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def stock_movements(request):
+    """Opening/closing stock and stock in/out/adjustments per part between ?from= and ?to="""
+    try:
+        start, end = date_range(request)
+    except InvalidDateRange as e:
+        return Response({'message': str(e)}, status=400)
+    parts, err = _ledger_parts(request)
+    if err:
+        return Response(err, status=400)
+    rows = movements(parts, start, end).values('id', 'part_number', 'description', 'opening', 'stock_in', 'stock_out',
+                        'adjustments', 'closing', 'movement_count')
+    return paginate(request, rows, 'part_number', list)
 
 
 @api_view(['POST'])
@@ -208,34 +301,83 @@ def reorder_part(request):
     if not part_id or qty <= 0:
         return Response({'message': 'Invalid payload'}, status=400)
     try:
-        part = Part.objects.get(id=part_id)
-    except Part.DoesNotExist:
+        tx, = add_stock([{'part_id': part_id, 'quantity': qty}], notes=notes or 'Reorder', source='reorder')
+    except StockMovementError:
         return Response({'message': 'Part not found'}, status=404)
-    part.current_stock += qty
-    part.save()
-    tx = InventoryTransaction.objects.create(part=part, type='stock-in', quantity=qty, value=round(qty * float(part.unit_cost), 2), notes=notes or 'Reorder')
     return Response({'message': 'Reordered', 'transaction': InventoryTransactionSerializer(tx).data})
 
 
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def import_parts_csv(request):
+    """Create/update parts from an uploaded CSV ("file"); ?dry_run=1 only reports the changes"""
+    if getattr(request.user, 'role', None) not in ('admin', 'supervisor'):
+        return Response({'message': 'Only admin and supervisor can import parts'}, status=status.HTTP_403_FORBIDDEN)
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({'message': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = str(request.GET.get('dry_run', request.data.get('dry_run', ''))).lower() in ('1', 'true', 'yes')
+    try:
+        report = import_parts(codecs.iterdecode(upload, 'utf-8-sig'), dry_run=dry_run,
+                              notes=f'Import of {upload.name} by {request.user.username}')
+    except ImportFormatError as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except UnicodeDecodeError:
+        return Response({'message': 'The file must be UTF-8 encoded CSV'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report, status=status.HTTP_400_BAD_REQUEST if report['errors'] else status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def export_parts_csv(request):
-    qs = Part.objects.all()
-    # stream CSV
-    resp = HttpResponse(content_type='text/csv')
-    resp['Content-Disposition'] = 'attachment; filename="parts.csv"'
-    writer = csv.writer(resp)
-    writer.writerow(['id', 'part_number', 'description', 'category', 'current_stock', 'minimum_threshold', 'supplier', 'unit_cost', 'unit', 'location'])
-    for p in qs:
-        writer.writerow([p.id, p.part_number, p.description, p.category.name if p.category else '', p.current_stock, p.minimum_threshold, p.supplier, str(p.unit_cost), p.unit, p.location])
-    return resp
+    """Stream all parts as CSV (?from=/?to= filter on last update)"""
+    try:
+        qs = filter_dates(Part.objects.all(), 'updated_at', request)
+    except InvalidDateRange as e:
+        return Response({'message': str(e)}, status=400)
+    return csv_response(
+        request,
+        'parts.csv',
+        ['id', 'part_number', 'description', 'category', 'current_stock', 'minimum_threshold', 'supplier', 'unit_cost', 'unit', 'location'],
+        qs,
+        ['id', 'part_number', 'description', 'category__name', 'current_stock', 'minimum_threshold', 'supplier', 'unit_cost', 'unit', 'location'],
+        transform=lambda row: row[:3] + (row[3] or '',) + row[4:],
+    )
+
+
+@api_view(['GET'])
+def export_transactions_csv(request):
+    """Stream the inventory ledger as CSV (?from=/?to= filter on timestamp)"""
+    try:
+        qs = filter_dates(InventoryTransaction.objects.all(), 'timestamp', request)
+    except InvalidDateRange as e:
+        return Response({'message': str(e)}, status=400)
+    return csv_response(
+        request,
+        'inventory_transactions.csv',
+        ['id', 'timestamp', 'part_number', 'type', 'quantity', 'balance_after', 'value', 'related_job_id', 'notes'],
+        qs,
+        ['id', 'timestamp', 'part__part_number', 'type', 'quantity', 'balance_after', 'value', 'related_job_id', 'notes'],
+    )
+
+
+def search_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.CUSTOMER_SEARCH_LIMIT))
+    except ValueError:
+        limit = settings.CUSTOMER_SEARCH_LIMIT
+    return max(1, min(limit, settings.CUSTOMER_SEARCH_MAX_LIMIT))
 
 
 @api_view(['GET', 'POST'])
+@conditional_get(table_fingerprint('inventory.Customer'))
 def customers(request):
     if request.method == 'GET':
+        search = request.GET.get('search', '').strip()
+        if search:
+            return Response(CustomerSerializer(Customer.objects.search(search, search_limit(request)), many=True).data)
         qs = Customer.objects.all()
-        serializer = CustomerSerializer(qs, many=True)
-        return Response(serializer.data)
+        return paginate(request, qs, 'id', lambda rows: CustomerSerializer(rows, many=True).data)
     # POST - create customer (allow admin/supervisor)
     payload, err = decode_jwt_from_request(request)
     if err:
@@ -250,6 +392,7 @@ def customers(request):
 
 
 @api_view(['GET', 'PATCH', 'DELETE'])
+@conditional_get(row_fingerprint('inventory.Customer'))
 def customer_detail(request, pk):
     try:
         cust = Customer.objects.get(pk=pk)
@@ -270,24 +413,56 @@ def customer_detail(request, pk):
     return Response(serializer.errors, status=400)
 
 
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def part_lookup(request):
+    """Typo tolerant part lookup: ?q= partial code or description, ?limit= top matches"""
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+    matches = lookup(request.GET.get('q', ''), limit)
+    rows = serialize_parts([part for part, _ in matches])
+    for row, (_, score) in zip(rows, matches):
+        row['score'] = score
+    return Response(rows)
+
+
 @api_view(['POST'])
 def scan_barcode(request):
-    # placeholder implementation: look up by part_number
+    # look up by part_number in the worker's barcode map
     code = request.data.get('code')
     if not code:
         return Response({'message': 'No code provided'}, status=400)
-    part = Part.objects.filter(part_number=code).first()
+    part = barcode_cache.get(code)
     if not part:
         return Response({'message': 'Part not found'}, status=404)
-    return Response(PartSerializer(part).data)
+    return Response(part)
+
+
+@api_view(['POST'])
+def scan_batch(request):
+    """Resolve many scanned codes at once: {"codes": [...]}"""
+    codes = request.data.get('codes')
+    if not isinstance(codes, list) or not codes:
+        return Response({'message': 'No codes provided'}, status=400)
+    if len(codes) > settings.BARCODE_BATCH_MAX:
+        return Response({'message': f'At most {settings.BARCODE_BATCH_MAX} codes per request'}, status=400)
+    codes = [str(code) for code in codes]
+    found = barcode_cache.get_many(codes)
+    return Response({
+        'results': [{'code': code, 'part': found[code]} for code in codes],
+        'missing': [code for code in codes if found[code] is None],
+    })
 
 
 @api_view(['GET', 'POST'])
+@conditional_get(table_fingerprint('inventory.Supplier'))
 def suppliers(request):
     if request.method == 'GET':
         qs = Supplier.objects.all()
-        serializer = SupplierSerializer(qs, many=True)
-        return Response(serializer.data)
+        return paginate(request, qs, 'id', lambda rows: SupplierSerializer(rows, many=True).data)
     # POST (admin)
     payload, err = decode_jwt_from_request(request)
     if err:
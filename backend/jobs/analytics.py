@@ -0,0 +1,81 @@
+"""Technician performance over a period.
+
+A job counts for the technician it is assigned to, falling back to the
+legacy ``technician`` field. Every metric is an annotated aggregate of one
+grouped query over ``Job``; technicians are read with a second query, so the
+cost does not depend on how many technicians there are.
+"""
+from datetime import timedelta
+
+from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from api.models import User
+from api.periods import start_of
+
+from .models import Job
+
+ACTIVE_STATUSES = ('pending', 'in_progress', 'on_hold')
+
+
+def _rate(part, whole):
+    return round(part / whole * 100, 1) if whole else 0
+
+
+def _hours(value):
+    return round(float(value), 2) if value is not None else None
+
+
+def technician_performance(start, end):
+    """Per-technician metrics for the local days ``start``..``end``.
+
+    * ``jobs_received`` - jobs created in the period
+    * ``completed`` and ``completed_per_week`` - jobs completed in the period
+    * ``on_time`` / ``on_time_rate`` - completed no later than the due date
+    * ``avg_actual_hours`` / ``avg_estimated_hours`` - over completed jobs
+      with recorded hours
+    * ``active_jobs`` - current load (pending, in progress or on hold)
+    * ``revenue`` - ``actual_cost`` of the jobs completed in the period
+    """
+    lo, hi = start_of(start), start_of(end + timedelta(days=1))
+    completed = Q(status='completed', completed_at__gte=lo, completed_at__lt=hi)
+    timed = completed & Q(actual_hours__isnull=False)
+    rows = (
+        Job.objects.annotate(tech=Coalesce('assigned_technician', 'technician'))
+        .filter(tech__isnull=False)
+        .values('tech')
+        .annotate(
+            jobs_received=Count('id', filter=Q(created_at__gte=lo, created_at__lt=hi)),
+            completed=Count('id', filter=completed),
+            on_time=Count('id', filter=completed & Q(completed_at__date__lte=F('due_date'))),
+            active_jobs=Count('id', filter=Q(status__in=ACTIVE_STATUSES)),
+            avg_actual_hours=Avg('actual_hours', filter=timed),
+            avg_estimated_hours=Avg('estimated_hours', filter=timed),
+            revenue=Sum('actual_cost', filter=completed),
+        )
+    )
+    stats = {row.pop('tech'): row for row in rows}
+    weeks = ((end - start).days + 1) / 7
+
+    results = []
+    technicians = User.objects.filter(role='technician').order_by('username')
+    for tech in technicians.values('id', 'username', 'is_active'):
+        row = stats.get(tech['id'], {})
+        done = row.get('completed', 0)
+        actual, estimated = row.get('avg_actual_hours'), row.get('avg_estimated_hours')
+        results.append({
+            'id': tech['id'],
+            'username': tech['username'],
+            'is_active': tech['is_active'],
+            'jobs_received': row.get('jobs_received', 0),
+            'completed': done,
+            'completed_per_week': round(done / weeks, 2),
+            'on_time': row.get('on_time', 0),
+            'on_time_rate': _rate(row.get('on_time', 0), done),
+            'avg_actual_hours': _hours(actual),
+            'avg_estimated_hours': _hours(estimated),
+            'hours_ratio': round(float(actual) / float(estimated), 2) if actual and estimated else None,
+            'active_jobs': row.get('active_jobs', 0),
+            'revenue': float(row.get('revenue') or 0),
+        })
+    return results
@@ -0,0 +1,192 @@
+"""Data behind the dashboard job board and technician activity widgets.
+
+Both widgets are bounded per group (jobs per status column, events per
+technician) with ``ROW_NUMBER()`` windows, so the database returns only the
+rows that are shown and the number of queries does not depend on how many
+jobs or technicians there are.
+"""
+from datetime import timedelta
+
+from django.db.models import Case, CharField, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from api.models import User
+from api.periods import start_of
+
+from .analytics import ACTIVE_STATUSES
+from .models import Job, JobProgress, JobStatusHistory
+
+PRIORITY_RANK = Case(
+    When(priority='High', then=Value(0)),
+    When(priority='Medium', then=Value(1)),
+    default=Value(2),
+    output_field=IntegerField(),
+)
+
+EFFICIENCY_DAYS = 30
+
+
+def _latest_progress(job):
+    updates = JobProgress.objects.filter(job=job).order_by('-created_at', '-id').values('progress_percentage')[:1]
+    return Coalesce(Subquery(updates), Value(0), output_field=IntegerField())
+
+
+def _vehicle(row):
+    return f"{row['vehicle_year']} {row['vehicle_model']} - {row['vehicle_plate']}"
+
+
+def _hours(value):
+    return f'{float(value):g}h' if value is not None else None
+
+
+def _elapsed(since, now):
+    if since is None:
+        return None
+    minutes = int((now - since).total_seconds() // 60)
+    return f'{minutes // 60}h {minutes % 60}m'
+
+
+def active_jobs(limit=10):
+    """Active jobs grouped by status, at most ``limit`` per column.
+
+    Columns follow ``ACTIVE_STATUSES``; jobs are ordered by priority, then
+    due date. ``count`` is the size of the whole column, not of the page.
+    """
+    order = [PRIORITY_RANK.asc(), F('due_date').asc(), F('id').asc()]
+    rows = (
+        Job.objects.filter(status__in=ACTIVE_STATUSES)
+        .annotate(
+            position=Window(RowNumber(), partition_by=[F('status')], order_by=order),
+            column_size=Window(Count('id'), partition_by=[F('status')]),
+            technician_name=Coalesce('assigned_technician__username', 'technician__username'),
+            progress=_latest_progress(OuterRef('pk')),
+        )
+        .filter(position__lte=limit)
+        .order_by('status', 'position')
+        .values('id', 'status', 'priority', 'customer_name', 'vehicle_year', 'vehicle_model', 'vehicle_plate',
+                'service_description', 'estimated_hours', 'due_date', 'technician_name', 'progress', 'column_size')
+    )
+    columns = {status: {'status': status, 'count': 0, 'jobs': []} for status in ACTIVE_STATUSES}
+    for row in rows:
+        column = columns[row['status']]
+        column['count'] = row['column_size']
+        column['jobs'].append({
+            'id': row['id'],
+            'status': row['status'],
+            'priority': row['priority'],
+            'vehicle': _vehicle(row),
+            'customer': row['customer_name'],
+            'technician': row['technician_name'],
+            'services': [row['service_description']],
+            'progress': row['progress'],
+            'estimatedTime': _hours(row['estimated_hours']),
+            'due_date': row['due_date'],
+        })
+    return list(columns.values())
+
+
+def recent_events(technician_ids, limit=5):
+    """The latest ``limit`` progress updates and status changes of each technician.
+
+    Both sources are ranked per technician in the same statement
+    (``UNION ALL`` of two windowed selects), so each side contributes at most
+    ``limit`` rows per technician; the merge keeps the newest ``limit``.
+    """
+    progress = (
+        JobProgress.objects.filter(technician__in=technician_ids)
+        .annotate(
+            position=Window(RowNumber(), partition_by=[F('technician')], order_by=[F('created_at').desc(), F('id').desc()]),
+            kind=Value('progress', output_field=CharField()),
+            tech=F('technician'),
+            at=F('created_at'),
+            progress=F('progress_percentage'),
+            status=Value(None, output_field=CharField()),
+            text=F('description'),
+        )
+        .filter(position__lte=limit)
+        .order_by()
+        .values_list('kind', 'tech', 'job_id', 'at', 'progress', 'status', 'text')
+    )
+    changes = (
+        JobStatusHistory.objects.filter(changed_by__in=technician_ids)
+        .annotate(
+            position=Window(RowNumber(), partition_by=[F('changed_by')], order_by=[F('changed_at').desc(), F('id').desc()]),
+            kind=Value('status', output_field=CharField()),
+            tech=F('changed_by'),
+            at=F('changed_at'),
+            progress=Value(None, output_field=IntegerField()),
+            status=F('new_status'),
+            text=F('notes'),
+        )
+        .filter(position__lte=limit)
+        .order_by()
+        .values_list('kind', 'tech', 'job_id', 'at', 'progress', 'status', 'text')
+    )
+    events = {}
+    for kind, tech, job_id, at, percentage, new_status, text in progress.union(changes, all=True):
+        events.setdefault(tech, []).append({
+            'type': kind, 'job_id': job_id, 'at': at, 'progress': percentage, 'status': new_status, 'text': text,
+        })
+    for tech_events in events.values():
+        tech_events.sort(key=lambda event: event['at'], reverse=True)
+        del tech_events[limit:]
+    return events
+
+
+def technician_activity(events=5):
+    """What every active technician is working on, with their latest events.
+
+    ``efficiency`` compares estimated with actual hours over the jobs they
+    completed in the last ``EFFICIENCY_DAYS`` days, capped at 100.
+    """
+    now = timezone.now()
+    today = start_of(timezone.localdate())
+    technicians = list(
+        User.objects.filter(role='technician', is_active=True).order_by('username')
+        .values('id', 'username', 'technician_profile__is_available')
+    )
+    ids = [tech['id'] for tech in technicians]
+
+    jobs = Job.objects.annotate(tech=Coalesce('assigned_technician', 'technician')).filter(tech__in=ids)
+    timed = Q(status='completed', completed_at__gte=now - timedelta(days=EFFICIENCY_DAYS), actual_hours__gt=0)
+    totals = {
+        row.pop('tech'): row
+        for row in jobs.values('tech').annotate(
+            completed_today=Count('id', filter=Q(status='completed', completed_at__gte=today)),
+            estimated=Sum('estimated_hours', filter=timed),
+            actual=Sum('actual_hours', filter=timed),
+        )
+    }
+    current = {
+        row['tech']: row
+        for row in jobs.filter(status='in_progress')
+        .annotate(
+            position=Window(RowNumber(), partition_by=[F('tech')], order_by=[F('started_at').desc(nulls_last=True), F('id').desc()]),
+            progress=_latest_progress(OuterRef('pk')),
+        )
+        .filter(position=1)
+        .values('tech', 'id', 'vehicle_year', 'vehicle_model', 'vehicle_plate', 'started_at', 'progress')
+    }
+    recent = recent_events(ids, events)
+
+    results = []
+    for tech in technicians:
+        row, job = totals.get(tech['id'], {}), current.get(tech['id'])
+        estimated, actual = row.get('estimated'), row.get('actual')
+        available = tech['technician_profile__is_available'] is not False
+        results.append({
+            'id': tech['id'],
+            'name': tech['username'],
+            'avatar': None,
+            'status': 'active' if job else 'break' if available else 'offline',
+            'efficiency': min(100, round(float(estimated) / float(actual) * 100)) if estimated and actual else None,
+            'currentJob': f"#{job['id']}" if job else None,
+            'job_id': job['id'] if job else None,
+            'vehicle': _vehicle(job) if job else None,
+            'progress': job['progress'] if job else None,
+            'timeSpent': _elapsed(job['started_at'], now) if job else None,
+            'completedToday': row.get('completed_today', 0),
+            'events': recent.get(tech['id'], []),
+        })
+    return results
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the job search index from scratch'
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} jobs'))
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:26
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# frozen copies of jobs.search.FIELD_WEIGHTS/job_tokens and
+# inventory.models.normalize_name as of this migration
+FIELD_WEIGHTS = {
+    'vehicle_plate': 8,
+    'customer_name': 4,
+    'vehicle_model': 2,
+    'service_description': 1,
+}
+_WORD = re.compile(r'\w+')
+
+
+def normalize_name(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.casefold().split())
+
+
+def tokenize(text):
+    return [w[:64] for w in _WORD.findall(normalize_name(text))]
+
+
+def job_tokens(job):
+    tokens = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = getattr(job, field) or ''
+        words = tokenize(value)
+        if field == 'vehicle_plate' and len(words) > 1:
+            words.append(''.join(words)[:64])
+        for word in words:
+            if len(word) > 1 or field != 'service_description':
+                tokens[word] = max(weight, tokens.get(word, 0))
+    return tokens
+
+
+def index_existing_jobs(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobSearchToken = apps.get_model('jobs', 'JobSearchToken')
+    batch = []
+    for job in Job.objects.only('id', *FIELD_WEIGHTS).iterator(chunk_size=2000):
+        batch += [JobSearchToken(job_id=job.id, token=t, weight=w) for t, w in job_tokens(job).items()]
+        if len(batch) >= 2000:
+            JobSearchToken.objects.bulk_create(batch)
+            batch = []
+    JobSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_alter_job_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='jobs.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'job'], name='jobs_jobsea_token_b88e6e_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='jobsearchtoken',
+            constraint=models.UniqueConstraint(fields=('job', 'token'), name='unique_job_search_token'),
+        ),
+        migrations.RunPython(index_existing_jobs, migrations.RunPython.noop),
+    ]
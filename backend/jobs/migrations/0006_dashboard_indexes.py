@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_jobsearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'due_date'], name='job_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobprogress',
+            index=models.Index(fields=['technician', 'created_at'], name='job_progress_tech_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobprogress',
+            index=models.Index(fields=['job', 'created_at'], name='job_progress_job_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobstatushistory',
+            index=models.Index(fields=['changed_by', 'changed_at'], name='job_status_hist_user_idx'),
+        ),
+    ]
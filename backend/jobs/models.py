@@ -43,7 +43,7 @@ class Job(models.Model):
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
@@ -56,6 +56,9 @@ class Job(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='job_status_due_idx'),
+        ]
 
 
 class JobStatusHistory(models.Model):
@@ -72,6 +75,9 @@ class JobStatusHistory(models.Model):
     
     class Meta:
         ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['changed_by', 'changed_at'], name='job_status_hist_user_idx'),
+        ]
 
 
 class JobPart(models.Model):
@@ -121,6 +127,10 @@ class JobProgress(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['technician', 'created_at'], name='job_progress_tech_idx'),
+            models.Index(fields=['job', 'created_at'], name='job_progress_job_idx'),
+        ]
 
 
 class JobReassignment(models.Model):
@@ -180,3 +190,17 @@ class TechnicianMessage(models.Model):
     
     class Meta:
         ordering = ['-sent_at']
+
+
+class JobSearchToken(models.Model):
+    """Search index entry: one word of a job's searchable text (see jobs.search)"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.token} -> Job #{self.job_id}"
+
+    class Meta:
+        indexes = [models.Index(fields=['token', 'job'])]
+        constraints = [models.UniqueConstraint(fields=['job', 'token'], name='unique_job_search_token')]
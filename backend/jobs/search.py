@@ -0,0 +1,133 @@
+"""Word index for searching jobs.
+
+Every job's searchable text (plate, customer name, vehicle model and
+service description) is split into lower-cased words stored in
+``JobSearchToken`` with a weight for the field they came from. A search
+term matches any word it is a prefix of, which is an index range scan on
+``(token, job)`` instead of the ``%term%`` scan of the whole job table the
+old ``icontains`` chain needed. With several terms the rarest one picks the
+candidate jobs and the others are checked through the ``(job, token)``
+unique index.
+
+A job matches when every term of the query matches one of its words; its
+score is the sum, per term, of the best matching weight. This uses plain
+tables, so it behaves the same on MySQL and on SQLite.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+
+from inventory.models import normalize_name
+
+from .models import Job, JobSearchToken
+
+# field -> weight; a word found in several fields keeps the highest weight
+FIELD_WEIGHTS = {
+    'vehicle_plate': 8,
+    'customer_name': 4,
+    'vehicle_model': 2,
+    'service_description': 1,
+}
+INDEXED_FIELDS = frozenset(FIELD_WEIGHTS)
+MAX_TERMS = 8
+RAREST_TERM_SAMPLE = 1000
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [w[:64] for w in _WORD.findall(normalize_name(text))]
+
+
+def job_tokens(job):
+    """Return {token: weight} for a job."""
+    tokens = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = getattr(job, field) or ''
+        words = tokenize(value)
+        if field == 'vehicle_plate' and len(words) > 1:
+            # "ABC-123" is also found when typed as "abc123"
+            words.append(''.join(words)[:64])
+        for word in words:
+            if len(word) > 1 or field != 'service_description':
+                tokens[word] = max(weight, tokens.get(word, 0))
+    return tokens
+
+
+def index_job(job):
+    """Bring the job's index entries up to date, writing only the difference."""
+    wanted = job_tokens(job)
+    current = dict(JobSearchToken.objects.filter(job=job).values_list('token', 'weight'))
+    stale = [t for t, w in current.items() if wanted.get(t) != w]
+    if stale:
+        JobSearchToken.objects.filter(job=job, token__in=stale).delete()
+    JobSearchToken.objects.bulk_create([
+        JobSearchToken(job=job, token=t, weight=w) for t, w in wanted.items() if current.get(t) != w
+    ])
+
+
+def rebuild_index(batch_size=2000):
+    """Rebuild the index for every job; returns the number of jobs indexed."""
+    fields = ['id', *FIELD_WEIGHTS]
+    count = 0
+    with transaction.atomic():
+        JobSearchToken.objects.all().delete()
+        batch = []
+        for job in Job.objects.only(*fields).order_by('id').iterator(chunk_size=batch_size):
+            batch += [JobSearchToken(job_id=job.id, token=t, weight=w) for t, w in job_tokens(job).items()]
+            count += 1
+            if len(batch) >= batch_size:
+                JobSearchToken.objects.bulk_create(batch)
+                batch = []
+        JobSearchToken.objects.bulk_create(batch)
+    return count
+
+
+def _prefix(term):
+    # a range instead of LIKE 'term%' so every backend can use the index
+    return Q(token__gte=term, token__lt=term[:-1] + chr(ord(term[-1]) + 1))
+
+
+def ranked(query):
+    """Values queryset of ``{'job_id', 'score'}`` for jobs matching every term.
+
+    Returns ``None`` when the query has no searchable words.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_TERMS]
+    if not terms:
+        return None
+    tokens = JobSearchToken.objects.all()
+    if len(terms) > 1:
+        # drive the query from the rarest term so a common word such as a
+        # frequent customer name does not pull in most of the index
+        def frequency(term):
+            return JobSearchToken.objects.filter(_prefix(term))[:RAREST_TERM_SAMPLE].count()
+        rarest = min(terms, key=frequency)
+        tokens = tokens.filter(job_id__in=JobSearchToken.objects.filter(_prefix(rarest)).values('job_id'))
+
+    matches = Q()
+    per_term = {}
+    for i, term in enumerate(terms):
+        matches |= _prefix(term)
+        per_term[f'term_{i}'] = Max(Case(When(_prefix(term), then='weight'),
+                                         default=Value(0), output_field=IntegerField()))
+    score = sum((F(name) for name in per_term), Value(0))
+    return (tokens.filter(matches).values('job_id')
+            .annotate(**per_term).filter(**{f'{name}__gt': 0 for name in per_term})
+            .annotate(score=score).order_by())
+
+
+def matching_job_ids(query):
+    """Subquery of the ids of jobs matching ``query``, for ``id__in`` filters."""
+    rows = ranked(query)
+    return rows.values('job_id') if rows is not None else Job.objects.none().values('id')
+
+
+def search_jobs(query, limit=20):
+    """Return (job, score) pairs for the best ``limit`` matches."""
+    rows = ranked(query)
+    if rows is None:
+        return []
+    top = list(rows.order_by('-score', '-job_id')[:limit])
+    jobs = Job.objects.select_related('technician').in_bulk([r['job_id'] for r in top])
+    return [(jobs[r['job_id']], r['score']) for r in top if r['job_id'] in jobs]
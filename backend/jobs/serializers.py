@@ -100,8 +100,8 @@ class JobSerializer(serializers.ModelSerializer):
         # Handle customer creation if needed
         customer_name = data.pop('customer_name', None)
         if not data.get('customer') and customer_name:
-            customer, created = Customer.objects.get_or_create(
-                name=customer_name,
+            customer, created = Customer.objects.get_or_create_by_name(
+                customer_name,
                 defaults={'phone': '', 'email': '', 'address': ''}
             )
             data['customer'] = customer
@@ -260,3 +260,30 @@ class TechnicianJobSerializer(serializers.ModelSerializer):
                 'email': obj.customer.email
             }
         return None
+
+
+class TechnicianJobSummarySerializer(TechnicianJobSerializer):
+    """Technician job with only the count and newest entry of each sub-resource (``?summary=1``)
+
+    Expects the ``<name>_count`` annotations and ``latest_<name>`` prefetches
+    set up by ``technician_dashboard``.
+    """
+    progress_updates = serializers.SerializerMethodField()
+    parts_requests = serializers.SerializerMethodField()
+    messages = serializers.SerializerMethodField()
+
+    def _summary(self, obj, name, serializer_class):
+        latest = getattr(obj, f'latest_{name}')
+        return {
+            'count': getattr(obj, f'{name}_count'),
+            'latest': serializer_class(latest[0]).data if latest else None,
+        }
+
+    def get_progress_updates(self, obj):
+        return self._summary(obj, 'progress_updates', JobProgressSerializer)
+
+    def get_parts_requests(self, obj):
+        return self._summary(obj, 'parts_requests', PartsRequestSerializer)
+
+    def get_messages(self, obj):
+        return self._summary(obj, 'messages', TechnicianMessageSerializer)
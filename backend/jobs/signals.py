@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Job, JobPart
+from .search import INDEXED_FIELDS, index_job
+
+
+@receiver(post_save, sender=Job)
+def reindex_job(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not INDEXED_FIELDS & set(update_fields):
+        return
+    index_job(instance)
+
+
+@receiver(post_delete, sender=JobPart)
+def touch_job(sender, instance, origin=None, **kwargs):
+    # removing a part changes the job's costs but not its updated_at, which
+    # Last-Modified on the job detail is derived from (api.conditional)
+    if isinstance(origin, Job):
+        return
+    Job.objects.filter(pk=instance.job_id).update(updated_at=timezone.now())
@@ -0,0 +1,100 @@
+"""Job counters for the job management screens.
+
+``job_stats`` computes every counter with one conditional-aggregate query
+(``Count(filter=Q(...))``) over the jobs matching the given filters, so the
+same engine serves the overall, per-technician and per-customer views.
+``cached_job_stats`` keeps results for ``JOB_STATS_CACHE_TIMEOUT`` seconds,
+keyed on the Job table's change marker (newest ``updated_at`` and row count)
+so any save, insert or delete misses the cache, including ``bulk_create``
+which sends no signals.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from api.exports import InvalidDateRange, date_range
+
+from .models import Job
+
+OPEN_STATUSES = ('pending', 'in_progress')
+STATUSES = [value for value, _ in Job.STATUS_CHOICES]
+PRIORITIES = [value for value, _ in Job.PRIORITY_CHOICES]
+
+
+class InvalidFilter(Exception):
+    pass
+
+
+def requested_filters(request, technician_id=None, customer_id=None):
+    """``job_stats`` filters from the URL ids or ``?technician=``/``?customer=``, and ``?from=``/``?to=``.
+
+    Raises ``InvalidFilter``.
+    """
+    filters = {
+        'technician': technician_id or request.GET.get('technician'),
+        'customer': customer_id or request.GET.get('customer'),
+    }
+    try:
+        filters = {name: int(value) for name, value in filters.items() if value}
+    except ValueError:
+        raise InvalidFilter("'technician' and 'customer' must be ids")
+    try:
+        filters['start'], filters['end'] = date_range(request)
+    except InvalidDateRange as e:
+        raise InvalidFilter(str(e))
+    return filters
+
+
+def job_filter(technician=None, customer=None, start=None, end=None):
+    """Q for jobs of a technician (assigned or legacy field), of a customer and created between ``start`` and ``end``."""
+    q = Q()
+    if technician is not None:
+        q &= Q(assigned_technician_id=technician) | Q(technician_id=technician)
+    if customer is not None:
+        q &= Q(customer_id=customer)
+    if start is not None:
+        q &= Q(created_at__gte=start)
+    if end is not None:
+        q &= Q(created_at__lte=end)
+    return q
+
+
+def job_stats(**filters):
+    today = timezone.localdate()
+    open_jobs = Q(status__in=OPEN_STATUSES)
+    counters = {
+        'total': Count('id'),
+        'overdue': Count('id', filter=open_jobs & Q(due_date__lt=today)),
+        'due_this_week': Count('id', filter=open_jobs & Q(due_date__gte=today, due_date__lte=today + timedelta(days=7))),
+        'recent': Count('id', filter=Q(created_at__gte=timezone.now() - timedelta(days=7))),
+    }
+    counters.update({f'status:{s}': Count('id', filter=Q(status=s)) for s in STATUSES})
+    counters.update({f'priority:{p}': Count('id', filter=Q(priority=p)) for p in PRIORITIES})
+    data = Job.objects.filter(job_filter(**filters)).aggregate(**counters)
+    return {
+        'total_jobs': data['total'],
+        'status_breakdown': {s: data[f'status:{s}'] for s in STATUSES if data[f'status:{s}']},
+        'priority_breakdown': {p: data[f'priority:{p}'] for p in PRIORITIES if data[f'priority:{p}']},
+        'overdue_jobs': data['overdue'],
+        'due_this_week': data['due_this_week'],
+        'recent_jobs': data['recent'],
+    }
+
+
+def change_marker():
+    marker = Job.objects.aggregate(last=Max('updated_at'), count=Count('id'))
+    return marker['count'], marker['last'] and marker['last'].isoformat()
+
+
+def cached_job_stats(**filters):
+    raw = repr((sorted(filters.items()), change_marker(), timezone.localdate()))
+    key = f'job-stats:{hashlib.md5(raw.encode()).hexdigest()}'
+    data = cache.get(key)
+    if data is None:
+        data = job_stats(**filters)
+        cache.set(key, data, settings.JOB_STATS_CACHE_TIMEOUT)
+    return data
@@ -1,3 +1,414 @@
-from django.test import TestCase
+import os
+import time
+from datetime import date, timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import User
+from inventory.models import Customer
+
+from .models import Job, JobPart, JobProgress, JobStatusHistory, PartsRequest, TechnicianMessage, TechnicianProfile
+from .search import matching_job_ids, rebuild_index, search_jobs
+
+
+def make_job(customer, **kwargs):
+    fields = {
+        'customer': customer,
+        'customer_name': customer.name,
+        'vehicle_model': 'Corolla',
+        'vehicle_plate': 'ABC-123',
+        'vehicle_year': 2015,
+        'service_description': 'Alternator replacement',
+        'estimated_hours': 2,
+        'estimated_cost': 100,
+        'due_date': date.today(),
+    }
+    fields.update(kwargs)
+    return Job.objects.create(**fields)
+
+
+class JobsListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor', verified=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        customer = Customer.objects.create(name='Tendai')
+        self.jobs = [make_job(customer) for _ in range(7)]
+        # several jobs share a created_at so the id tie-break is exercised
+        Job.objects.filter(pk__in=[j.pk for j in self.jobs[2:5]]).update(created_at=self.jobs[2].created_at)
+
+    def test_legacy_shape_without_page_params(self):
+        response = self.client.get('/api/jobs/')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_cursor_walks_every_job_once_in_order(self):
+        seen = []
+        url = '/api/jobs/?page_size=3&include_total=1'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['approximate_total'], 7)
+            seen += [row['id'] for row in response.data['results']]
+            cursor = response.data['next_cursor']
+            url = f'/api/jobs/?page_size=3&include_total=1&cursor={cursor}' if cursor else None
+        expected = list(Job.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/jobs/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+
+class JobsConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor', verified=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.job = make_job(Customer.objects.create(name='Tendai'))
+
+    def test_matching_etag_returns_304_until_a_job_changes(self):
+        etag = self.client.get('/api/jobs/')['ETag']
+        self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.job.status = 'completed'
+        self.job.save()
+        self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_changes_when_a_job_is_deleted(self):
+        make_job(self.job.customer)
+        etag = self.client.get('/api/jobs/')['ETag']
+        self.job.delete()
+        self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_changes_when_a_part_is_removed(self):
+        older = JobPart.objects.create(job=self.job, part_number='P-1', part_name='Filter', quantity_used=1, unit_cost=5)
+        newer = JobPart.objects.create(job=self.job, part_number='P-2', part_name='Pads', quantity_used=1, unit_cost=40)
+        url = f'/api/jobs/{self.job.pk}/'
+        etag = self.client.get(url)['ETag']
+        older.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(pk=self.job.pk).update(updated_at=an_hour_ago)
+        JobPart.objects.filter(pk=newer.pk).update(added_at=an_hour_ago)
+        JobStatusHistory.objects.filter(job=self.job).update(changed_at=an_hour_ago)
+        Customer.objects.update(updated_at=an_hour_ago)
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        newer.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Tendai Moyo')
+        self.plate = make_job(self.customer, vehicle_plate='BRK-442', service_description='Oil change')
+        self.model = make_job(self.customer, vehicle_model='Brkline Van', service_description='Brake pads')
+        self.other = make_job(Customer.objects.create(name='Chipo Dube'), customer_name='Chipo Dube')
+
+    def test_prefix_terms_rank_by_field_weight(self):
+        results = search_jobs('brk')
+        self.assertEqual([job.pk for job, _ in results], [self.plate.pk, self.model.pk])
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_every_term_must_match(self):
+        self.assertEqual([job.pk for job, _ in search_jobs('tendai oil')], [self.plate.pk])
+        self.assertEqual(search_jobs('chipo oil'), [])
+        self.assertEqual([job.pk for job, _ in search_jobs('brk442')], [self.plate.pk])
+
+    def test_index_follows_job_saves(self):
+        self.other.service_description = 'Gearbox rebuild'
+        self.other.save()
+        self.assertEqual([job.pk for job, _ in search_jobs('gearb')], [self.other.pk])
+        self.other.service_description = 'Clutch'
+        self.other.save()
+        self.assertEqual(search_jobs('gearb'), [])
+
+    def test_jobs_list_search_param_uses_index(self):
+        user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor', verified=True)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/jobs/', {'search': 'Chipo'})
+        self.assertEqual([row['id'] for row in response.data], [self.other.pk])
+        response = client.get('/api/jobs/search/', {'q': 'brake'})
+        self.assertEqual([row['id'] for row in response.data], [self.model.pk])
+
+
+class JobStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+        self.tech = User.objects.create_user('tech', 'tech@example.com', 'pw', role='technician')
+        self.customer = Customer.objects.create(name='Tendai')
+        other = Customer.objects.create(name='Chipo')
+        today = date.today()
+        make_job(self.customer, assigned_technician=self.tech, due_date=today - timedelta(days=2), priority='High')
+        make_job(self.customer, technician=self.tech, status='in_progress', due_date=today + timedelta(days=3))
+        make_job(other, status='completed')
+
+    def test_counters_in_a_single_aggregate(self):
+        with self.assertNumQueries(2):  # change marker + aggregate
+            data = self.client.get('/api/jobs/stats/').data
+        self.assertEqual(data, {
+            'total_jobs': 3,
+            'status_breakdown': {'pending': 1, 'in_progress': 1, 'completed': 1},
+            'priority_breakdown': {'Medium': 2, 'High': 1},
+            'overdue_jobs': 1,
+            'due_this_week': 1,
+            'recent_jobs': 3,
+        })
+        with self.assertNumQueries(1):
+            self.client.get('/api/jobs/stats/')
+
+    def test_filters(self):
+        self.assertEqual(self.client.get(f'/api/jobs/technician/{self.tech.pk}/stats/').data['total_jobs'], 2)
+        self.assertEqual(self.client.get(f'/api/jobs/customer/{self.customer.pk}/stats/').data['total_jobs'], 2)
+        self.assertEqual(self.client.get('/api/jobs/stats/', {'to': '2000-01-01'}).data['total_jobs'], 0)
+        response = self.client.get('/api/jobs/stats/', {'technician': 'x'})
+        self.assertEqual((response.status_code, response.data['message']),
+                         (400, "'technician' and 'customer' must be ids"))
+        response = self.client.get('/api/jobs/stats/', {'from': 'soon'})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('must be ids', response.data['message'])
+
+    def test_cache_follows_the_change_marker(self):
+        self.assertEqual(self.client.get('/api/jobs/stats/').data['total_jobs'], 3)
+        Job.objects.bulk_create([Job(customer=self.customer, vehicle_model='Axio', vehicle_plate='X-1',
+                                     vehicle_year=2012, service_description='Tyres', estimated_hours=1,
+                                     estimated_cost=10, due_date=date.today())])
+        self.assertEqual(self.client.get('/api/jobs/stats/').data['total_jobs'], 4)
+
+
+class TechnicianPerformanceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+        self.customer = Customer.objects.create(name='Tendai')
+        self.today = date.today()
+
+    def technician(self, name):
+        return User.objects.create_user(name, f'{name}@example.com', 'pw', role='technician')
+
+    def complete(self, tech, hours, estimate, cost, late=False, **kwargs):
+        return make_job(self.customer, assigned_technician=tech, status='completed', completed_at=timezone.now(),
+                        actual_hours=hours, estimated_hours=estimate, actual_cost=cost,
+                        due_date=self.today - timedelta(days=1) if late else self.today, **kwargs)
+
+    def performance(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/analytics/technicians/')
+        self.assertEqual(response.status_code, 200)
+        return {row['username']: row for row in response.data['technicians']}, len(queries)
+
+    def test_metrics_per_technician(self):
+        tendai, chipo = self.technician('tendai'), self.technician('chipo')
+        self.complete(tendai, 3, 2, 150)
+        self.complete(tendai, 5, 4, 250, late=True)
+        make_job(self.customer, assigned_technician=tendai, status='in_progress')
+        make_job(self.customer, technician=chipo, status='pending')
+        rows, _ = self.performance()
+        self.assertEqual(
+            {k: rows['tendai'][k] for k in ('jobs_received', 'completed', 'on_time', 'on_time_rate', 'active_jobs',
+                                            'avg_actual_hours', 'avg_estimated_hours', 'hours_ratio', 'revenue')},
+            {'jobs_received': 3, 'completed': 2, 'on_time': 1, 'on_time_rate': 50.0, 'active_jobs': 1,
+             'avg_actual_hours': 4.0, 'avg_estimated_hours': 3.0, 'hours_ratio': 1.33, 'revenue': 400.0})
+        self.assertEqual((rows['chipo']['active_jobs'], rows['chipo']['completed']), (1, 0))
+
+    def test_query_count_does_not_grow_with_technicians(self):
+        for n in range(2):
+            self.complete(self.technician(f'tech{n}'), 2, 2, 100)
+        _, few = self.performance()
+        for n in range(2, 12):
+            self.complete(self.technician(f'tech{n}'), 2, 2, 100)
+        cache.clear()
+        rows, many = self.performance()
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(few, many)
+
+    @override_settings(REPORT_MAX_DAYS=90)
+    def test_range_is_validated_and_capped(self):
+        url = '/api/jobs/analytics/technicians/'
+        self.assertEqual(self.client.get(url, {'from': '2026-02-01', 'to': '2026-01-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'from': '2020-01-01', 'to': '2026-01-01'}).status_code, 400)
+        response = self.client.get(url, {'from': '2026-01-01', 'to': '2026-03-01'})
+        self.assertEqual((response.status_code, response.data['from']), (200, date(2026, 1, 1)))
+
+    def test_admin_technicians_counts_in_one_query(self):
+        for n in range(5):
+            make_job(self.customer, assigned_technician=self.technician(f'tech{n}'))
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/auth/admin/technicians')
+        self.assertEqual([row['assigned_jobs_count'] for row in response.data], [1] * 5)
+
+
+class DashboardWidgetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+        self.customer = Customer.objects.create(name='Tendai')
+
+    def technician(self, name):
+        return User.objects.create_user(name, f'{name}@example.com', 'pw', role='technician')
+
+    def test_active_jobs_are_grouped_and_capped_per_column(self):
+        today = date.today()
+        for n in range(4):
+            make_job(self.customer, due_date=today + timedelta(days=n))
+        urgent = make_job(self.customer, priority='High', due_date=today + timedelta(days=9))
+        working = make_job(self.customer, status='in_progress', assigned_technician=self.technician('tendai'))
+        JobProgress.objects.create(job=working, technician=working.assigned_technician, progress_percentage=40,
+                                   description='Stripped down')
+        make_job(self.customer, status='completed')
+
+        with self.assertNumQueries(1):
+            columns = self.client.get('/api/auth/dashboard/active-jobs', {'limit': 3}).data['columns']
+        columns = {column['status']: column for column in columns}
+        self.assertEqual(list(columns), ['pending', 'in_progress', 'on_hold'])
+        self.assertEqual(columns['pending']['count'], 5)
+        self.assertEqual(len(columns['pending']['jobs']), 3)
+        self.assertEqual(columns['pending']['jobs'][0]['id'], urgent.pk)
+        job = columns['in_progress']['jobs'][0]
+        self.assertEqual((job['technician'], job['progress'], job['vehicle']), ('tendai', 40, '2015 Corolla - ABC-123'))
+        self.assertEqual(columns['on_hold'], {'status': 'on_hold', 'count': 0, 'jobs': []})
+
+    def test_technician_activity_merges_latest_events(self):
+        tendai, chipo = self.technician('tendai'), self.technician('chipo')
+        TechnicianProfile.objects.create(user=chipo, is_available=False)
+        job = make_job(self.customer, status='in_progress', assigned_technician=tendai, started_at=timezone.now())
+        make_job(self.customer, technician=tendai, status='completed', completed_at=timezone.now(),
+                 estimated_hours=3, actual_hours=4)
+        for pct in (20, 50, 70):
+            JobProgress.objects.create(job=job, technician=tendai, progress_percentage=pct, description=f'{pct}%')
+        JobStatusHistory.objects.create(job=job, old_status='pending', new_status='in_progress', changed_by=tendai)
+
+        rows = {row['name']: row for row in self.client.get('/api/auth/dashboard/technician-activity',
+                                                            {'events': 3}).data}
+        tendai_row = rows['tendai']
+        self.assertEqual((tendai_row['status'], tendai_row['job_id'], tendai_row['progress']), ('active', job.pk, 70))
+        self.assertEqual((tendai_row['completedToday'], tendai_row['efficiency']), (1, 75))
+        self.assertEqual(len(tendai_row['events']), 3)
+        self.assertEqual({event['type'] for event in tendai_row['events']}, {'progress', 'status'})
+        self.assertEqual((rows['chipo']['status'], rows['chipo']['events']), ('offline', []))
+
+    def test_technician_activity_query_count_is_constant(self):
+        def add(n):
+            tech = self.technician(f'tech{n}')
+            job = make_job(self.customer, status='in_progress', assigned_technician=tech)
+            JobProgress.objects.create(job=job, technician=tech, progress_percentage=10, description='Started')
+            JobStatusHistory.objects.create(job=job, new_status='in_progress', changed_by=tech)
+
+        add(0)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get('/api/auth/dashboard/technician-activity')
+        for n in range(1, 10):
+            add(n)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/api/auth/dashboard/technician-activity')
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(len(few), len(many))
+        self.assertLessEqual(len(many), 4)
+
+
+class TechnicianDashboardTests(TestCase):
+    def setUp(self):
+        self.tech = User.objects.create_user('tech', 'tech@example.com', 'pw', role='technician')
+        self.supervisor = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor')
+        self.client = APIClient()
+        self.client.force_authenticate(self.tech)
+        self.customer = Customer.objects.create(name='Tendai')
+
+    def add_job(self, updates=2):
+        job = make_job(self.customer, technician=self.tech)
+        for n in range(updates):
+            JobProgress.objects.create(job=job, technician=self.tech, progress_percentage=n * 10, description=f'Step {n}')
+            PartsRequest.objects.create(job=job, technician=self.tech, part_number='P-1', part_name='Filter',
+                                        quantity_requested=1, reason='Worn', approved_by=self.supervisor)
+            TechnicianMessage.objects.create(job=job, sender=self.supervisor, recipient=self.tech, message=f'Note {n}')
+        return job
+
+    def dashboard(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/jobs/technician-dashboard/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_query_count_does_not_grow_with_jobs(self):
+        self.add_job()
+        _, few = self.dashboard()
+        for _ in range(5):
+            self.add_job(updates=3)
+        data, many = self.dashboard()
+        self.assertEqual(len(data), 6)
+        self.assertEqual(few, many)
+        self.assertEqual(data[0]['messages'][0]['sender_name'], 'sup')
+        self.assertEqual(data[0]['parts_requests'][0]['approved_by_name'], 'sup')
+
+    def test_summary_has_counts_and_latest_items(self):
+        self.add_job(updates=3)
+        self.add_job(updates=0)
+        data, queries = self.dashboard(summary=1)
+        self.assertEqual(queries, 4)
+        empty, job = data
+        self.assertEqual(empty['messages'], {'count': 0, 'latest': None})
+        self.assertEqual(job['progress_updates']['count'], 3)
+        self.assertEqual(job['progress_updates']['latest']['description'], 'Step 2')
+        self.assertEqual(job['parts_requests']['count'], 3)
+
+    def test_sub_resource_pages(self):
+        job = self.add_job(updates=3)
+        page = self.client.get(f'/api/jobs/{job.pk}/messages/', {'page_size': 2}).data
+        self.assertEqual([m['message'] for m in page['results']], ['Note 2', 'Note 1'])
+        rest = self.client.get(f'/api/jobs/{job.pk}/messages/', {'page_size': 2, 'cursor': page['next_cursor']}).data
+        self.assertEqual([m['message'] for m in rest['results']], ['Note 0'])
+        # paginated with the default page size even without ?page_size=
+        for params in ({}, {'paginate': 0}):
+            page = self.client.get(f'/api/jobs/{job.pk}/progress-updates/', params).data
+            self.assertEqual((len(page['results']), page['page_size'], page['has_more']), (3, settings.API_PAGE_SIZE, False))
+
+        other = User.objects.create_user('other', 'other@example.com', 'pw', role='technician')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/parts-requests/').status_code, 403)
+        self.assertEqual(self.client.get('/api/jobs/999999/parts-requests/').status_code, 404)
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class JobSearchBenchmark(TestCase):
+    JOBS = 100000
+
+    def test_index_against_icontains(self):
+        customer = Customer.objects.create(name='Bench')
+        words = ['alternator', 'brake', 'clutch', 'gearbox', 'radiator', 'service', 'suspension', 'wiring']
+        Job.objects.bulk_create([
+            Job(customer=customer, customer_name=f'Customer {i % 5000}', vehicle_model=f'Model {i % 300}',
+                vehicle_plate=f'P{i:06d}', vehicle_year=2010, estimated_hours=1, estimated_cost=50,
+                due_date=date.today(),
+                service_description=f'{words[i % 8]} {words[(i * 7) % 8]} check number {i}')
+            for i in range(self.JOBS)
+        ], batch_size=5000)
+        rebuild_index()
+        term = 'Customer 4321'
+
+        def legacy():
+            return list(Job.objects.filter(
+                Q(customer_name__icontains=term) | Q(vehicle_model__icontains=term) |
+                Q(vehicle_plate__icontains=term) | Q(service_description__icontains=term)
+            ).values_list('id', flat=True))
+
+        def indexed():
+            return list(Job.objects.filter(id__in=matching_job_ids(term)).values_list('id', flat=True))
+
+        for name, query in (('icontains', legacy), ('token index', indexed)):
+            start = time.perf_counter()
+            for _ in range(5):
+                found = query()
+            print(f'{name}: {len(found)} jobs in {(time.perf_counter() - start) / 5 * 1000:.1f}ms')
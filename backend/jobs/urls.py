@@ -1,15 +1,24 @@
+from django.conf import settings
 from django.urls import path
+from api import async_views
 from . import views
 
+aggregates = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     # Main job endpoints
     path('', views.jobs_list, name='jobs_list'),
     path('<int:pk>/', views.job_detail, name='job_detail'),
     
     # Job statistics and filtering
-    path('stats/', views.job_stats, name='job_stats'),
+    path('stats/', aggregates.job_stats, name='job_stats'),
+    path('analytics/technicians/', views.technician_performance, name='technician_performance'),
+    path('search/', views.job_search, name='job_search'),
+    path('export/', views.export_jobs_csv, name='jobs_export'),
     path('customer/<int:customer_id>/', views.customer_jobs, name='customer_jobs'),
+    path('customer/<int:customer_id>/stats/', aggregates.job_stats, name='customer_job_stats'),
     path('technician/<int:technician_id>/', views.technician_jobs, name='technician_jobs'),
+    path('technician/<int:technician_id>/stats/', aggregates.job_stats, name='technician_job_stats'),
     
     # Job parts management
     path('<int:job_id>/parts/', views.job_parts, name='job_parts'),
@@ -32,6 +41,9 @@ urlpatterns = [
     path('<int:job_id>/progress/', views.update_job_progress, name='update_job_progress'),
     path('<int:job_id>/request-parts/', views.request_parts, name='request_parts'),
     path('<int:job_id>/send-message/', views.send_message, name='send_message'),
+    path('<int:job_id>/progress-updates/', views.job_sub_resource, {'resource': 'progress_updates'}, name='job_progress_updates'),
+    path('<int:job_id>/parts-requests/', views.job_sub_resource, {'resource': 'parts_requests'}, name='job_parts_requests'),
+    path('<int:job_id>/messages/', views.job_sub_resource, {'resource': 'messages'}, name='job_messages'),
     
     # Messages
     path('messages/', views.get_messages, name='get_messages'),
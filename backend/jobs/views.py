@@ -3,26 +3,36 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.db.models import Q, Count
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import timedelta, datetime
 
 from .serializers import (
     JobSerializer, JobListSerializer, JobPartSerializer, JobStatusHistorySerializer,
     TechnicianProfileSerializer, JobProgressSerializer, JobReassignmentSerializer,
-    PartsRequestSerializer, TechnicianMessageSerializer, TechnicianJobSerializer
+    PartsRequestSerializer, TechnicianMessageSerializer, TechnicianJobSerializer,
+    TechnicianJobSummarySerializer
 )
 from .models import (
     Job, JobPart, JobStatusHistory, TechnicianProfile, JobProgress, 
     JobReassignment, PartsRequest, TechnicianMessage
 )
+from . import analytics
+from .search import matching_job_ids, search_jobs
+from .stats import InvalidFilter, cached_job_stats, requested_filters
 from inventory.models import Customer
 from api.models import User
+from api.cache import cached_response
+from api.conditional import conditional_get, row_fingerprint, table_fingerprint
+from api.exports import InvalidDateRange, csv_response, filter_dates
+from api.pagination import paginate
+from api.periods import InvalidPeriod, requested_days
 
 
 @api_view(['GET', 'POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_get(table_fingerprint('jobs.Job'))
 def jobs_list(request):
     """List all jobs or create a new job"""
     
@@ -47,19 +57,13 @@ def jobs_list(request):
         if customer_filter:
             queryset = queryset.filter(customer_id=customer_filter)
         if search:
-            queryset = queryset.filter(
-                Q(customer_name__icontains=search) |
-                Q(vehicle_model__icontains=search) |
-                Q(vehicle_plate__icontains=search) |
-                Q(service_description__icontains=search)
-            )
+            queryset = queryset.filter(id__in=matching_job_ids(search))
         
         # Order by creation date (newest first)
         queryset = queryset.order_by('-created_at')
         
         # Use list serializer for performance
-        serializer = JobListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return paginate(request, queryset, '-created_at', lambda rows: JobListSerializer(rows, many=True).data)
     
     elif request.method == 'POST':
         serializer = JobSerializer(data=request.data, context={'request': request})
@@ -75,6 +79,7 @@ def jobs_list(request):
 @api_view(['GET', 'PUT', 'DELETE'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_get(row_fingerprint('jobs.Job', 'customer__updated_at', 'parts_used__added_at', 'status_history__changed_at'))
 def job_detail(request, pk):
     """Retrieve, update or delete a job"""
     try:
@@ -114,44 +119,48 @@ def job_detail(request, pk):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
-def job_stats(request):
-    """Get job statistics"""
+def export_jobs_csv(request):
+    """Stream jobs as CSV (?from=/?to= filter on creation date)"""
+    try:
+        qs = filter_dates(Job.objects.all(), 'created_at', request)
+    except InvalidDateRange as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    fields = [
+        'id', 'created_at', 'status', 'priority', 'customer_name', 'vehicle_model', 'vehicle_plate',
+        'vehicle_year', 'service_description', 'estimated_hours', 'estimated_cost', 'actual_hours',
+        'actual_cost', 'due_date', 'completed_at',
+    ]
+    return csv_response(request, 'jobs.csv', fields + ['technician'], qs, fields + ['technician__username'])
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def job_search(request):
+    """Ranked job search: ?q= words (prefixes allowed), ?limit= best matches"""
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+    results = []
+    for job, score in search_jobs(request.GET.get('q', ''), limit):
+        row = JobListSerializer(job).data
+        row['score'] = score
+        results.append(row)
+    return Response(results)
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def job_stats(request, technician_id=None, customer_id=None):
+    """Get job statistics (?technician=, ?customer=, ?from=/?to= on creation date)"""
+    try:
+        filters = requested_filters(request, technician_id, customer_id)
+    except InvalidFilter as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        # Get counts by status
-        status_counts = Job.objects.values('status').annotate(count=Count('id'))
-        status_data = {item['status']: item['count'] for item in status_counts}
-        
-        # Get counts by priority
-        priority_counts = Job.objects.values('priority').annotate(count=Count('id'))
-        priority_data = {item['priority']: item['count'] for item in priority_counts}
-        
-        # Get overdue jobs
-        today = timezone.now().date()
-        overdue_count = Job.objects.filter(
-            due_date__lt=today,
-            status__in=['pending', 'in_progress']
-        ).count()
-        
-        # Get jobs due this week
-        week_end = today + timedelta(days=7)
-        due_this_week = Job.objects.filter(
-            due_date__gte=today,
-            due_date__lte=week_end,
-            status__in=['pending', 'in_progress']
-        ).count()
-        
-        # Get recent activity (jobs created in last 7 days)
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_jobs = Job.objects.filter(created_at__gte=week_ago).count()
-        
-        return Response({
-            'total_jobs': Job.objects.count(),
-            'status_breakdown': status_data,
-            'priority_breakdown': priority_data,
-            'overdue_jobs': overdue_count,
-            'due_this_week': due_this_week,
-            'recent_jobs': recent_jobs
-        })
+        return Response(cached_job_stats(**filters))
     except Exception as e:
         return Response(
             {'message': str(e)},
@@ -159,15 +168,29 @@ def job_stats(request):
         )
 
 
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+@cached_response('jobs.Job', 'api.User')
+def technician_performance(request):
+    """Per-technician throughput, hours, on-time rate, load and revenue between ?from= and ?to= (default: last 30 days)"""
+    if request.user.role not in ('admin', 'supervisor'):
+        return Response({'message': 'Forbidden'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        start, end = requested_days(request)
+    except InvalidPeriod as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'from': start, 'to': end, 'technicians': analytics.technician_performance(start, end)})
+
+
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def customer_jobs(request, customer_id):
     """Get all jobs for a specific customer"""
     try:
-        jobs = Job.objects.filter(customer_id=customer_id).order_by('-created_at')
-        serializer = JobListSerializer(jobs, many=True)
-        return Response(serializer.data)
+        jobs = Job.objects.filter(customer_id=customer_id).select_related('technician').order_by('-created_at')
+        return paginate(request, jobs, '-created_at', lambda rows: JobListSerializer(rows, many=True).data)
     except Exception as e:
         return Response(
             {'message': str(e)},
@@ -181,9 +204,8 @@ def customer_jobs(request, customer_id):
 def technician_jobs(request, technician_id):
     """Get all jobs assigned to a specific technician"""
     try:
-        jobs = Job.objects.filter(technician_id=technician_id).order_by('-created_at')
-        serializer = JobListSerializer(jobs, many=True)
-        return Response(serializer.data)
+        jobs = Job.objects.filter(technician_id=technician_id).select_related('technician').order_by('-created_at')
+        return paginate(request, jobs, '-created_at', lambda rows: JobListSerializer(rows, many=True).data)
     except Exception as e:
         return Response(
             {'message': str(e)},
@@ -275,6 +297,7 @@ def update_job_status(request, job_id):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@cached_response('api.User')
 def available_technicians(request):
     """Get list of available technicians"""
     try:
@@ -291,6 +314,7 @@ def available_technicians(request):
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@cached_response('inventory.Customer')
 def available_customers(request):
     """Get list of available customers"""
     try:
@@ -391,26 +415,65 @@ def technician_profile_detail(request, pk):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+# nested lists of a technician job: model, users shown by name, newest-first ordering, serializer
+JOB_SUB_RESOURCES = {
+    'progress_updates': (JobProgress, ('technician',), '-created_at', JobProgressSerializer),
+    'parts_requests': (PartsRequest, ('technician', 'approved_by'), '-requested_at', PartsRequestSerializer),
+    'messages': (TechnicianMessage, ('sender', 'recipient'), '-sent_at', TechnicianMessageSerializer),
+}
+
+
+def _technician_jobs(technician, summary=False):
+    """Jobs of ``technician`` with their sub-resources loaded in one query each.
+
+    With ``summary`` only the count and the newest entry of each
+    sub-resource are loaded.
+    """
+    jobs = Job.objects.filter(technician=technician).select_related('customer').order_by('-created_at')
+    for name, (model, users, ordering, _) in JOB_SUB_RESOURCES.items():
+        rows = model.objects.select_related(*users).order_by(ordering, '-id')
+        if summary:
+            count = model.objects.filter(job=OuterRef('pk')).order_by().values('job').annotate(n=Count('id')).values('n')
+            jobs = jobs.annotate(**{f'{name}_count': Coalesce(Subquery(count), Value(0))})
+            jobs = jobs.prefetch_related(Prefetch(name, queryset=rows[:1], to_attr=f'latest_{name}'))
+        else:
+            jobs = jobs.prefetch_related(Prefetch(name, queryset=rows))
+    return jobs
+
+
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def technician_dashboard(request):
-    """Get technician's dashboard data - their assigned jobs"""
+    """Get technician's dashboard data - their assigned jobs (?summary=1: counts and latest item per sub-resource)"""
     if request.user.role != 'technician':
         return Response({'message': 'Only technicians can access this endpoint'}, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        # Get jobs assigned to this technician
-        jobs = Job.objects.filter(technician=request.user).prefetch_related(
-            'progress_updates', 'parts_requests', 'messages'
-        ).order_by('-created_at')
-        
-        serializer = TechnicianJobSerializer(jobs, many=True)
+        summary = request.GET.get('summary', '').lower() in ('1', 'true', 'yes')
+        serializer_class = TechnicianJobSummarySerializer if summary else TechnicianJobSerializer
+        serializer = serializer_class(_technician_jobs(request.user, summary), many=True)
         return Response(serializer.data)
     except Exception as e:
         return Response({'message': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def job_sub_resource(request, job_id, resource):
+    """Progress updates, parts requests or messages of a job, newest first (always paginated, ?page_size=/?cursor=)"""
+    job = Job.objects.filter(pk=job_id).values('technician_id', 'assigned_technician_id').first()
+    if job is None:
+        return Response({'message': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    if request.user.role == 'technician' and request.user.pk not in job.values():
+        return Response({'message': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    model, users, ordering, serializer_class = JOB_SUB_RESOURCES[resource]
+    rows = model.objects.filter(job_id=job_id).select_related(*users).order_by(ordering, '-id')
+    return paginate(request, rows, ordering, lambda page: serializer_class(page, many=True).data, always=True)
+
+
 @api_view(['POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
@@ -559,10 +622,9 @@ def get_messages(request):
     try:
         messages = TechnicianMessage.objects.filter(
             Q(sender=request.user) | Q(recipient=request.user)
-        ).order_by('-sent_at')
+        ).select_related('sender', 'recipient').order_by('-sent_at')
         
-        serializer = TechnicianMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        return paginate(request, messages, '-sent_at', lambda rows: TechnicianMessageSerializer(rows, many=True).data)
     except Exception as e:
         return Response({'message': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
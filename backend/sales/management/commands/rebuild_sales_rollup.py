@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from sales.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily sales rollup behind sales stats and summaries'
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_rollup()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} days'))
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def normalize_walk_in_customer(apps, schema_editor):
+    # 0002 can run after inventory's normalized-column backfill on a fresh
+    # database, leaving the seeded Walk-in customer without lookup values
+    Customer = apps.get_model('inventory', 'Customer')
+    Customer.objects.filter(name='Walk-in', name_normalized='').update(name_normalized='walk-in')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('sales', '0003_sale_updated_at'),
+        ('inventory', '0006_customer_normalized'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_walk_in_customer, migrations.RunPython.noop),
+    ]
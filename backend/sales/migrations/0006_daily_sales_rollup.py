@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:03
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollup(apps, schema_editor):
+    Sale = apps.get_model('sales', 'Sale')
+    SaleItem = apps.get_model('sales', 'SaleItem')
+    DailySalesRollup = apps.get_model('sales', 'DailySalesRollup')
+    days = {}
+    for row in Sale.objects.annotate(day=TruncDate('date')).values('day').annotate(total=Sum('total'), count=Count('id')):
+        days[row['day']] = DailySalesRollup(day=row['day'], total=row['total'] or 0, sale_count=row['count'])
+    for row in SaleItem.objects.annotate(day=TruncDate('sale__date')).values('day').annotate(qty=Sum('qty')):
+        if row['day'] in days:
+            days[row['day']].items_sold = row['qty'] or 0
+    DailySalesRollup.objects.bulk_create(days.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0005_sale_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('sale_count', models.IntegerField(default=0)),
+                ('items_sold', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
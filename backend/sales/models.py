@@ -6,6 +6,11 @@ class Sale(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     customer = models.ForeignKey(Customer, null=True, blank=True, on_delete=models.SET_NULL, related_name='sales')
     total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # newest-first feeds page on (date, id)
+        indexes = [models.Index(fields=['date', 'id'], name='sale_date_idx')]
 
     def __str__(self):
         customer_name = self.customer.name if self.customer else "Walk-in"
@@ -21,3 +26,15 @@ class SaleItem(models.Model):
 
     def __str__(self):
         return f"{self.qty} x {self.name}"
+
+
+class DailySalesRollup(models.Model):
+    """Sales totals for one local day, kept current by ``sales.rollup``."""
+    day = models.DateField(unique=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    sale_count = models.IntegerField(default=0)
+    items_sold = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.day}: {self.sale_count} sales, {self.total}"
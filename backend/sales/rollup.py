@@ -0,0 +1,82 @@
+"""Daily sales rollup.
+
+``DailySalesRollup`` holds total, sale count and items sold per local day so
+period reports (``sales_stats``, ``sales_summary``) read a handful of rows
+instead of aggregating raw sales. A day is recomputed from its sales, over a
+half-open datetime range the ``date`` index can serve, whenever one of its
+sales is created, edited or deleted (``sales.signals``).
+``rebuild_sales_rollup`` recomputes every day.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from api.periods import periods, start_of, trunc
+
+from .models import DailySalesRollup, Sale, SaleItem
+
+
+def sale_day(sale):
+    return timezone.localdate(sale.date)
+
+
+def refresh_day(day):
+    """Recompute the rollup row for ``day`` from its sales."""
+    start, end = start_of(day), start_of(day + timedelta(days=1))
+    sales = Sale.objects.filter(date__gte=start, date__lt=end).aggregate(total=Sum('total'), count=Count('id'))
+    items = SaleItem.objects.filter(sale__date__gte=start, sale__date__lt=end).aggregate(qty=Sum('qty'))
+    if not sales['count']:
+        DailySalesRollup.objects.filter(day=day).delete()
+        return
+    DailySalesRollup.objects.update_or_create(day=day, defaults={
+        'total': sales['total'] or 0,
+        'sale_count': sales['count'],
+        'items_sold': items['qty'] or 0,
+    })
+
+
+def schedule_refresh(day):
+    """Refresh ``day`` once the current transaction commits.
+
+    Failures are logged rather than raised, like the KPI refresh; the row
+    catches up on the next write that day or on a rebuild.
+    """
+    transaction.on_commit(lambda: refresh_day(day), robust=True)
+
+
+def rebuild_rollup():
+    """Recompute every day from scratch. Returns the number of days."""
+    days = {}
+    for row in Sale.objects.annotate(day=TruncDate('date')).values('day').annotate(total=Sum('total'), count=Count('id')):
+        days[row['day']] = DailySalesRollup(day=row['day'], total=row['total'] or 0, sale_count=row['count'])
+    for row in SaleItem.objects.annotate(day=TruncDate('sale__date')).values('day').annotate(qty=Sum('qty')):
+        if row['day'] in days:
+            days[row['day']].items_sold = row['qty'] or 0
+    with transaction.atomic():
+        DailySalesRollup.objects.all().delete()
+        DailySalesRollup.objects.bulk_create(days.values(), batch_size=1000)
+    return len(days)
+
+
+def summary(start, end, bucket='day'):
+    """Totals per ``bucket`` ('day', 'week' or 'month') for the days ``start``..``end``.
+
+    Every bucket in the range is returned, empty ones with zeros.
+    """
+    rows = (DailySalesRollup.objects.filter(day__gte=start, day__lte=end)
+            .values(period=trunc('day', bucket))
+            .annotate(sales_total=Sum('total'), count=Sum('sale_count'), items=Sum('items_sold')))
+    found = {row['period']: row for row in rows}
+    buckets = []
+    for period in periods(start, end, bucket):
+        row = found.get(period, {})
+        buckets.append({
+            'period': period.isoformat(),
+            'total': float(row.get('sales_total') or 0),
+            'count': row.get('count') or 0,
+            'items_sold': row.get('items') or 0,
+        })
+    return buckets
@@ -0,0 +1,154 @@
+"""Sale write path.
+
+All parts referenced by a sale are loaded with one ``select_for_update``
+query keyed by part number. Stock is checked against those locked rows,
+and the sale's items and ledger rows are written with ``bulk_create``, so
+the number of queries does not depend on the number of lines.
+
+Edits are applied as a diff against the stored lines (``update_sale``):
+only the net quantity change per part moves stock and reaches the ledger,
+and only the ``SaleItem`` rows that differ are written.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from rest_framework import serializers
+
+from inventory.models import Part
+from inventory.stock import add_stock, remove_stock
+
+from .models import Sale, SaleItem
+
+
+def lock_parts(part_numbers):
+    """Return {part_number: Part} for ``part_numbers``, locked until commit."""
+    parts = Part.objects.select_for_update().filter(part_number__in=set(part_numbers))
+    return {p.part_number: p for p in parts.only('id', 'part_number', 'unit_cost', 'current_stock')}
+
+
+def check_stock(items, parts, released=None):
+    """Raise a ValidationError keyed like ``items[<idx>].qty`` for lines that cannot be met.
+
+    ``released`` is stock per part number that the same operation puts
+    back first (the old lines of an edited sale).
+    """
+    released = released or {}
+    wanted = defaultdict(int)
+    for item in items:
+        wanted[item['part_number']] += int(item['qty'])
+    errors = {}
+    for idx, item in enumerate(items):
+        pn = item['part_number']
+        part = parts.get(pn)
+        if part is None:
+            # lines kept from before the part was removed are left alone
+            if pn in released:
+                continue
+            errors[f'items[{idx}].part_number'] = 'Part not found'
+            continue
+        available = part.current_stock + released.get(pn, 0)
+        if wanted[pn] > available:
+            errors[f'items[{idx}].qty'] = f'Insufficient stock for part {pn} (available {available})'
+    if errors:
+        raise serializers.ValidationError(errors)
+
+
+def sale_total(items):
+    return sum((int(item['qty']) * Decimal(item['unit']) for item in items), Decimal(0))
+
+
+def create_sale(validated_data):
+    """Create a sale with its items and take the stock out."""
+    items = validated_data.pop('items', [])
+    with transaction.atomic():
+        parts = lock_parts(item['part_number'] for item in items)
+        check_stock(items, parts)
+        sale = Sale.objects.create(total=sale_total(items), **validated_data)
+        SaleItem.objects.bulk_create([SaleItem(sale=sale, **item) for item in items])
+        remove_stock([
+            {'part': parts[item['part_number']], 'quantity': int(item['qty']),
+             'value': int(item['qty']) * Decimal(item['unit'])}
+            for item in items
+        ], notes=f'Sale #{sale.id}', source='sale')
+    return sale
+
+
+def _quantities(lines):
+    totals = defaultdict(int)
+    for line in lines:
+        if line['part_number']:
+            totals[line['part_number']] += int(line['qty'])
+    return totals
+
+
+def _match_items(old_items, new_lines):
+    """Pair new lines with stored items of the same part number, in order.
+
+    Returns ``(changed, created, removed)``: stored items whose fields were
+    updated in place, new unsaved items and stored items to delete.
+    """
+    stored = defaultdict(list)
+    for item in old_items:
+        stored[item.part_number].append(item)
+    changed, created = [], []
+    for line in new_lines:
+        candidates = stored.get(line['part_number'])
+        if not candidates:
+            created.append(line)
+            continue
+        item = candidates.pop(0)
+        if any(getattr(item, field) != value for field, value in line.items()):
+            for field, value in line.items():
+                setattr(item, field, value)
+            changed.append(item)
+    removed = [item for items in stored.values() for item in items]
+    return changed, created, removed
+
+
+def update_sale(sale, validated_data):
+    """Apply an edit to ``sale``.
+
+    Without an ``items`` key the lines are left as they are. Otherwise the
+    new lines are diffed against the stored ones by part number: stock moves
+    by the net change per part, one ledger row each way at most.
+    """
+    items = validated_data.pop('items', None)
+    with transaction.atomic():
+        sale = Sale.objects.select_for_update().get(pk=sale.pk)
+        for attr, value in validated_data.items():
+            setattr(sale, attr, value)
+        if items is None:
+            sale.save()
+            return sale
+
+        old_items = list(sale.items.order_by('id'))
+        before = _quantities({'part_number': i.part_number, 'qty': i.qty} for i in old_items)
+        after = _quantities(items)
+        parts = lock_parts(before.keys() | after.keys())
+        check_stock(items, parts, released=before)
+
+        units = {i.part_number: i.unit for i in old_items}
+        units.update((line['part_number'], Decimal(line['unit'])) for line in items)
+        returned, taken = [], []
+        for pn in sorted(before.keys() | after.keys()):
+            delta = after.get(pn, 0) - before.get(pn, 0)
+            if delta and pn in parts:
+                line = {'part': parts[pn], 'quantity': abs(delta), 'value': abs(delta) * units[pn]}
+                (taken if delta > 0 else returned).append(line)
+        if returned:
+            add_stock(returned, notes=f'Sale #{sale.id} update - stock restored', source='sale')
+        if taken:
+            remove_stock(taken, notes=f'Sale #{sale.id} update', source='sale')
+
+        changed, created, removed = _match_items(old_items, items)
+        if removed:
+            SaleItem.objects.filter(pk__in=[item.pk for item in removed]).delete()
+        if changed:
+            SaleItem.objects.bulk_update(changed, ['name', 'qty', 'unit'])
+        if created:
+            SaleItem.objects.bulk_create([SaleItem(sale=sale, **line) for line in created])
+
+        sale.total = sale_total(items)
+        sale.save()
+    return sale
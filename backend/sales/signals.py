@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Sale
+from .rollup import sale_day, schedule_refresh
+
+
+@receiver([post_save, post_delete], sender=Sale)
+def refresh_sales_rollup(sender, instance, **kwargs):
+    schedule_refresh(sale_day(instance))
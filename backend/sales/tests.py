@@ -0,0 +1,255 @@
+import os
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import User
+from inventory.models import Customer, InventoryTransaction, Part
+
+from .models import DailySalesRollup, Sale, SaleItem
+from .rollup import rebuild_rollup
+from .serializers import SaleSerializer
+
+
+class SaleCreationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor', verified=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.parts = Part.objects.bulk_create([
+            Part(part_number=f'P-{i:03d}', description=f'Part {i}', current_stock=10, unit_cost=5)
+            for i in range(50)
+        ])
+
+    def sale(self, lines):
+        return {'items': [
+            {'part_number': part.part_number, 'name': part.description, 'qty': qty, 'unit': '7.50'}
+            for part, qty in lines
+        ]}
+
+    def post(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/sales/', payload, format='json')
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        small, small_queries = self.post(self.sale([(p, 1) for p in self.parts[:5]]))
+        large, large_queries = self.post(self.sale([(p, 2) for p in self.parts]))
+        self.assertEqual(small.status_code, 201)
+        self.assertEqual(large.status_code, 201)
+        self.assertEqual(small_queries, large_queries)
+        self.assertLessEqual(large_queries, 11)
+
+    def test_fifty_line_sale_writes_items_ledger_and_stock(self):
+        response, _ = self.post(self.sale([(p, 3) for p in self.parts]))
+        sale = Sale.objects.get(pk=response.data['id'])
+        self.assertEqual(float(sale.total), 50 * 3 * 7.5)
+        self.assertEqual(SaleItem.objects.filter(sale=sale).count(), 50)
+        self.assertEqual(InventoryTransaction.objects.filter(notes=f'Sale #{sale.id}', type='stock-out', source='sale').count(), 50)
+        self.assertEqual(set(Part.objects.values_list('current_stock', flat=True)), {7})
+
+    def test_stock_is_checked_across_repeated_lines(self):
+        part, missing = self.parts[0], Part(part_number='NOPE', description='Missing')
+        response, _ = self.post(self.sale([(part, 6), (part, 6), (missing, 1)]))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('items[0].qty', response.data)
+        self.assertIn('items[2].part_number', response.data)
+        self.assertFalse(Sale.objects.exists())
+        part.refresh_from_db()
+        self.assertEqual(part.current_stock, 10)
+
+
+class SaleEditTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor', verified=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.parts = Part.objects.bulk_create([
+            Part(part_number=f'P-{i:03d}', description=f'Part {i}', current_stock=10, unit_cost=5)
+            for i in range(30)
+        ])
+        self.lines = [
+            {'part_number': p.part_number, 'name': p.description, 'qty': 2, 'unit': '7.50'}
+            for p in self.parts
+        ]
+        response = self.client.post('/api/sales/', {'items': self.lines}, format='json')
+        self.sale = Sale.objects.get(pk=response.data['id'])
+        self.item_ids = set(self.sale.items.values_list('id', flat=True))
+
+    def put(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(f'/api/sales/{self.sale.pk}/', payload, format='json')
+        return response, len(queries)
+
+    def ledger(self):
+        return InventoryTransaction.objects.filter(notes__startswith=f'Sale #{self.sale.pk} update')
+
+    def stock(self, index):
+        return Part.objects.get(pk=self.parts[index].pk).current_stock
+
+    def test_price_change_moves_no_stock(self):
+        self.lines[4]['unit'] = '9.00'
+        response, queries = self.put({'items': self.lines})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.ledger().exists())
+        self.assertEqual(set(self.sale.items.values_list('id', flat=True)), self.item_ids)
+        self.assertEqual(float(response.data['total']), 29 * 15 + 18)
+        self.assertLess(queries, 15)
+
+    def test_only_net_quantity_changes_reach_the_ledger(self):
+        self.lines[0]['qty'] = 5
+        self.lines[1]['qty'] = 1
+        del self.lines[2]
+        self.lines.append({'part_number': 'P-000', 'name': 'Part 0 again', 'qty': 1, 'unit': '7.50'})
+        response, _ = self.put({'items': self.lines})
+        self.assertEqual(response.status_code, 200)
+        moves = {(tx.part.part_number, tx.type, tx.quantity) for tx in self.ledger()}
+        self.assertEqual(moves, {('P-000', 'stock-out', 4), ('P-001', 'stock-in', 1), ('P-002', 'stock-in', 2)})
+        self.assertEqual([self.stock(0), self.stock(1), self.stock(2), self.stock(3)], [4, 9, 10, 8])
+        self.assertEqual(self.sale.items.count(), 30)
+
+    def test_quantity_increase_is_checked_against_released_stock(self):
+        self.lines[0]['qty'] = 11
+        response, _ = self.put({'items': self.lines})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('items[0].qty', response.data)
+        self.lines[0]['qty'] = 10
+        self.assertEqual(self.put({'items': self.lines})[0].status_code, 200)
+        self.assertEqual(self.stock(0), 0)
+
+    def test_edit_without_items_keeps_lines(self):
+        response, _ = self.put({'customer_name': 'Farai'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['customer']['name'], 'Farai')
+        self.assertEqual(self.sale.items.count(), 30)
+        self.assertEqual(float(response.data['total']), 30 * 15)
+
+
+class SaleItemsFeedTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+
+    def make_sales(self, count):
+        for i in range(count):
+            customer = Customer.objects.create(name=f'Customer {Customer.objects.count()}') if i % 2 else None
+            sale = Sale.objects.create(customer=customer, total=30)
+            SaleItem.objects.bulk_create([
+                SaleItem(sale=sale, part_number=f'P-{n}', name=f'Part {n}', qty=2, unit=Decimal('7.50')) for n in range(2)
+            ])
+
+    def queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/sales/items/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_rows_match_the_sale_shape(self):
+        self.make_sales(2)
+        rows, _ = self.queries()
+        sale = Sale.objects.order_by('-date', '-id').first()
+        expected = SaleSerializer(sale).data
+        self.assertEqual(rows[0]['id'], expected['id'])
+        self.assertEqual(rows[0]['customer'], expected['customer'])
+        self.assertEqual((rows[0]['date'], rows[0]['total']), (expected['date'], expected['total']))
+        self.assertEqual(rows[0]['items'], [{'part_number': 'P-0', 'name': 'Part 0', 'qty': 2, 'unit': 7.5},
+                                            {'part_number': 'P-1', 'name': 'Part 1', 'qty': 2, 'unit': 7.5}])
+
+    def test_query_count_is_constant(self):
+        self.make_sales(3)
+        small = (self.queries()[1], self.queries(page_size=50)[1])
+        self.make_sales(30)
+        self.assertEqual((self.queries()[1], self.queries(page_size=50)[1]), small)
+        self.assertEqual(small[1], 2)
+
+    def test_date_filter(self):
+        self.make_sales(2)
+        self.assertEqual(len(self.queries(to='2000-01-01')[0]), 0)
+        self.assertEqual(len(self.queries(**{'from': str(date.today())})[0]), 2)
+        self.assertEqual(self.client.get('/api/sales/items/', {'from': 'today'}).status_code, 400)
+
+
+@skipUnless(os.environ.get('RUN_BENCHMARKS'), 'set RUN_BENCHMARKS=1 to run benchmarks')
+class SaleItemsFeedBenchmark(TestCase):
+    SALES = 100000
+
+    def test_feed(self):
+        customers = Customer.objects.bulk_create([Customer(name=f'Bench {i}') for i in range(1000)])
+        Sale.objects.bulk_create([Sale(customer=customers[i % 1000] if i % 3 else None, total=45)
+                                  for i in range(self.SALES)], batch_size=5000)
+        SaleItem.objects.bulk_create([
+            SaleItem(sale_id=sale_id, part_number=f'P-{n}', name='Bench part', qty=3, unit=5)
+            for sale_id in Sale.objects.values_list('id', flat=True) for n in range(3)
+        ], batch_size=10000)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+
+        def legacy_page():
+            sales = Sale.objects.prefetch_related('items').order_by('-date', '-id')[:500]
+            return [dict(SaleSerializer(sale).data) for sale in sales]
+
+        def feed(**params):
+            return lambda: client.get('/api/sales/items/', params)
+
+        for name, run in (('per-sale serializer, 500 sales', legacy_page),
+                          ('feed, page of 500', feed(page_size=500)),
+                          (f'feed, all {self.SALES} sales', feed())):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+            print(f'{name}: {elapsed * 1000:.0f}ms, {len(queries)} queries')
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor'))
+        self.part = Part.objects.create(part_number='P-1', description='Part 1', current_stock=100, unit_cost=5)
+
+    def sell(self, qty, unit='10.00'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/sales/', {'items': [
+                {'part_number': 'P-1', 'name': 'Part 1', 'qty': qty, 'unit': unit}]}, format='json')
+        return response.data['id']
+
+    def rollup(self):
+        return DailySalesRollup.objects.values_list('total', 'sale_count', 'items_sold').get(day=timezone.localdate())
+
+    def test_rollup_follows_create_edit_and_delete(self):
+        first = self.sell(2)
+        self.sell(3)
+        self.assertEqual(self.rollup(), (50, 2, 5))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/sales/{first}/', {'items': [
+                {'part_number': 'P-1', 'name': 'Part 1', 'qty': 4, 'unit': '10.00'}]}, format='json')
+        self.assertEqual(self.rollup(), (70, 2, 7))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/sales/{first}/')
+        self.assertEqual(self.rollup(), (30, 1, 3))
+        DailySalesRollup.objects.all().delete()
+        self.assertEqual(rebuild_rollup(), 1)
+        self.assertEqual(self.rollup(), (30, 1, 3))
+
+    def test_stats_and_summary_read_the_rollup(self):
+        self.sell(2)
+        old = timezone.localdate() - timedelta(days=40)
+        DailySalesRollup.objects.create(day=old, total=99, sale_count=3, items_sold=9)
+        stats = self.client.get('/api/sales/stats/').data
+        self.assertEqual(stats['today'], {'total': 20.0, 'count': 1})
+
+        response = self.client.get('/api/sales/summary/')
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertEqual(response.data['results'][-1], {'period': timezone.localdate().isoformat(), 'total': 20.0,
+                                                        'count': 1, 'items_sold': 2})
+        months = self.client.get('/api/sales/summary/', {'bucket': 'month', 'from': old.isoformat()}).data['results']
+        self.assertEqual(months[0]['period'], old.replace(day=1).isoformat())
+        self.assertEqual(sum(m['count'] for m in months), 4)
+        self.assertEqual(self.client.get('/api/sales/summary/', {'bucket': 'year'}).status_code, 400)
@@ -6,5 +6,7 @@ urlpatterns = [
     path('<int:pk>/', views.sale_detail, name='sale_detail'),
     path('by-customer/<int:customer_id>/', views.customer_sales, name='customer_sales'),
     path('stats/', views.sales_stats, name='sales_stats'),
+    path('summary/', views.sales_summary, name='sales_summary'),
     path('items/', views.sale_items, name='sale_items'),
+    path('export/', views.export_sales_csv, name='sales_export'),
 ]
@@ -1,73 +1,48 @@
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.db.models import Sum, Count
+from django.conf import settings
+from django.db.models import Q, QuerySet, Sum
 from django.utils import timezone
+from collections import defaultdict
 from datetime import timedelta
+from itertools import islice
 
 from .serializers import SaleSerializer
-from .models import Sale
+from .models import DailySalesRollup, Sale, SaleItem
+from .rollup import summary
+from inventory.stock import StockMovementError, add_stock
+from api.exports import InvalidDateRange, csv_response, filter_dates
+from api.conditional import conditional_get, row_fingerprint, table_fingerprint
+from api.pagination import paginate
+from api.periods import InvalidPeriod, requested_period
 
 
 @api_view(['GET', 'POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_get(table_fingerprint('sales.Sale', 'inventory.Customer'))
 def sales_list(request):
     """List all sales or create a new sale"""
 
     if request.method == 'GET':
-        qs = Sale.objects.all().order_by('-date')
-        serializer = SaleSerializer(qs, many=True)
-        return Response(serializer.data)
+        qs = Sale.objects.select_related('customer').prefetch_related('items').order_by('-date')
+        return paginate(request, qs, '-date', lambda rows: SaleSerializer(rows, many=True).data)
 
     elif request.method == 'POST':
         serializer = SaleSerializer(data=request.data)
         if serializer.is_valid():
             try:
-                # Start a transaction to ensure all operations succeed or none do
-                from django.db import transaction
-                from inventory.models import Part, InventoryTransaction
-
-                with transaction.atomic():
-                    # First validate all items have sufficient stock
-                    items_data = request.data.get('items', [])
-                    for item in items_data:
-                        part_number = item.get('part_number')
-                        qty = int(item.get('qty', 0))
-                        
-                        if part_number:
-                            part = Part.objects.get(part_number=part_number)
-                            if part.current_stock < qty:
-                                return Response(
-                                    {'message': f'Insufficient stock for {part_number}. Available: {part.current_stock}'},
-                                    status=status.HTTP_400_BAD_REQUEST
-                                )
-                    
-                    # Create the sale
-                    sale = serializer.save()
-                    
-                    # Update inventory for each item
-                    for item in sale.items.all():
-                        if item.part_number:
-                            part = Part.objects.get(part_number=item.part_number)
-                            # Deduct stock
-                            part.current_stock = max(0, part.current_stock - item.qty)
-                            part.save()
-                            
-                            # Record the transaction
-                            InventoryTransaction.objects.create(
-                                part=part,
-                                type='stock-out',
-                                quantity=item.qty,
-                                value=item.unit * item.qty,
-                                notes=f'Sale #{sale.id}'
-                            )
-                    
-                    return Response(SaleSerializer(sale).data, status=status.HTTP_201_CREATED)
-            except Part.DoesNotExist as e:
-                return Response({'message': f'Part not found: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+                # Creates the sale and its items and deducts stock in one transaction
+                sale = serializer.save()
+                return Response(SaleSerializer(sale).data, status=status.HTTP_201_CREATED)
+            except ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+            except StockMovementError as e:
+                return Response({'message': str(e), 'failures': e.failures}, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -78,9 +53,8 @@ def sales_list(request):
 def customer_sales(request, customer_id):
     """Get all sales for a specific customer"""
     try:
-        sales = Sale.objects.filter(customer_id=customer_id).order_by('-date')
-        serializer = SaleSerializer(sales, many=True)
-        return Response(serializer.data)
+        sales = Sale.objects.filter(customer_id=customer_id).select_related('customer').prefetch_related('items').order_by('-date')
+        return paginate(request, sales, '-date', lambda rows: SaleSerializer(rows, many=True).data)
     except Exception as e:
         return Response(
             {'message': str(e)},
@@ -93,32 +67,24 @@ def customer_sales(request, customer_id):
 def sales_stats(request):
     """Get sales statistics"""
     try:
-        # Get today's stats
-        today = timezone.now().date()
-        today_sales = Sale.objects.filter(
-            date__date=today
-        ).aggregate(
-            total=Sum('total'),
-            count=Count('id')
-        )
-
-        # Get this week's stats
+        # read from the daily rollup rather than aggregating raw sales
+        today = timezone.localdate()
         week_start = today - timedelta(days=today.weekday())
-        week_sales = Sale.objects.filter(
-            date__date__gte=week_start
-        ).aggregate(
-            total=Sum('total'),
-            count=Count('id')
+        week = DailySalesRollup.objects.filter(day__gte=week_start, day__lte=today).aggregate(
+            week_total=Sum('total'),
+            week_count=Sum('sale_count'),
+            today_total=Sum('total', filter=Q(day=today)),
+            today_count=Sum('sale_count', filter=Q(day=today)),
         )
 
         return Response({
             'today': {
-                'total': float(today_sales['total'] or 0),
-                'count': today_sales['count'] or 0
+                'total': float(week['today_total'] or 0),
+                'count': week['today_count'] or 0
             },
             'week': {
-                'total': float(week_sales['total'] or 0),
-                'count': week_sales['count'] or 0
+                'total': float(week['week_total'] or 0),
+                'count': week['week_count'] or 0
             }
         })
     except Exception as e:
@@ -127,37 +93,68 @@ def sales_stats(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def sales_summary(request):
+    """Sales total, count and items sold per ?bucket=day|week|month between ?from= and ?to= (default: last 30 days)"""
+    try:
+        start, end, bucket = requested_period(request)
+    except InvalidPeriod as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'bucket': bucket, 'from': start, 'to': end, 'results': summary(start, end, bucket)})
+
+
+# field instances reused for every row of the sale_items feed
+_date_field = serializers.DateTimeField()
+_total_field = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+def sales_with_items(sales):
+    """Shape sale rows (``values()`` dicts) and attach their items with one query."""
+    items = defaultdict(list)
+    lines = SaleItem.objects.filter(sale_id__in=[sale['id'] for sale in sales]).order_by('id')
+    for sale_id, part_number, name, qty, unit in lines.values_list('sale_id', 'part_number', 'name', 'qty', 'unit'):
+        items[sale_id].append({'part_number': part_number, 'name': name, 'qty': qty, 'unit': float(unit)})
+    return [
+        {
+            'id': sale['id'],
+            'date': _date_field.to_representation(sale['date']),
+            'customer': {'id': sale['customer_id'], 'name': sale['customer__name']} if sale['customer_id'] else None,
+            'total': _total_field.to_representation(sale['total']),
+            'items': items[sale['id']],
+        }
+        for sale in sales
+    ]
+
+
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def sale_items(request):
-    """Get all sale items"""
+    """Sales with their items, newest first (?from=/?to= filter on sale date)"""
     try:
-        qs = Sale.objects.all().prefetch_related('items').order_by('-date')
-        data = []
-        for sale in qs:
-            sale_data = SaleSerializer(sale).data
-            sale_data['items'] = [
-                {
-                    'part_number': item.part_number,
-                    'name': item.name,
-                    'qty': item.qty,
-                    'unit': float(item.unit)
-                }
-                for item in sale.items.all()
-            ]
-            data.append(sale_data)
-        return Response(data)
-    except Exception as e:
-        return Response(
-            {'message': str(e)},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+        qs = filter_dates(Sale.objects.all(), 'date', request)
+    except InvalidDateRange as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    qs = qs.order_by('-date', '-id').values('id', 'date', 'total', 'customer_id', 'customer__name')
+
+    def serialize(rows):
+        if not isinstance(rows, QuerySet):
+            return sales_with_items(rows)
+        # unpaginated requests walk the table in chunks, one items query per chunk
+        data, rows = [], rows.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        while chunk := list(islice(rows, settings.EXPORT_CHUNK_SIZE)):
+            data += sales_with_items(chunk)
+        return data
+
+    return paginate(request, qs, '-date', serialize)
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_get(row_fingerprint('sales.Sale', 'customer__updated_at'))
 def sale_detail(request, pk):
     try:
         s = Sale.objects.get(pk=pk)
@@ -171,77 +168,13 @@ def sale_detail(request, pk):
         serializer = SaleSerializer(s, data=request.data, partial=True)
         if serializer.is_valid():
             try:
-                from django.db import transaction
-                from inventory.models import Part, InventoryTransaction
-
-                with transaction.atomic():
-                    # First, restore stock from the original sale
-                    for item in s.items.all():
-                        if item.part_number:
-                            try:
-                                part = Part.objects.get(part_number=item.part_number)
-                                part.current_stock += item.qty
-                                part.save()
-                                
-                                # Record the restoration transaction
-                                InventoryTransaction.objects.create(
-                                    part=part,
-                                    type='stock-in',
-                                    quantity=item.qty,
-                                    value=item.unit * item.qty,
-                                    notes=f'Sale #{s.id} update - stock restored'
-                                )
-                            except Part.DoesNotExist:
-                                pass
-                    
-                    # Delete old items
-                    s.items.all().delete()
-                    
-                    # Validate new items have sufficient stock
-                    items_data = request.data.get('items', [])
-                    for item in items_data:
-                        part_number = item.get('part_number')
-                        qty = int(item.get('qty', 0))
-                        
-                        if part_number:
-                            part = Part.objects.get(part_number=part_number)
-                            if part.current_stock < qty:
-                                return Response(
-                                    {'message': f'Insufficient stock for {part_number}. Available: {part.current_stock}'},
-                                    status=status.HTTP_400_BAD_REQUEST
-                                )
-                    
-                    # Update the sale
-                    sale = serializer.save()
-                    
-                    # Create new items and deduct stock
-                    for item_data in items_data:
-                        from .models import SaleItem
-                        item = SaleItem.objects.create(
-                            sale=sale,
-                            part_number=item_data.get('part_number', ''),
-                            name=item_data.get('name', ''),
-                            qty=int(item_data.get('qty', 0)),
-                            unit=float(item_data.get('unit', 0))
-                        )
-                        
-                        if item.part_number:
-                            part = Part.objects.get(part_number=item.part_number)
-                            part.current_stock = max(0, part.current_stock - item.qty)
-                            part.save()
-                            
-                            # Record the transaction
-                            InventoryTransaction.objects.create(
-                                part=part,
-                                type='stock-out',
-                                quantity=item.qty,
-                                value=item.unit * item.qty,
-                                notes=f'Sale #{sale.id} update'
-                            )
-                    
-                    return Response(SaleSerializer(sale).data)
-            except Part.DoesNotExist as e:
-                return Response({'message': f'Part not found: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+                # Only the lines that changed are written, stock moves by the net difference
+                sale = serializer.save()
+                return Response(SaleSerializer(sale).data)
+            except ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+            except StockMovementError as e:
+                return Response({'message': str(e), 'failures': e.failures}, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -250,28 +183,33 @@ def sale_detail(request, pk):
         # Restore stock when deleting
         try:
             from django.db import transaction
-            from inventory.models import Part, InventoryTransaction
 
             with transaction.atomic():
-                for item in s.items.all():
-                    if item.part_number:
-                        try:
-                            part = Part.objects.get(part_number=item.part_number)
-                            part.current_stock += item.qty
-                            part.save()
-                            
-                            # Record the restoration transaction
-                            InventoryTransaction.objects.create(
-                                part=part,
-                                type='stock-in',
-                                quantity=item.qty,
-                                value=item.unit * item.qty,
-                                notes=f'Sale #{s.id} deleted - stock restored'
-                            )
-                        except Part.DoesNotExist:
-                            pass
-                
+                add_stock([
+                    {'part_number': item.part_number, 'quantity': item.qty, 'value': item.unit * item.qty}
+                    for item in s.items.all() if item.part_number
+                ], notes=f'Sale #{s.id} deleted - stock restored', ignore_missing=True, source='sale')
+
                 s.delete()
                 return Response(status=status.HTTP_204_NO_CONTENT)
         except Exception as e:
             return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def export_sales_csv(request):
+    """Stream sales as CSV, one row per sale item (?from=/?to= filter on sale date)"""
+    try:
+        qs = filter_dates(SaleItem.objects.all(), 'sale__date', request)
+    except InvalidDateRange as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return csv_response(
+        request,
+        'sales.csv',
+        ['sale_id', 'date', 'customer', 'sale_total', 'part_number', 'name', 'qty', 'unit', 'line_total'],
+        qs,
+        ['sale_id', 'sale__date', 'sale__customer__name', 'sale__total', 'part_number', 'name', 'qty', 'unit'],
+        transform=lambda row: row[:2] + (row[2] or 'Walk-in',) + row[3:] + (row[6] * row[7],),
+    )
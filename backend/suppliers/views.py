@@ -7,16 +7,20 @@ from rest_framework import status
 
 from inventory.models import Supplier
 from inventory.serializers import SupplierSerializer
+from api.cache import cached_response
+from api.conditional import conditional_get, row_fingerprint, table_fingerprint
+from api.pagination import paginate
 
 
 @api_view(['GET', 'POST'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_get(table_fingerprint('inventory.Supplier'))
+@cached_response('inventory.Supplier')
 def suppliers_list(request):
     if request.method == 'GET':
         qs = Supplier.objects.all()
-        serializer = SupplierSerializer(qs, many=True)
-        return Response(serializer.data)
+        return paginate(request, qs, 'id', lambda rows: SupplierSerializer(rows, many=True).data)
 
     # POST - create (only supervisor/admin allowed)
     if not hasattr(request.user, 'role') or request.user.role not in ('admin', 'supervisor'):
@@ -32,6 +36,7 @@ def suppliers_list(request):
 @api_view(['GET', 'PATCH', 'DELETE'])
 @authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_get(row_fingerprint('inventory.Supplier'))
 def supplier_detail(request, pk):
     supplier = get_object_or_404(Supplier, pk=pk)
     
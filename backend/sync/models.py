@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row, kept so sync clients can drop it too."""
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'deleted_at', 'id'])]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,64 @@
+"""The models exposed through ``/api/sync/`` and how their rows are sent."""
+from collections import namedtuple
+
+Resource = namedtuple('Resource', 'label queryset serialize')
+
+
+def _jobs():
+    from jobs.models import Job
+    return Job.objects.select_related('technician')
+
+
+def _serialize_jobs(rows):
+    from jobs.serializers import JobListSerializer
+    return JobListSerializer(rows, many=True).data
+
+
+def _parts():
+    from inventory.models import Part
+    return Part.objects.select_related('category')
+
+
+def _serialize_parts(rows):
+    from inventory.views import serialize_parts
+    return serialize_parts(rows)
+
+
+def _customers():
+    from inventory.models import Customer
+    return Customer.objects.all()
+
+
+def _serialize_customers(rows):
+    from inventory.serializers import CustomerSerializer
+    return CustomerSerializer(rows, many=True).data
+
+
+def _sales():
+    from sales.models import Sale
+    return Sale.objects.select_related('customer').prefetch_related('items')
+
+
+def _serialize_sales(rows):
+    from sales.serializers import SaleSerializer
+    return SaleSerializer(rows, many=True).data
+
+
+def _suppliers():
+    from inventory.models import Supplier
+    return Supplier.objects.all()
+
+
+def _serialize_suppliers(rows):
+    from inventory.serializers import SupplierSerializer
+    return SupplierSerializer(rows, many=True).data
+
+
+# each serializer matches the one used by the resource's list endpoint
+RESOURCES = {
+    'jobs': Resource('jobs.Job', _jobs, _serialize_jobs),
+    'parts': Resource('inventory.Part', _parts, _serialize_parts),
+    'customers': Resource('inventory.Customer', _customers, _serialize_customers),
+    'sales': Resource('sales.Sale', _sales, _serialize_sales),
+    'suppliers': Resource('inventory.Supplier', _suppliers, _serialize_suppliers),
+}
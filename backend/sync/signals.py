@@ -0,0 +1,48 @@
+"""Keep the sync change feed complete across deletes and edits of embedded rows."""
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Tombstone
+from .resources import RESOURCES
+
+_MODELS = {resource.label for resource in RESOURCES.values()}
+
+# parent model -> (synced model, foreign key) pairs that are cleared with
+# SET_NULL when the parent goes away; that UPDATE bypasses auto_now
+_SET_NULL = {
+    'inventory.Category': [('inventory.Part', 'category')],
+    'inventory.Customer': [('sales.Sale', 'customer')],
+    'api.User': [('jobs.Job', 'technician'), ('jobs.Job', 'assigned_technician')],
+}
+
+# parent model -> (synced model, foreign key) pairs whose serialized rows
+# embed the parent (a part's nested category, a sale's customer name)
+_EMBEDDED = {
+    'inventory.Category': [('inventory.Part', 'category')],
+    'inventory.Customer': [('sales.Sale', 'customer')],
+}
+
+
+def _touch(pairs, instance):
+    for label, field in pairs:
+        apps.get_model(label).objects.filter(**{field: instance}).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete)
+def touch_orphaned_rows(sender, instance, **kwargs):
+    _touch(_SET_NULL.get(sender._meta.label, ()), instance)
+
+
+@receiver(post_save)
+def touch_embedding_rows(sender, instance, created, **kwargs):
+    if not created:
+        _touch(_EMBEDDED.get(sender._meta.label, ()), instance)
+
+
+@receiver(post_delete)
+def record_tombstone(sender, instance, **kwargs):
+    label = sender._meta.label
+    if label in _MODELS:
+        Tombstone.objects.create(model=label, object_id=instance.pk)
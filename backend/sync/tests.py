@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import User
+from inventory.models import Category, Customer, Part
+from sales.models import Sale
+
+from .changes import changes_since, decode_token
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sup', 'sup@example.com', 'pw', role='supervisor', verified=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.parts = [Part.objects.create(part_number=f'P-{i}', description=f'Part {i}', current_stock=5)
+                      for i in range(3)]
+
+    def get(self, **params):
+        response = self.client.get('/api/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_first_call_is_a_full_snapshot_in_pages(self):
+        first = self.get(resources='parts', limit=2)
+        self.assertTrue(first['has_more'])
+        second = self.get(resources='parts', limit=2, token=first['token'])
+        self.assertFalse(second['has_more'])
+        ids = [p['id'] for p in first['changes']['parts'] + second['changes']['parts']]
+        self.assertEqual(ids, [p.pk for p in self.parts])
+
+    def test_updates_and_deletes_since_token(self):
+        token = self.get()['token']
+        self.parts[0].current_stock = 1
+        self.parts[0].save()
+        deleted_pk = self.parts[1].pk
+        self.parts[1].delete()
+        Customer.objects.create(name='Tendai')
+
+        data = self.get(token=token)
+        self.assertIn(self.parts[0].pk, [p['id'] for p in data['changes']['parts']])
+        self.assertEqual(data['deleted']['parts'], [deleted_pk])
+        # rows changed within SYNC_OVERLAP_SECONDS of the first call are sent again
+        self.assertIn('Tendai', [c['name'] for c in data['changes']['customers']])
+
+    def test_quiet_poll_after_overlap_returns_nothing(self):
+        later = timezone.now() + timedelta(minutes=1)
+        _, _, token, _ = changes_since(['parts'], {}, 100, now=later)
+        changes, deleted, _, _ = changes_since(['parts'], decode_token(token), 100, now=later)
+        self.assertEqual((changes['parts'], deleted['parts']), ([], []))
+
+    def test_late_commit_inside_the_overlap_is_picked_up(self):
+        now = timezone.now()
+        Part.objects.filter(pk=self.parts[-1].pk).update(updated_at=now - timedelta(seconds=1))
+        _, _, token, _ = changes_since(['parts'], {}, 100, now=now)
+
+        # a transaction that started earlier commits after that poll
+        late = Part.objects.create(part_number='P-late', current_stock=1)
+        Part.objects.filter(pk=late.pk).update(updated_at=now - timedelta(seconds=3))
+        changes, _, _, _ = changes_since(['parts'], decode_token(token), 100, now=now + timedelta(seconds=1))
+        self.assertIn(late.pk, [p['id'] for p in changes['parts']])
+
+    def test_rows_embedding_a_renamed_category_or_customer_are_sent_again(self):
+        category = Category.objects.create(name='Oils')
+        Part.objects.filter(pk=self.parts[0].pk).update(category=category)
+        customer = Customer.objects.create(name='Tendai')
+        sale = Sale.objects.create(customer=customer, total=20)
+        Part.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+        Sale.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+        _, _, token, _ = changes_since(['parts', 'sales'], {}, 100)
+
+        category.name = 'Lubricants'
+        category.save()
+        customer.name = 'Tendai Moyo'
+        customer.save()
+        changes, _, _, _ = changes_since(['parts', 'sales'], decode_token(token), 100)
+        self.assertEqual([p['category']['name'] for p in changes['parts']], ['Lubricants'])
+        self.assertEqual([(s['id'], s['customer']['name']) for s in changes['sales']], [(sale.pk, 'Tendai Moyo')])
+
+    def test_bad_token_and_resource_are_rejected(self):
+        self.assertEqual(self.client.get('/api/sync/', {'token': 'nope'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sync/', {'resources': 'widgets'}).status_code, 400)
@@ -0,0 +1,42 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .changes import ExpiredToken, InvalidToken, changes_since, decode_token
+from .resources import RESOURCES
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """Rows created, updated or deleted since the given sync token.
+
+    Query parameters: ``token`` (omit for a full snapshot), ``resources``
+    (comma separated, default all) and ``limit`` (rows per resource). When
+    ``has_more`` is true call again straight away with the new token.
+    """
+    names = [n.strip() for n in request.GET.get('resources', '').split(',') if n.strip()] or list(RESOURCES)
+    unknown = [n for n in names if n not in RESOURCES]
+    if unknown:
+        return Response({'message': f"Unknown resources: {', '.join(unknown)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = int(request.GET.get('limit', settings.SYNC_PAGE_SIZE))
+    except ValueError:
+        limit = settings.SYNC_PAGE_SIZE
+    limit = max(1, min(limit, settings.SYNC_MAX_PAGE_SIZE))
+
+    try:
+        positions = decode_token(request.GET.get('token'))
+        changes, deleted, token, has_more = changes_since(names, positions, limit)
+    except InvalidToken:
+        return Response({'message': 'Invalid sync token'}, status=status.HTTP_400_BAD_REQUEST)
+    except ExpiredToken:
+        return Response({'message': 'Sync token expired, a full resync is required'},
+                        status=status.HTTP_410_GONE)
+
+    return Response({'changes': changes, 'deleted': deleted, 'token': token, 'has_more': has_more})
@@ -15,6 +15,5 @@ if path not in sys.path:
 # Set the Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_project.settings')
 
-# Import Django's WSGI application
-from django.core.wsgi import get_wsgi_application
-application = get_wsgi_application()
+# Import the project's WSGI application (also warms the barcode map, see wsgi.py)
+from backend_project.wsgi import application  # noqa: E402,F401
@@ -0,0 +1,55 @@
+import { useEffect, useRef } from 'react';
+
+const API_BASE = import.meta.env.VITE_API_BASE || 'https://progress.pythonanywhere.com/api';
+
+// every kind published by the backend (events/signals.py)
+const EVENT_KINDS = [
+  'job.created', 'job.status', 'job.assigned', 'job.unassigned',
+  'message.created', 'sale.created', 'stock.changed'
+];
+const SEEN_LIMIT = 500;
+
+// One EventSource per tab, shared by every subscribed widget.
+let source = null;
+const listeners = new Set();
+const seen = new Set();
+
+const dispatch = (message) => {
+  // a resumed stream sends recent events again, so skip ids already handled
+  if (message.lastEventId) {
+    if (seen.has(message.lastEventId)) return;
+    seen.add(message.lastEventId);
+    if (seen.size > SEEN_LIMIT) seen.delete(seen.values().next().value);
+  }
+  const data = JSON.parse(message.data);
+  listeners.forEach((listener) => listener(message.type, data));
+};
+
+const subscribe = (listener) => {
+  listeners.add(listener);
+  const token = localStorage.getItem('token');
+  if (!source && token && typeof EventSource !== 'undefined') {
+    // EventSource cannot send an Authorization header
+    source = new EventSource(`${API_BASE}/events/stream/?token=${encodeURIComponent(token)}`);
+    EVENT_KINDS.forEach((kind) => source.addEventListener(kind, dispatch));
+  }
+  return () => {
+    listeners.delete(listener);
+    if (!listeners.size && source) {
+      source.close();
+      source = null;
+    }
+  };
+};
+
+// Calls onEvent(kind, data) for every live event whose kind is in `kinds`.
+const useEventStream = (kinds, onEvent) => {
+  const handler = useRef(onEvent);
+  handler.current = onEvent;
+
+  useEffect(() => subscribe((kind, data) => {
+    if (kinds.includes(kind)) handler.current(kind, data);
+  }), [kinds]);
+};
+
+export default useEventStream;
@@ -1,5 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import Icon from '../../../components/AppIcon';
+import useEventStream from '../../../components/useEventStream';
+
+const JOB_EVENTS = ['job.created', 'job.status', 'job.assigned', 'job.unassigned'];
 
 const JobStatusBoard = () => {
   const [jobs, setJobs] = useState([]);
@@ -11,11 +14,14 @@ const JobStatusBoard = () => {
     fetchJobs();
   }, []);
 
-  const fetchJobs = async () => {
-    setLoading(true);
+  // reload the board when a job changes instead of polling
+  useEventStream(JOB_EVENTS, () => fetchJobs(false));
+
+  const fetchJobs = async (showLoading = true) => {
+    setLoading(showLoading);
     try {
       const token = localStorage.getItem('token');
-      const response = await fetch(`${API_BASE}/dashboard/active-jobs`, {
+      const response = await fetch(`${API_BASE}/auth/dashboard/active-jobs`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
@@ -24,7 +30,11 @@ const JobStatusBoard = () => {
       
       if (response.ok) {
         const data = await response.json();
-        setJobs(data);
+        setJobs(data.columns.flatMap((column) => column.jobs.map((job) => ({
+          ...job,
+          status: job.status.replace('_', '-'),
+          priority: job.priority.toLowerCase()
+        }))));
       }
     } catch (error) {
       console.error('Error fetching jobs:', error);
@@ -1,6 +1,9 @@
 import React, { useState, useEffect } from 'react';
 import Icon from '../../../components/AppIcon';
 import Image from '../../../components/AppImage';
+import useEventStream from '../../../components/useEventStream';
+
+const JOB_EVENTS = ['job.status', 'job.assigned', 'job.unassigned'];
 
 const TechnicianActivity = () => {
   const [technicians, setTechnicians] = useState([]);
@@ -12,11 +15,14 @@ const TechnicianActivity = () => {
     fetchTechnicians();
   }, []);
 
-  const fetchTechnicians = async () => {
-    setLoading(true);
+  // reload when a technician's jobs change instead of polling
+  useEventStream(JOB_EVENTS, () => fetchTechnicians(false));
+
+  const fetchTechnicians = async (showLoading = true) => {
+    setLoading(showLoading);
     try {
       const token = localStorage.getItem('token');
-      const response = await fetch(`${API_BASE}/dashboard/technician-activity`, {
+      const response = await fetch(`${API_BASE}/auth/dashboard/technician-activity`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
@@ -102,9 +108,11 @@ const TechnicianActivity = () => {
                 <div className="flex-1 min-w-0">
                   <div className="flex items-center justify-between mb-2">
                     <h3 className="text-sm font-heading-medium text-text-primary">{tech.name}</h3>
-                    <span className={`text-xs font-body-medium ${getEfficiencyColor(tech.efficiency)}`}>
-                      {tech.efficiency}% Efficiency
-                    </span>
+                    {tech.efficiency != null && (
+                      <span className={`text-xs font-body-medium ${getEfficiencyColor(tech.efficiency)}`}>
+                        {tech.efficiency}% Efficiency
+                      </span>
+                    )}
                   </div>
                   
                   {tech.currentJob ? (